@@ -0,0 +1,154 @@
+"""
+Benchmark the SSE decoding hot paths over an in-process HTTPX transport.
+
+Usage:
+
+    python -m benchmarks                      # Run all scenarios.
+    python -m benchmarks -k 1k                # Run scenarios whose name contains "1k".
+    python -m benchmarks --save main          # Save results as a baseline.
+    python -m benchmarks --compare main       # Compare results to a saved baseline.
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import httpx
+
+from httpx_sse import connect_sse
+from httpx_sse._api import _iter_sse_lines
+from httpx_sse._decoders import SSEDecoder
+
+from .streams import SCENARIOS, Scenario, make_chunks, make_stream
+
+BASELINES_DIR = Path(__file__).parent / "baselines"
+
+Result = Dict[str, float]
+
+
+class ChunkStream(httpx.SyncByteStream):
+    def __init__(self, chunks: List[bytes]) -> None:
+        self._chunks = chunks
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._chunks
+
+
+def consume(chunks: List[bytes], parser: str) -> int:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            stream=ChunkStream(chunks),
+        )
+
+    count = 0
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        with connect_sse(client, "GET", "http://testserver/sse") as event_source:
+            if parser == "bytes":
+                for sse in event_source.iter_sse():
+                    count += 1
+            elif parser == "streaming":
+                for streaming_sse in event_source.iter_sse_streaming():
+                    for _ in streaming_sse.iter_data():
+                        pass
+                    count += 1
+            else:
+                decoder = SSEDecoder()
+                for line in _iter_sse_lines(event_source.response):
+                    if decoder.decode(line) is not None:
+                        count += 1
+    return count
+
+
+def run(scenario: Scenario, parser: str, repeat: int) -> Result:
+    stream = make_stream(scenario)
+    chunks = make_chunks(scenario, stream)
+
+    best = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        count = consume(chunks, parser)
+        best = min(best, time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    consume(chunks, parser)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "events_per_sec": count / best,
+        "mb_per_sec": len(stream) / best / 1e6,
+        "peak_kib": peak / 1024,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("-k", dest="keyword", default="", help="Filter scenarios.")
+    parser.add_argument(
+        "--parser", choices=["bytes", "streaming", "str"], default="bytes"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--save", metavar="NAME", help="Save results as a baseline.")
+    parser.add_argument("--compare", metavar="NAME", help="Compare to a baseline.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative throughput drop reported as a regression (default: 0.1).",
+    )
+    args = parser.parse_args()
+
+    baseline: Dict[str, Result] = {}
+    if args.compare:
+        baseline = json.loads((BASELINES_DIR / f"{args.compare}.json").read_text())
+
+    results: Dict[str, Result] = {}
+    regressions = []
+
+    print(f"{'scenario':<28} {'events/s':>12} {'MB/s':>9} {'peak KiB':>10}")
+    for scenario in SCENARIOS:
+        name = f"{scenario.name}[{args.parser}]"
+        if args.keyword not in name:
+            continue
+
+        result = results[name] = run(scenario, args.parser, args.repeat)
+        line = (
+            f"{name:<28} {result['events_per_sec']:>12,.0f} "
+            f"{result['mb_per_sec']:>9.1f} {result['peak_kib']:>10,.0f}"
+        )
+
+        if name in baseline:
+            ratio = result["events_per_sec"] / baseline[name]["events_per_sec"] - 1
+            line += f" {ratio:>+8.1%}"
+            if ratio < -args.threshold:
+                regressions.append(name)
+                line += " REGRESSION"
+
+        print(line, flush=True)
+
+    if args.save:
+        BASELINES_DIR.mkdir(exist_ok=True)
+        path = BASELINES_DIR / f"{args.save}.json"
+        path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Saved baseline to {path}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
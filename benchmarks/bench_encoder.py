@@ -0,0 +1,64 @@
+"""
+Measure throughput of `SSEEncoder`, and of a round-trip through `WSGIEventStream`
+and `iter_sse()`.
+
+Usage: python benchmarks/bench_encoder.py [--count N]
+"""
+
+import argparse
+import time
+from typing import List
+
+import httpx
+
+from httpx_sse import ServerSentEvent, SSEEncoder, WSGIEventStream, connect_sse
+
+
+def make_events(count: int, multiline: bool) -> List[ServerSentEvent]:
+    data = '{"text": "hello"}'
+    if multiline:
+        data = data.replace(" ", "\n")
+    return [ServerSentEvent(event="token", data=data, id=str(i)) for i in range(count)]
+
+
+def bench_encode(name: str, events: List[ServerSentEvent]) -> None:
+    encoder = SSEEncoder()
+    start = time.perf_counter()
+    for sse in events:
+        encoder.encode(sse)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {len(events) / elapsed:>12,.0f} events/s")
+
+
+def bench_encode_batch(name: str, events: List[ServerSentEvent]) -> None:
+    encoder = SSEEncoder()
+    start = time.perf_counter()
+    encoder.encode_batch(events)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {len(events) / elapsed:>12,.0f} events/s")
+
+
+def bench_round_trip(name: str, events: List[ServerSentEvent]) -> None:
+    app = WSGIEventStream(events, heartbeat=None)
+    start = time.perf_counter()
+    with httpx.Client(transport=httpx.WSGITransport(app)) as client:
+        with connect_sse(client, "GET", "http://testserver") as event_source:
+            count = sum(1 for _ in event_source.iter_sse())
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {count / elapsed:>12,.0f} events/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    events = make_events(args.count, multiline=False)
+    bench_encode("encode", events)
+    bench_encode("encode-multiline", make_events(args.count, multiline=True))
+    bench_encode_batch("encode-batch", events)
+    bench_round_trip("round-trip-wsgi", events)
+
+
+if __name__ == "__main__":
+    main()
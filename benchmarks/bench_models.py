@@ -0,0 +1,70 @@
+"""
+Compare memory use and throughput of `ServerSentEvent` and `RawServerSentEvent`.
+
+Usage: python benchmarks/bench_models.py [--count N]
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Any, Callable, List
+
+from httpx_sse._decoders import RawSSEBytesDecoder, SSEBytesDecoder
+
+
+def make_lines(count: int) -> List[bytes]:
+    lines = []
+    for i in range(count):
+        lines += [b"event: token", b'data: {"text": "hello"}', b"id: %d" % i, b""]
+    return lines
+
+
+def decode_all(decoder: Any, lines: List[bytes]) -> List[Any]:
+    decode = decoder.decode
+    events = []
+    for line in lines:
+        sse = decode(line)
+        if sse is not None:
+            events.append(sse)
+    return events
+
+
+def measure(name: str, make_decoder: Callable[[], Any], lines: List[bytes]) -> None:
+    gc.collect()
+    start = time.perf_counter()
+    events = decode_all(make_decoder(), lines)
+    decode_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for sse in events:
+        sse.event, sse.data, sse.id, sse.retry
+    access_time = time.perf_counter() - start
+
+    del events
+    gc.collect()
+    tracemalloc.start()
+    events = decode_all(make_decoder(), lines)
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    count = len(events)
+    print(
+        f"{name:<20} {count / decode_time:>12,.0f} events/s "
+        f"{count / access_time:>14,.0f} accesses/s "
+        f"{retained / count:>8.1f} B/event"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=100_000)
+    args = parser.parse_args()
+
+    lines = make_lines(args.count)
+    measure("ServerSentEvent", SSEBytesDecoder, lines)
+    measure("RawServerSentEvent", RawSSEBytesDecoder, lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Synthetic SSE streams for benchmarks.
+"""
+
+import json
+from typing import List, NamedTuple
+
+MTU = 1460
+
+EVENT_SIZES = {
+    # LLM-style tokens.
+    "tiny": 16,
+    "1k": 1024,
+    "64k": 64 * 1024,
+    "1m": 1024 * 1024,
+}
+
+CHUNK_SIZES = {
+    "1b": 1,
+    "mtu": MTU,
+    "whole": 0,
+}
+
+LINE_ENDINGS = {
+    "lf": b"\n",
+    "crlf": b"\r\n",
+    "cr": b"\r",
+}
+
+
+class Scenario(NamedTuple):
+    event_size: str
+    chunking: str
+    line_ending: str = "lf"
+    multiline: bool = False
+    # Approximate size of the whole stream.
+    total_size: int = 1024 * 1024
+
+    @property
+    def name(self) -> str:
+        name = f"{self.event_size}-{self.chunking}-{self.line_ending}"
+        if self.multiline:
+            name += "-multiline"
+        return name
+
+
+def _payload(size: int, multiline: bool) -> List[bytes]:
+    """
+    Return the data lines of a JSON payload of about `size` bytes.
+    """
+    if size <= 32:
+        text = json.dumps({"t": "x" * max(1, size - 10)})
+        return [text.encode()]
+
+    items = [{"id": i, "value": "x" * 48} for i in range(max(1, size // 64))]
+    if multiline:
+        lines = json.dumps(items, indent=1).splitlines()
+        return [line.encode() for line in lines]
+    return [json.dumps(items).encode()]
+
+
+def make_stream(scenario: Scenario) -> bytes:
+    size = EVENT_SIZES[scenario.event_size]
+    eol = LINE_ENDINGS[scenario.line_ending]
+    data = _payload(size, scenario.multiline)
+
+    event = b"event: message" + eol
+    for line in data:
+        event += b"data: " + line + eol
+    event += eol
+
+    count = max(1, scenario.total_size // len(event))
+    return b"".join(b"id: %d" % i + eol + event for i in range(count)) + b": end" + eol
+
+
+def make_chunks(scenario: Scenario, stream: bytes) -> List[bytes]:
+    chunk_size = CHUNK_SIZES[scenario.chunking]
+    if not chunk_size:
+        return [stream]
+    return [stream[i : i + chunk_size] for i in range(0, len(stream), chunk_size)]
+
+
+SCENARIOS = [
+    *[
+        Scenario(event_size, chunking)
+        for event_size in EVENT_SIZES
+        for chunking in CHUNK_SIZES
+        # Too slow to be practical.
+        if (event_size, chunking) != ("1m", "1b")
+    ],
+    Scenario("1k", "mtu", line_ending="crlf"),
+    Scenario("1k", "mtu", line_ending="cr"),
+    Scenario("1k", "mtu", multiline=True),
+    Scenario("1m", "whole", multiline=True),
+]
+
+# Keep 1-byte chunking runs short.
+SCENARIOS = [
+    s._replace(total_size=64 * 1024) if s.chunking == "1b" else s for s in SCENARIOS
+]
@@ -1,6 +1,18 @@
 from ._api import EventSource, aconnect_sse, connect_sse
-from ._exceptions import SSEError
-from ._models import ServerSentEvent
+from ._broadcast import SSEBroadcaster, SSEBroadcastReader
+from ._direct import DirectEventSource, aconnect_sse_direct
+from ._encoders import SSEEncoder
+from ._exceptions import SSEError, SSEIdleTimeout
+from ._hub import SSEHub, SSESubscription
+from ._instrumentation import OpenTelemetryObserver, SSEObserver, SSEStats
+from ._models import RawServerSentEvent, ServerSentEvent
+from ._multiplex import SSEMultiplexer
+from ._parser import SSEParser
+from ._reconnect import ReconnectPolicy
+from ._responses import ASGIEventStream, WSGIEventStream
+from ._sharding import SSEShardPool
+from ._spool import SSESpool
+from ._streaming import StreamingServerSentEvent
 
 __version__ = "0.4.3"
 
@@ -10,5 +22,25 @@ __all__ = [
     "connect_sse",
     "aconnect_sse",
     "ServerSentEvent",
+    "RawServerSentEvent",
+    "StreamingServerSentEvent",
     "SSEError",
+    "SSEIdleTimeout",
+    "ReconnectPolicy",
+    "SSEMultiplexer",
+    "SSEEncoder",
+    "ASGIEventStream",
+    "WSGIEventStream",
+    "SSEObserver",
+    "SSEStats",
+    "OpenTelemetryObserver",
+    "SSESpool",
+    "SSEParser",
+    "DirectEventSource",
+    "aconnect_sse_direct",
+    "SSEShardPool",
+    "SSEBroadcaster",
+    "SSEBroadcastReader",
+    "SSEHub",
+    "SSESubscription",
 ]
@@ -1,63 +1,416 @@
+import contextlib
+import inspect
+import socket
+import time
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager, contextmanager
-from typing import Any, AsyncIterator, Iterator, cast
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    cast,
+)
 
 import httpx
 
-from ._decoders import SSEDecoder, SSELineDecoder
-from ._exceptions import SSEError
-from ._models import ServerSentEvent
+from ._buffering import _aiter_buffered, _ConflatingBuffer, _EventBuffer
+from ._compression import (
+    ACCEPT_ENCODING,
+    _aiter_decompressed,
+    _DecompressionStats,
+    _get_decoder,
+    _iter_decompressed,
+)
+from ._decoders import SSELineDecoder, _utf8_decoder
+from ._exceptions import SSEError, SSEIdleTimeout
+from ._instrumentation import SSEObserver, _ObservedChunkDecoder
+from ._models import JSONLoads, ServerSentEvent
+from ._parser import SSEParser
+from ._pipelining import _iter_pipelined
+from ._reconnect import ReconnectPolicy, _Reconnector
+from ._spool import SSESpool
+from ._streaming import (
+    StreamingServerSentEvent,
+    _aiter_streaming_events,
+    _iter_streaming_events,
+)
 
 
 class EventSource:
-    def __init__(self, response: httpx.Response) -> None:
+    def __init__(
+        self,
+        response: httpx.Response,
+        *,
+        json_loads: Optional[JSONLoads] = None,
+        max_line_size: Optional[int] = None,
+        max_event_size: Optional[int] = None,
+        event_types: Optional[Iterable[str]] = None,
+        observer: Optional[SSEObserver] = None,
+        spool: Optional[SSESpool] = None,
+    ) -> None:
         self._response = response
+        # NOTE: the parser outlives the response, so that the last event ID and
+        # reconnection time are kept when reconnecting.
+        self._parser = SSEParser(
+            json_loads=json_loads,
+            max_line_size=max_line_size,
+            max_event_size=max_event_size,
+            event_types=event_types,
+            # Resume from the checkpoint.
+            last_event_id="" if spool is None else spool.last_event_id,
+        )
+        self._spool = spool
+        self._max_line_size = max_line_size
+        self._max_event_size = max_event_size
+        self._last_activity = time.monotonic()
+        self._observer = observer
+        self._decompression = _DecompressionStats()
+        self._reconnector: Optional[_Reconnector] = None
+        self._buffer: Optional[_EventBuffer] = None
 
     def _check_content_type(self) -> None:
-        content_type = self._response.headers.get("content-type", "").partition(";")[0]
-        if "text/event-stream" not in content_type:
-            raise SSEError(
-                "Expected response header Content-Type to contain 'text/event-stream', "
-                f"got {content_type!r}"
-            )
+        _check_content_type(self._response)
 
     @property
     def response(self) -> httpx.Response:
         return self._response
 
+    @property
+    def last_activity(self) -> float:
+        return self._last_activity
+
+    @property
+    def observer(self) -> Optional[SSEObserver]:
+        return self._observer
+
+    @property
+    def spool(self) -> Optional[SSESpool]:
+        return self._spool
+
+    @property
+    def compression_ratio(self) -> Optional[float]:
+        return self._decompression.ratio
+
+    @property
+    def decompression_time(self) -> float:
+        return self._decompression.time
+
+    @property
+    def reconnects(self) -> int:
+        return 0 if self._reconnector is None else self._reconnector.count
+
+    @property
+    def reconnect_latency(self) -> Optional[float]:
+        return None if self._reconnector is None else self._reconnector.latency
+
+    @property
+    def event_counts(self) -> Dict[str, int]:
+        return self._parser.event_counts
+
+    @property
+    def dropped_events(self) -> int:
+        return 0 if self._buffer is None else self._buffer.dropped
+
+    @property
+    def buffer_high_water_mark(self) -> int:
+        return 0 if self._buffer is None else self._buffer.high_water_mark
+
     def iter_sse(self) -> Iterator[ServerSentEvent]:
-        self._check_content_type()
-        decoder = SSEDecoder()
-        for line in _iter_sse_lines(self._response):
-            line = line.rstrip("\n")
-            sse = decoder.decode(line)
-            if sse is not None:
-                yield sse
+        for batch in self.iter_sse_batches():
+            yield from batch
 
     async def aiter_sse(self) -> AsyncGenerator[ServerSentEvent, None]:
-        self._check_content_type()
-        decoder = SSEDecoder()
-        lines = cast(AsyncGenerator[str, None], _aiter_sse_lines(self._response))
+        batches = cast(
+            AsyncGenerator[List[ServerSentEvent], None], self.aiter_sse_batches()
+        )
         try:
-            async for line in lines:
-                line = line.rstrip("\n")
-                sse = decoder.decode(line)
-                if sse is not None:
+            async for batch in batches:
+                for sse in batch:
                     yield sse
         finally:
-            await lines.aclose()
+            await batches.aclose()
+
+    def _chunk_decode_function(self) -> Callable[[bytes], List[ServerSentEvent]]:
+        # Instrumentation has no cost unless an observer is set.
+        if self._observer is None:
+            return self._parser.feed
+        return _ObservedChunkDecoder(self._observer, self._parser).decode
+
+    def _iter_chunks(self) -> Iterator[bytes]:
+        response = self._response
+        decoder = _get_decoder(response)
+        if decoder is None:
+            return response.iter_bytes()
+        return _iter_decompressed(response.iter_raw(), decoder, self._decompression)
+
+    def _aiter_chunks(self) -> AsyncIterator[bytes]:
+        response = self._response
+        decoder = _get_decoder(response)
+        if decoder is None:
+            return response.aiter_bytes()
+        return _aiter_decompressed(response.aiter_raw(), decoder, self._decompression)
+
+    def _iter_batches(self) -> Iterator[List[ServerSentEvent]]:
+        decode = self._chunk_decode_function()
+        for chunk in self._iter_chunks():
+            self._last_activity = time.monotonic()
+            events = decode(chunk)
+            if events:
+                yield events
+
+    async def _aiter_batches(self) -> AsyncIterator[List[ServerSentEvent]]:
+        decode = self._chunk_decode_function()
+        async for chunk in self._aiter_chunks():
+            self._last_activity = time.monotonic()
+            events = decode(chunk)
+            if events:
+                yield events
+
+    def _raise_idle_timeout(self, exc: httpx.TransportError) -> None:
+        if isinstance(exc, httpx.ReadTimeout):
+            idle = time.monotonic() - self._last_activity
+            raise SSEIdleTimeout(
+                f"No data received from the server for {idle:.1f} seconds"
+            ) from exc
+
+    def iter_sse_batches(
+        self, max_size: Optional[int] = None
+    ) -> Iterator[List[ServerSentEvent]]:
+        _check_max_size(max_size)
+        reconnector = self._reconnector
+        observer = self._observer
+        spool = self._spool
+
+        while True:
+            try:
+                self._check_content_type()
+                for events in self._iter_batches():
+                    if reconnector is not None:
+                        reconnector.failures = 0
+                    if spool is not None:
+                        spool.append(events, self._parser.last_event_id)
+                    for batch in _split_batch(events, max_size):
+                        if observer is None:
+                            yield batch
+                        else:
+                            yielded = time.perf_counter()
+                            yield batch
+                            observer.on_consumer_lag(time.perf_counter() - yielded)
+                return
+            except httpx.TransportError as exc:
+                if reconnector is None:
+                    self._raise_idle_timeout(exc)
+                    raise
+                self._response = reconnector.reconnect(
+                    exc, self._response, self._parser
+                )
+                if observer is not None:
+                    observer.on_reconnect(cast(float, reconnector.latency))
+
+    async def aiter_sse_batches(
+        self, max_size: Optional[int] = None
+    ) -> AsyncGenerator[List[ServerSentEvent], None]:
+        _check_max_size(max_size)
+        reconnector = self._reconnector
+        observer = self._observer
+        spool = self._spool
+
+        while True:
+            try:
+                self._check_content_type()
+                batches = cast(
+                    AsyncGenerator[List[ServerSentEvent], None],
+                    self._aiter_batches(),
+                )
+                try:
+                    async for events in batches:
+                        if reconnector is not None:
+                            reconnector.failures = 0
+                        if spool is not None:
+                            spool.append(events, self._parser.last_event_id)
+                        for batch in _split_batch(events, max_size):
+                            if observer is None:
+                                yield batch
+                            else:
+                                yielded = time.perf_counter()
+                                yield batch
+                                observer.on_consumer_lag(time.perf_counter() - yielded)
+                finally:
+                    await batches.aclose()
+                return
+            except httpx.TransportError as exc:
+                if reconnector is None:
+                    self._raise_idle_timeout(exc)
+                    raise
+                self._response = await reconnector.areconnect(
+                    exc, self._response, self._parser
+                )
+                if observer is not None:
+                    observer.on_reconnect(cast(float, reconnector.latency))
+
+    def aiter_sse_buffered(
+        self, max_size: int = 1024, overflow: str = "block"
+    ) -> AsyncGenerator[ServerSentEvent, None]:
+        buffer = _EventBuffer(max_size, overflow)
+        self._buffer = buffer
+        batches = cast(
+            AsyncGenerator[List[ServerSentEvent], None], self.aiter_sse_batches()
+        )
+        return cast(
+            AsyncGenerator[ServerSentEvent, None], _aiter_buffered(batches, buffer)
+        )
+
+    def aiter_sse_conflated(
+        self,
+        key: Optional[Callable[[ServerSentEvent], Any]] = None,
+        max_size: int = 1024,
+    ) -> AsyncGenerator[ServerSentEvent, None]:
+        buffer = _ConflatingBuffer(_event_type if key is None else key, max_size)
+        self._buffer = buffer
+        batches = cast(
+            AsyncGenerator[List[ServerSentEvent], None], self.aiter_sse_batches()
+        )
+        return cast(
+            AsyncGenerator[ServerSentEvent, None], _aiter_buffered(batches, buffer)
+        )
+
+    def iter_sse_pipelined(self, max_size: int = 16) -> Iterator[ServerSentEvent]:
+        _check_max_size(max_size)
+        return _iter_pipelined(self.iter_sse_batches, self._interrupt, max_size)
+
+    def _interrupt(self) -> None:
+        # Unblock a read from another thread, by shutting down the connection: closing
+        # the socket is not enough. The connection of an HTTP/2 response may be shared
+        # with other requests, so it is left alone.
+        response = self._response
+        if response.http_version == "HTTP/2":
+            return
+        network_stream = response.extensions.get("network_stream")
+        if network_stream is None:
+            return
+        sock = network_stream.get_extra_info("socket")
+        if sock is not None:
+            with contextlib.suppress(OSError):
+                sock.shutdown(socket.SHUT_RDWR)
+
+    def dispatch(
+        self, handlers: Mapping[str, Callable[[ServerSentEvent], Any]]
+    ) -> None:
+        event_types = self._parser.event_types
+        self._parser.event_types = frozenset(handlers)
+        try:
+            for sse in self.iter_sse():
+                handlers[sse.event](sse)
+        finally:
+            self._parser.event_types = event_types
+
+    async def adispatch(
+        self, handlers: Mapping[str, Callable[[ServerSentEvent], Any]]
+    ) -> None:
+        event_types = self._parser.event_types
+        self._parser.event_types = frozenset(handlers)
+        events = cast(AsyncGenerator[ServerSentEvent, None], self.aiter_sse())
+        try:
+            async for sse in events:
+                result = handlers[sse.event](sse)
+                if inspect.isawaitable(result):
+                    await result
+        finally:
+            await events.aclose()
+            self._parser.event_types = event_types
+
+    def iter_sse_streaming(self) -> Iterator[StreamingServerSentEvent]:
+        self._check_content_type()
+        yield from _iter_streaming_events(
+            self._iter_chunks(), self._max_line_size, self._max_event_size
+        )
+
+    async def aiter_sse_streaming(
+        self,
+    ) -> AsyncGenerator[StreamingServerSentEvent, None]:
+        self._check_content_type()
+        events = cast(
+            AsyncGenerator[StreamingServerSentEvent, None],
+            _aiter_streaming_events(
+                self._aiter_chunks(),
+                self._max_line_size,
+                self._max_event_size,
+            ),
+        )
+        try:
+            async for sse in events:
+                yield sse
+        finally:
+            await events.aclose()
 
 
 @contextmanager
 def connect_sse(
-    client: httpx.Client, method: str, url: str, **kwargs: Any
+    client: httpx.Client,
+    method: str,
+    url: str,
+    *,
+    reconnect: Optional[ReconnectPolicy] = None,
+    json_loads: Optional[JSONLoads] = None,
+    max_line_size: Optional[int] = None,
+    max_event_size: Optional[int] = None,
+    event_types: Optional[Iterable[str]] = None,
+    idle_timeout: Optional[float] = None,
+    observer: Optional[SSEObserver] = None,
+    spool: Optional[SSESpool] = None,
+    compression: Optional[bool] = None,
+    **kwargs: Any,
 ) -> Iterator[EventSource]:
     headers = kwargs.pop("headers", {})
     headers["Accept"] = "text/event-stream"
     headers["Cache-Control"] = "no-store"
+    if spool is not None and spool.last_event_id:
+        headers["Last-Event-ID"] = spool.last_event_id
+    if compression is not None:
+        headers["Accept-Encoding"] = ACCEPT_ENCODING if compression else "identity"
+    if idle_timeout is not None:
+        kwargs["timeout"] = _with_read_timeout(
+            kwargs.get("timeout", client.timeout), idle_timeout
+        )
 
     with client.stream(method, url, headers=headers, **kwargs) as response:
-        yield EventSource(response)
+        event_source = EventSource(
+            response,
+            json_loads=json_loads,
+            max_line_size=max_line_size,
+            max_event_size=max_event_size,
+            event_types=event_types,
+            observer=observer,
+            spool=spool,
+        )
+
+        if reconnect is None:
+            yield event_source
+            return
+
+        send_kwargs = _pop_send_kwargs(kwargs)
+
+        def connect(last_event_id: str) -> httpx.Response:
+            request = client.build_request(
+                method,
+                url,
+                headers=_reconnect_headers(headers, last_event_id),
+                **kwargs,
+            )
+            return client.send(request, stream=True, **send_kwargs)
+
+        event_source._reconnector = _Reconnector(reconnect, connect=connect)
+        try:
+            yield event_source
+        finally:
+            # May be a response from a reconnection.
+            event_source.response.close()
 
 
 @asynccontextmanager
@@ -65,29 +418,138 @@ async def aconnect_sse(
     client: httpx.AsyncClient,
     method: str,
     url: str,
+    *,
+    reconnect: Optional[ReconnectPolicy] = None,
+    json_loads: Optional[JSONLoads] = None,
+    max_line_size: Optional[int] = None,
+    max_event_size: Optional[int] = None,
+    event_types: Optional[Iterable[str]] = None,
+    idle_timeout: Optional[float] = None,
+    observer: Optional[SSEObserver] = None,
+    spool: Optional[SSESpool] = None,
+    compression: Optional[bool] = None,
     **kwargs: Any,
 ) -> AsyncIterator[EventSource]:
     headers = kwargs.pop("headers", {})
     headers["Accept"] = "text/event-stream"
     headers["Cache-Control"] = "no-store"
+    if spool is not None and spool.last_event_id:
+        headers["Last-Event-ID"] = spool.last_event_id
+    if compression is not None:
+        headers["Accept-Encoding"] = ACCEPT_ENCODING if compression else "identity"
+    if idle_timeout is not None:
+        kwargs["timeout"] = _with_read_timeout(
+            kwargs.get("timeout", client.timeout), idle_timeout
+        )
 
     async with client.stream(method, url, headers=headers, **kwargs) as response:
-        yield EventSource(response)
+        event_source = EventSource(
+            response,
+            json_loads=json_loads,
+            max_line_size=max_line_size,
+            max_event_size=max_event_size,
+            event_types=event_types,
+            observer=observer,
+            spool=spool,
+        )
+
+        if reconnect is None:
+            yield event_source
+            return
+
+        send_kwargs = _pop_send_kwargs(kwargs)
+
+        async def aconnect(last_event_id: str) -> httpx.Response:
+            request = client.build_request(
+                method,
+                url,
+                headers=_reconnect_headers(headers, last_event_id),
+                **kwargs,
+            )
+            return await client.send(request, stream=True, **send_kwargs)
+
+        event_source._reconnector = _Reconnector(reconnect, aconnect=aconnect)
+        try:
+            yield event_source
+        finally:
+            # May be a response from a reconnection.
+            await event_source.response.aclose()
+
+
+def _pop_send_kwargs(kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    # Options of `client.stream()` that go to `client.send()` rather than to
+    # `client.build_request()`.
+    return {
+        key: kwargs.pop(key) for key in ("auth", "follow_redirects") if key in kwargs
+    }
+
+
+def _with_read_timeout(timeout: Any, read: float) -> httpx.Timeout:
+    timeout = httpx.Timeout(timeout)
+    return httpx.Timeout(
+        connect=timeout.connect, read=read, write=timeout.write, pool=timeout.pool
+    )
+
+
+def _reconnect_headers(headers: Any, last_event_id: str) -> httpx.Headers:
+    headers = httpx.Headers(headers)
+    if last_event_id:
+        headers["Last-Event-ID"] = last_event_id
+    return headers
+
+
+# NOTE: as per the SSE spec, streams are always decoded as UTF-8, regardless of any
+# `charset` in the `Content-Type`, so HTTPX's text decoding is bypassed.
 
 
 async def _aiter_sse_lines(response: httpx.Response) -> AsyncIterator[str]:
     decoder = SSELineDecoder()
-    async for text in response.aiter_text():
-        for line in decoder.decode(text):
+    text_decoder = _utf8_decoder()
+    async for chunk in response.aiter_bytes():
+        for line in decoder.decode(text_decoder.decode(chunk)):
             yield line
+    # Replace any incomplete UTF-8 sequence at the end.
+    decoder.decode(text_decoder.decode(b"", True))
     for line in decoder.flush():
         yield line
 
 
 def _iter_sse_lines(response: httpx.Response) -> Iterator[str]:
     decoder = SSELineDecoder()
-    for text in response.iter_text():
-        for line in decoder.decode(text):
+    text_decoder = _utf8_decoder()
+    for chunk in response.iter_bytes():
+        for line in decoder.decode(text_decoder.decode(chunk)):
             yield line
+    # Replace any incomplete UTF-8 sequence at the end.
+    decoder.decode(text_decoder.decode(b"", True))
     for line in decoder.flush():
         yield line
+
+
+def _check_content_type(response: httpx.Response) -> None:
+    content_type = response.headers.get("content-type", "").partition(";")[0]
+    if "text/event-stream" not in content_type:
+        raise SSEError(
+            "Expected response header Content-Type to contain 'text/event-stream', "
+            f"got {content_type!r}"
+        )
+
+
+def _event_type(sse: ServerSentEvent) -> str:
+    return sse.event
+
+
+def _check_max_size(max_size: Optional[int]) -> None:
+    if max_size is not None and max_size < 1:
+        raise ValueError(f"max_size must be a positive integer, got {max_size!r}")
+
+
+def _split_batch(
+    events: List[ServerSentEvent], max_size: Optional[int]
+) -> Iterator[List[ServerSentEvent]]:
+    if max_size is None or len(events) <= max_size:
+        yield events
+        return
+
+    for start in range(0, len(events), max_size):
+        yield events[start : start + max_size]
@@ -0,0 +1,323 @@
+import asyncio
+import struct
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    cast,
+)
+
+from ._api import EventSource
+from ._models import JSONLoads, ServerSentEvent
+
+# The ring starts with a header: capacity, write position, tail position, and
+# whether the broadcaster is closed. Positions only ever increase, the offset in
+# the ring being the position modulo the capacity.
+_HEADER = struct.Struct("<QQQQ")
+_POSITION = struct.Struct("<Q")
+_WRITE_POSITION = 8
+_TAIL = 16
+_CLOSED = 24
+
+# Each record is a header, followed by the event type, ID and data bytes:
+# sequence number, event length, ID length, data length, retry (-1 for none).
+# Records are 8-byte aligned, and never wrap around the end of the ring.
+_RECORD = struct.Struct("<QIIIq")
+# Sequence number of a record that skips to the start of the ring.
+_WRAP = 2**64 - 1
+
+
+def _aligned(size: int) -> int:
+    return (size + 7) & ~7
+
+
+class SSEBroadcaster:
+    """
+    Broadcasts events to readers in other processes, through a ring buffer in
+    shared memory.
+
+    Events are written without waiting for readers: a reader that falls behind by
+    more than the size of the ring skips forward to the oldest event left.
+    """
+
+    def __init__(
+        self, name: Optional[str] = None, *, size: int = 16 * 1024 * 1024
+    ) -> None:
+        capacity = (size - _HEADER.size) & ~7
+        if capacity < _RECORD.size:
+            raise ValueError(f"size is too small, got {size!r}")
+
+        self._memory = shared_memory.SharedMemory(name, create=True, size=size)
+        self._buffer = self._memory.buf
+        self._capacity = capacity
+        self._position = 0
+        self._tail = 0
+        self._seq = 0
+        _HEADER.pack_into(self._buffer, 0, capacity, 0, 0, 0)
+
+    @property
+    def name(self) -> str:
+        return self._memory.name
+
+    def _release(self, limit: int) -> None:
+        # Move the tail past the records that are about to be overwritten.
+        limit -= self._capacity
+        tail = self._tail
+        if tail >= limit:
+            return
+
+        buffer = self._buffer
+        capacity = self._capacity
+        while tail < limit:
+            offset = tail % capacity
+            remaining = capacity - offset
+            if remaining < _RECORD.size:
+                tail += remaining
+                continue
+            seq, event_size, id_size, data_size, _ = _RECORD.unpack_from(
+                buffer, _HEADER.size + offset
+            )
+            if seq == _WRAP:
+                tail += remaining
+            else:
+                tail += _aligned(_RECORD.size + event_size + id_size + data_size)
+
+        self._tail = tail
+        # Published before the records are overwritten, so that readers can tell.
+        _POSITION.pack_into(buffer, _TAIL, tail)
+
+    def publish(self, events: Iterable[ServerSentEvent]) -> None:
+        """
+        Write events to the ring, and make them visible to readers at once.
+        """
+        buffer = self._buffer
+        capacity = self._capacity
+        position = self._position
+
+        for sse in events:
+            event = sse.event.encode("utf-8")
+            id = sse.id.encode("utf-8")
+            raw_data = sse._raw_data
+            data = sse.data.encode("utf-8") if raw_data is None else raw_data
+            size = _aligned(_RECORD.size + len(event) + len(id) + len(data))
+            if size > capacity:
+                raise ValueError(
+                    f"Event of {size} bytes does not fit in a ring of {capacity} bytes"
+                )
+
+            offset = position % capacity
+            remaining = capacity - offset
+            if remaining < size:
+                self._release(position + remaining)
+                if remaining >= _RECORD.size:
+                    _RECORD.pack_into(buffer, _HEADER.size + offset, _WRAP, 0, 0, 0, -1)
+                position += remaining
+                offset = 0
+
+            self._release(position + size)
+            start = _HEADER.size + offset
+            retry = -1 if sse.retry is None else sse.retry
+            _RECORD.pack_into(
+                buffer, start, self._seq, len(event), len(id), len(data), retry
+            )
+            start += _RECORD.size
+            buffer[start : start + len(event)] = event
+            start += len(event)
+            buffer[start : start + len(id)] = id
+            start += len(id)
+            buffer[start : start + len(data)] = data
+            position += size
+            self._seq += 1
+
+        self._position = position
+        _POSITION.pack_into(buffer, _WRITE_POSITION, position)
+
+    def run(self, event_source: EventSource) -> None:
+        """
+        Publish all events of an event source, one batch at a time.
+        """
+        for events in event_source.iter_sse_batches():
+            self.publish(events)
+
+    async def arun(self, event_source: EventSource) -> None:
+        """
+        An async equivalent to `run()`.
+        """
+        batches = cast(
+            AsyncGenerator[List[ServerSentEvent], None],
+            event_source.aiter_sse_batches(),
+        )
+        try:
+            async for events in batches:
+                self.publish(events)
+        finally:
+            await batches.aclose()
+
+    def close(self) -> None:
+        """
+        Signal the end of the stream to readers, and free the shared memory.
+        """
+        if self._memory.buf is None:
+            return
+        _POSITION.pack_into(self._buffer, _CLOSED, 1)
+        del self._buffer
+        self._memory.close()
+        self._memory.unlink()
+
+    def __enter__(self) -> "SSEBroadcaster":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):  # pragma: no cover
+        return shared_memory.SharedMemory(name, track=False)
+    memory = shared_memory.SharedMemory(name)
+    # Otherwise, the memory would be unlinked when the reader exits.
+    resource_tracker.unregister(memory._name, "shared_memory")  # type: ignore[attr-defined]
+    return memory
+
+
+class SSEBroadcastReader:
+    """
+    Reads the events of an `SSEBroadcaster`, from those published after it was
+    attached.
+    """
+
+    def __init__(self, name: str, *, json_loads: Optional[JSONLoads] = None) -> None:
+        self._memory = _attach(name)
+        self._buffer = self._memory.buf
+        self._capacity, self._cursor, _, _ = _HEADER.unpack_from(self._buffer, 0)
+        self._json_loads = json_loads
+        self._seq: Optional[int] = None
+        self._skipped = 0
+
+    @property
+    def skipped(self) -> int:
+        """
+        The number of events that were missed because the reader fell behind.
+        """
+        return self._skipped
+
+    @property
+    def closed(self) -> bool:
+        return _POSITION.unpack_from(self._buffer, _CLOSED)[0] == 1
+
+    def read(self) -> List[ServerSentEvent]:
+        """
+        Return the events published since the last read, without waiting.
+        """
+        buffer = self._buffer
+        capacity = self._capacity
+        unpack_from = _RECORD.unpack_from
+        position = _POSITION.unpack_from(buffer, _WRITE_POSITION)[0]
+        # Skip forward if the writer overwrote unread records.
+        cursor = max(self._cursor, _POSITION.unpack_from(buffer, _TAIL)[0])
+
+        records: List[Tuple[int, int, bytes, bytes, bytes, int]] = []
+        while cursor < position:
+            offset = cursor % capacity
+            remaining = capacity - offset
+            if remaining < _RECORD.size:
+                cursor += remaining
+                continue
+            start = _HEADER.size + offset
+            seq, event_size, id_size, data_size, retry = unpack_from(buffer, start)
+            if seq == _WRAP:
+                cursor += remaining
+                continue
+            size = _aligned(_RECORD.size + event_size + id_size + data_size)
+            if size > remaining:
+                # The header was being overwritten.
+                break
+            start += _RECORD.size
+            id_start = start + event_size
+            data_start = id_start + id_size
+            records.append(
+                (
+                    cursor,
+                    seq,
+                    bytes(buffer[start:id_start]),
+                    bytes(buffer[id_start:data_start]),
+                    bytes(buffer[data_start : data_start + data_size]),
+                    retry,
+                )
+            )
+            cursor += size
+
+        # Records that were overwritten while being copied are discarded.
+        tail = _POSITION.unpack_from(buffer, _TAIL)[0]
+        self._cursor = max(cursor, tail)
+
+        events = []
+        from_bytes = ServerSentEvent._from_bytes
+        json_loads = self._json_loads
+        for record_position, seq, event, id, data, retry in records:
+            if record_position < tail:
+                continue
+            if self._seq is not None and seq != self._seq:
+                self._skipped += seq - self._seq
+            self._seq = seq + 1
+            events.append(
+                from_bytes(
+                    event.decode("utf-8"),
+                    data,
+                    id.decode("utf-8"),
+                    None if retry < 0 else retry,
+                    json_loads,
+                )
+            )
+        return events
+
+    def iter_sse(self, poll_interval: float = 0.001) -> Iterator[ServerSentEvent]:
+        """
+        Yield events as they are published, until the broadcaster is closed.
+        """
+        while True:
+            closed = self.closed
+            events = self.read()
+            if events:
+                yield from events
+            elif closed:
+                return
+            else:
+                time.sleep(poll_interval)
+
+    async def aiter_sse(
+        self, poll_interval: float = 0.001
+    ) -> AsyncIterator[ServerSentEvent]:
+        """
+        An async equivalent to `iter_sse()`.
+        """
+        while True:
+            closed = self.closed
+            events = self.read()
+            if events:
+                for sse in events:
+                    yield sse
+            elif closed:
+                return
+            else:
+                await asyncio.sleep(poll_interval)
+
+    def close(self) -> None:
+        if self._memory.buf is None:
+            return
+        del self._buffer
+        self._memory.close()
+
+    def __enter__(self) -> "SSEBroadcastReader":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
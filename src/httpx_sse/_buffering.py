@@ -0,0 +1,146 @@
+import asyncio
+from collections import OrderedDict, deque
+from typing import Any, AsyncGenerator, AsyncIterator, Callable, Deque, List
+
+from ._models import ServerSentEvent
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_newest", "coalesce")
+
+
+class _EventBuffer:
+    """
+    A bounded FIFO buffer of events, which applies an overflow policy when full:
+
+    * "block" - Refuse new events until there is room again.
+    * "drop_oldest" - Discard the oldest buffered event.
+    * "drop_newest" - Discard the new event.
+    * "coalesce" - Replace the latest buffered event of the same type, if any, or
+      else discard the oldest buffered event.
+    """
+
+    def __init__(self, max_size: int, overflow: str = "block") -> None:
+        if max_size < 1:
+            raise ValueError(f"max_size must be a positive integer, got {max_size!r}")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"overflow must be one of {OVERFLOW_POLICIES!r}, got {overflow!r}"
+            )
+
+        self._events: Deque[ServerSentEvent] = deque()
+        self.max_size = max_size
+        self.overflow = overflow
+        self.high_water_mark = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def push(self, sse: ServerSentEvent) -> bool:
+        """
+        Add an event to the buffer, or return `False` if the caller must wait for
+        room to be made.
+        """
+        events = self._events
+
+        if len(events) >= self.max_size:
+            if self.overflow == "block":
+                return False
+
+            self.dropped += 1
+
+            if self.overflow == "drop_newest":
+                return True
+
+            if self.overflow == "coalesce":
+                for index in range(len(events) - 1, -1, -1):
+                    if events[index].event == sse.event:
+                        events[index] = sse
+                        return True
+
+            events.popleft()
+
+        events.append(sse)
+        if len(events) > self.high_water_mark:
+            self.high_water_mark = len(events)
+        return True
+
+    def pop(self) -> ServerSentEvent:
+        return self._events.popleft()
+
+
+class _ConflatingBuffer(_EventBuffer):
+    """
+    A buffer that keeps only the newest event per key, at the position of the
+    first buffered event with this key, so that frequently updated keys are not
+    delayed. New keys are refused while `max_size` keys are buffered.
+    """
+
+    def __init__(self, key: Callable[[ServerSentEvent], Any], max_size: int) -> None:
+        super().__init__(max_size)
+        self.key = key
+        self._latest: "OrderedDict[Any, ServerSentEvent]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._latest)
+
+    def push(self, sse: ServerSentEvent) -> bool:
+        latest = self._latest
+        key = self.key(sse)
+
+        if key in latest:
+            latest[key] = sse
+            self.dropped += 1
+            return True
+
+        if len(latest) >= self.max_size:
+            return False
+
+        latest[key] = sse
+        if len(latest) > self.high_water_mark:
+            self.high_water_mark = len(latest)
+        return True
+
+    def pop(self) -> ServerSentEvent:
+        return self._latest.popitem(last=False)[1]
+
+
+async def _aiter_buffered(
+    batches: AsyncGenerator[List[ServerSentEvent], None], buffer: _EventBuffer
+) -> AsyncIterator[ServerSentEvent]:
+    """
+    Read events from `batches` into `buffer` in a background task, while yielding
+    buffered events.
+    """
+    not_empty = asyncio.Event()
+    not_full = asyncio.Event()
+
+    async def read() -> None:
+        try:
+            async for batch in batches:
+                for sse in batch:
+                    while not buffer.push(sse):
+                        not_full.clear()
+                        await not_full.wait()
+                not_empty.set()
+        finally:
+            await batches.aclose()
+            not_empty.set()
+
+    task = asyncio.get_running_loop().create_task(read())
+
+    try:
+        while True:
+            if buffer:
+                sse = buffer.pop()
+                not_full.set()
+                yield sse
+            elif task.done():
+                # Propagate any error from reading.
+                task.result()
+                return
+            else:
+                not_empty.clear()
+                await not_empty.wait()
+    finally:
+        task.cancel()
+        await asyncio.wait([task])
@@ -0,0 +1,119 @@
+import time
+import zlib
+from typing import Any, AsyncIterator, Iterator, Optional
+
+import httpx
+
+# Encodings that are decompressed here rather than by HTTPX, so that the cost of
+# decompression can be measured.
+_WBITS = {"gzip": zlib.MAX_WBITS | 16, "deflate": zlib.MAX_WBITS}
+
+ACCEPT_ENCODING = ", ".join(_WBITS)
+
+
+class _DecompressionStats:
+    def __init__(self) -> None:
+        self.raw_bytes = 0
+        self.decoded_bytes = 0
+        self.time = 0.0
+
+    @property
+    def ratio(self) -> Optional[float]:
+        if not self.raw_bytes:
+            return None
+        return self.decoded_bytes / self.raw_bytes
+
+
+class _ZlibDecoder:
+    """
+    Incrementally decompresses gzip or deflate content.
+
+    All the output available for a chunk is returned at once, so events that the
+    server flushed are not delayed until more compressed data arrives.
+    """
+
+    def __init__(self, encoding: str) -> None:
+        self._encoding = encoding
+        self._decompressor: Any = zlib.decompressobj(_WBITS[encoding])
+        self._first_chunk = True
+
+    def decode(self, data: bytes) -> bytes:
+        first_chunk = self._first_chunk
+        self._first_chunk = False
+        try:
+            return self._decompressor.decompress(data)
+        except zlib.error as exc:
+            if self._encoding == "deflate" and first_chunk:
+                # Some servers send raw deflate data, without a zlib header.
+                self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                return self.decode(data)
+            raise httpx.DecodingError(str(exc)) from exc
+
+
+def _get_decoder(response: httpx.Response) -> Optional[_ZlibDecoder]:
+    encoding = response.headers.get("content-encoding", "").strip().lower()
+    if encoding not in _WBITS:
+        return None
+    return _ZlibDecoder(encoding)
+
+
+def _iter_decompressed(
+    chunks: Iterator[bytes], decoder: _ZlibDecoder, stats: _DecompressionStats
+) -> Iterator[bytes]:
+    for chunk in chunks:
+        started = time.perf_counter()
+        data = decoder.decode(chunk)
+        stats.time += time.perf_counter() - started
+        stats.raw_bytes += len(chunk)
+        stats.decoded_bytes += len(data)
+        if data:
+            yield data
+
+
+async def _aiter_decompressed(
+    chunks: AsyncIterator[bytes], decoder: _ZlibDecoder, stats: _DecompressionStats
+) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        started = time.perf_counter()
+        data = decoder.decode(chunk)
+        stats.time += time.perf_counter() - started
+        stats.raw_bytes += len(chunk)
+        stats.decoded_bytes += len(data)
+        if data:
+            yield data
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Return whether an `Accept-Encoding` request header allows gzip.
+    """
+    qualities = {}
+    for item in accept_encoding.split(","):
+        coding, *params = item.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+class _GzipCompressor:
+    """
+    Compresses bodies of a response, flushing after each one so that the client
+    can decode every event as soon as it is received.
+    """
+
+    def __init__(self) -> None:
+        self._compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+
+    def compress(self, body: bytes) -> bytes:
+        compressor = self._compressor
+        return compressor.compress(body) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
@@ -1,6 +1,21 @@
-from typing import List, Optional
+import codecs
+from collections import deque
+from typing import Dict, FrozenSet, Generic, Iterable, List, Optional, TypeVar, cast
 
-from ._models import ServerSentEvent
+from ._exceptions import SSEError
+from ._models import JSONLoads, RawServerSentEvent, ServerSentEvent
+
+_LF = ord("\n")
+_CR = ord("\r")
+
+# As per the SSE spec, one leading byte order mark is ignored.
+_BOM = codecs.BOM_UTF8
+
+_Event = TypeVar("_Event")
+
+# Stands in for the data lines of events that are filtered out: appending to a
+# zero-length deque is a no-op.
+_DISCARD = cast(List[bytes], deque(maxlen=0))
 
 
 def _splitlines_sse(text: str) -> List[str]:
@@ -20,64 +35,158 @@ def _splitlines_sse(text: str) -> List[str]:
     return lines
 
 
+def _utf8_decoder() -> codecs.IncrementalDecoder:
+    """
+    Return an incremental UTF-8 decoder, which replaces invalid bytes with U+FFFD
+    like the decoder of the SSE spec.
+    """
+    return codecs.getincrementaldecoder("utf-8")("replace")
+
+
 class SSELineDecoder:
     """
     Handles incrementally reading lines from text.
 
-    Mostly a copy of httpx._decoders.LineDecoder, but as per SSE spec, only \r\n, \r,
-    and \n are treated as newlines, which differs from the behavior of splitlines()
-    used by httpx._decoders.LineDecoder.
+    As per SSE spec, only \r\n, \r, and \n are treated as newlines, which differs
+    from the behavior of splitlines() used by httpx._decoders.LineDecoder.
+
+    Each chunk is scanned only once: complete lines are split off with
+    `str.split()`, and an incomplete trailing line is kept as a list of pieces,
+    joined once the line is complete. A long line arriving in many small chunks
+    thus costs time linear in its length.
+
+    A byte order mark at the start of the first line is removed.
     """
 
     def __init__(self) -> None:
         self.buffer: list[str] = []
         self.trailing_cr: bool = False
+        self.at_start: bool = True
 
     def decode(self, text: str) -> list[str]:
-        # We always push a trailing `\r` into the next decode iteration.
-        if self.trailing_cr:
-            text = "\r" + text
+        if self.trailing_cr and text:
+            # The line ending with `\r` was already returned, but the `\r` may be
+            # the first half of a `\r\n` split across chunks.
             self.trailing_cr = False
-        if text.endswith("\r"):
-            self.trailing_cr = True
-            text = text[:-1]
-
-        if not text:
-            # NOTE: the edge case input of empty text doesn't occur in practice,
-            # because other httpx internals filter out this value
-            return []  # pragma: no cover
+            if text[0] == "\n":
+                text = text[1:]
 
-        trailing_newline = text[-1] in "\n\r"
-        lines = _splitlines_sse(text)
+        if "\r" in text:
+            self.trailing_cr = text[-1] == "\r"
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
 
-        if len(lines) == 1 and not trailing_newline:
-            # No new lines, buffer the input and continue.
-            self.buffer.append(lines[0])
-            return []
+        lines = text.split("\n")
+        # Either an incomplete line, or empty if the text ends with a newline.
+        last = lines.pop()
 
-        if self.buffer:
-            # Include any existing buffer in the first portion of the
-            # splitlines result.
-            lines = ["".join(self.buffer) + lines[0]] + lines[1:]
-            self.buffer = []
+        buffer = self.buffer
+        if buffer and lines:
+            buffer.append(lines[0])
+            lines[0] = "".join(buffer)
+            buffer.clear()
+        if last:
+            buffer.append(last)
 
-        if not trailing_newline:
-            # If the last segment of splitlines is not newline terminated,
-            # then drop it from our output and start a new buffer.
-            self.buffer = [lines.pop()]
+        if self.at_start and lines:
+            self.at_start = False
+            lines[0] = lines[0].removeprefix("\ufeff")
 
         return lines
 
     def flush(self) -> list[str]:
-        if not self.buffer and not self.trailing_cr:
+        self.trailing_cr = False
+
+        if not self.buffer:
             return []
 
         lines = ["".join(self.buffer)]
-        self.buffer = []
+        self.buffer.clear()
+        if self.at_start:
+            self.at_start = False
+            lines[0] = lines[0].removeprefix("\ufeff")
+        return lines
+
+
+class SSEBytesLineDecoder:
+    """
+    Handles incrementally reading lines from raw bytes.
+
+    Works like `SSELineDecoder`, but on network chunks as returned by
+    `iter_bytes()`. An incomplete trailing line is kept in a reusable `bytearray`.
+    Lines are returned as bytes: as `\r` and `\n` never occur within multi-byte
+    UTF-8 sequences, each line can later be decoded on its own.
+
+    If `max_line_size` is given, an `SSEError` is raised on lines longer than
+    `max_line_size` bytes, before they are fully buffered.
+
+    A byte order mark at the start of the first line is removed.
+    """
+
+    def __init__(self, max_line_size: Optional[int] = None) -> None:
+        self.buffer = bytearray()
+        self.trailing_cr: bool = False
+        self.at_start: bool = True
+        self.max_line_size = max_line_size
+
+    def decode(self, chunk: bytes) -> List[bytes]:
+        if self.trailing_cr and chunk:
+            # The line ending with `\r` was already returned, but the `\r` may be
+            # the first half of a `\r\n` split across chunks.
+            self.trailing_cr = False
+            if chunk[0] == _LF:
+                chunk = chunk[1:]
+
+        if b"\r" in chunk:
+            self.trailing_cr = chunk[-1] == _CR
+            chunk = chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+        lines = chunk.split(b"\n")
+        # Either an incomplete line, or empty if the chunk ends with a newline.
+        last = lines.pop()
+
+        buffer = self.buffer
+        max_line_size = self.max_line_size
+        if max_line_size is not None and len(buffer) + len(chunk) > max_line_size:
+            _check_line_sizes(buffer, lines, last, max_line_size)
+
+        if buffer and lines:
+            buffer += lines[0]
+            lines[0] = bytes(buffer)
+            buffer.clear()
+        if last:
+            buffer += last
+
+        if self.at_start and lines:
+            self.at_start = False
+            lines[0] = lines[0].removeprefix(_BOM)
+
+        return lines
+
+    def flush(self) -> List[bytes]:
         self.trailing_cr = False
+
+        if not self.buffer:
+            return []
+
+        lines = [bytes(self.buffer)]
+        self.buffer.clear()
+        if self.at_start:
+            self.at_start = False
+            lines[0] = lines[0].removeprefix(_BOM)
         return lines
 
 
+def _check_line_sizes(
+    buffer: bytearray, lines: List[bytes], last: bytes, max_line_size: int
+) -> None:
+    sizes = [len(line) for line in lines]
+    sizes.append(len(last))
+    # The buffered partial line continues with the first line of the chunk.
+    sizes[0] += len(buffer)
+    if max(sizes) > max_line_size:
+        raise SSEError(f"Line exceeds the maximum size of {max_line_size} bytes")
+
+
 class SSEDecoder:
     def __init__(self) -> None:
         self._event = ""
@@ -111,13 +220,22 @@ class SSEDecoder:
 
             return sse
 
-        if line.startswith(":"):
+        if line.startswith("data:"):
+            # Fast path for the most frequent field.
+            self._data.append(line[6:] if line.startswith(" ", 5) else line[5:])
             return None
 
-        fieldname, _, value = line.partition(":")
+        colon = line.find(":")
+
+        if colon == 0:
+            return None  # Comment.
 
-        if value.startswith(" "):
-            value = value[1:]
+        if colon < 0:
+            fieldname, value = line, ""
+        elif line.startswith(" ", colon + 1):
+            fieldname, value = line[:colon], line[colon + 2 :]
+        else:
+            fieldname, value = line[:colon], line[colon + 1 :]
 
         if fieldname == "event":
             self._event = value
@@ -137,3 +255,201 @@ class SSEDecoder:
             pass  # Field is ignored.
 
         return None
+
+
+class _BaseSSEBytesDecoder(Generic[_Event]):
+    """
+    Like `SSEDecoder`, but operates on lines of raw bytes.
+
+    Field values are decoded from UTF-8 only once they are complete. In particular,
+    `data` lines are accumulated as bytes until the event is dispatched.
+
+    If `max_event_size` is given, an `SSEError` is raised on events whose data
+    exceeds `max_event_size` bytes, before it is fully buffered.
+
+    If `event_types` is given, events of other types are not emitted. Their data
+    is not accumulated from the point their `event` field is received.
+    """
+
+    def __init__(
+        self,
+        max_event_size: Optional[int] = None,
+        event_types: Optional[Iterable[str]] = None,
+    ) -> None:
+        self._event = b""
+        self._data: List[bytes] = []
+        self._data_size = 0
+        self._max_event_size = max_event_size
+        self._last_event_id = ""
+        self._retry: Optional[int] = None
+        # Unlike `_retry`, persists across events, as per the SSE spec.
+        self._reconnection_time: Optional[int] = None
+        self._last_dispatched_id = ""
+        self._event_counts: Dict[bytes, int] = {}
+        self.event_types = None if event_types is None else frozenset(event_types)
+
+    @property
+    def event_types(self) -> Optional[FrozenSet[str]]:
+        if self._event_types is None:
+            return None
+        return frozenset(event.decode() for event in self._event_types)
+
+    @event_types.setter
+    def event_types(self, event_types: Optional[FrozenSet[str]]) -> None:
+        self._event_types = (
+            None
+            if event_types is None
+            else frozenset(event.encode() for event in event_types)
+        )
+
+    @property
+    def event_counts(self) -> Dict[str, int]:
+        """
+        The number of events received per event type, including filtered events.
+        """
+        return {
+            event.decode("utf-8", "replace"): count
+            for event, count in self._event_counts.items()
+        }
+
+    def reset(self) -> None:
+        """
+        Discard any incomplete event, e.g. when the connection was lost.
+
+        The ID of the last dispatched event and the reconnection time are kept.
+        """
+        self._event = b""
+        self._data = []
+        self._data_size = 0
+        self._last_event_id = self._last_dispatched_id
+        self._retry = None
+
+    def _make_event(self, event: bytes, data: List[bytes]) -> _Event:
+        raise NotImplementedError  # pragma: no cover
+
+    def _check_event_size(self, value: bytes) -> None:
+        # Includes the newlines that data lines are joined with.
+        self._data_size += len(value) + 1
+        if self._data_size - 1 > cast(int, self._max_event_size):
+            raise SSEError(
+                f"Event data exceeds the maximum size of {self._max_event_size} bytes"
+            )
+
+    def decode(self, line: bytes) -> Optional[_Event]:
+        # See: https://html.spec.whatwg.org/multipage/server-sent-events.html#event-stream-interpretation  # noqa: E501
+
+        if not line:
+            if (
+                not self._event
+                and not self._data
+                and not self._last_event_id
+                and self._retry is None
+            ):
+                return None
+
+            event = self._event or b"message"
+            counts = self._event_counts
+            counts[event] = counts.get(event, 0) + 1
+
+            event_types = self._event_types
+            sse: Optional[_Event] = None
+            # NOTE: an event whose data was discarded is dropped, even if a later
+            # `event` field made it acceptable.
+            if self._data is not _DISCARD and (
+                event_types is None or event in event_types
+            ):
+                sse = self._make_event(self._event, self._data)
+
+            # NOTE: as per the SSE spec, do not reset last_event_id.
+            self._last_dispatched_id = self._last_event_id
+            self._event = b""
+            self._data = []
+            self._data_size = 0
+            self._retry = None
+
+            return sse
+
+        if line.startswith(b"data:"):
+            # Fast path for the most frequent field.
+            value = line[6:] if line.startswith(b" ", 5) else line[5:]
+            self._data.append(value)
+            if self._max_event_size is not None:
+                self._check_event_size(value)
+            return None
+
+        colon = line.find(b":")
+
+        if colon == 0:
+            return None  # Comment.
+
+        if colon < 0:
+            fieldname, value = line, b""
+        elif line.startswith(b" ", colon + 1):
+            fieldname, value = line[:colon], line[colon + 2 :]
+        else:
+            fieldname, value = line[:colon], line[colon + 1 :]
+
+        if fieldname == b"event":
+            self._event = value
+            event_types = self._event_types
+            if event_types is not None and (value or b"message") not in event_types:
+                self._data = _DISCARD
+        elif fieldname == b"data":
+            self._data.append(value)
+            if self._max_event_size is not None:
+                self._check_event_size(value)
+        elif fieldname == b"id":
+            if b"\0" in value:
+                pass
+            else:
+                self._last_event_id = value.decode("utf-8", "replace")
+        elif fieldname == b"retry":
+            try:
+                self._retry = self._reconnection_time = int(value)
+            except (TypeError, ValueError):
+                pass
+        else:
+            pass  # Field is ignored.
+
+        return None
+
+
+class SSEBytesDecoder(_BaseSSEBytesDecoder[ServerSentEvent]):
+    """
+    Decodes lines of raw bytes into `ServerSentEvent` objects.
+
+    Event data is decoded only when the `data` of the event is accessed, or passed
+    as bytes to `json_loads` by `sse.json()`.
+    """
+
+    def __init__(
+        self,
+        json_loads: Optional[JSONLoads] = None,
+        max_event_size: Optional[int] = None,
+        event_types: Optional[Iterable[str]] = None,
+    ) -> None:
+        super().__init__(max_event_size, event_types)
+        self._json_loads = json_loads
+
+    def _make_event(self, event: bytes, data: List[bytes]) -> ServerSentEvent:
+        return ServerSentEvent._from_bytes(
+            event.decode("utf-8", "replace"),
+            b"\n".join(data),
+            self._last_event_id,
+            self._retry,
+            self._json_loads,
+        )
+
+
+class RawSSEBytesDecoder(_BaseSSEBytesDecoder[RawServerSentEvent]):
+    """
+    Like `SSEBytesDecoder`, but emits lightweight `RawServerSentEvent` tuples.
+    """
+
+    def _make_event(self, event: bytes, data: List[bytes]) -> RawServerSentEvent:
+        return RawServerSentEvent(
+            event.decode("utf-8", "replace") or "message",
+            b"\n".join(data).decode("utf-8", "replace"),
+            self._last_event_id,
+            self._retry,
+        )
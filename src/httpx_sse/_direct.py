@@ -0,0 +1,433 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+import httpx
+
+from ._api import _check_content_type, _check_max_size, _split_batch
+from ._exceptions import SSEIdleTimeout
+from ._models import JSONLoads, ServerSentEvent
+from ._parser import SSEParser
+
+_BUFFER_SIZE = 64 * 1024
+# Unparsed data is moved to the front of the buffer when less room is left.
+_MIN_READ_SIZE = 4096
+_MAX_HEAD_SIZE = _BUFFER_SIZE - _MIN_READ_SIZE
+_MAX_CHUNK_SIZE_LINE = 1024
+
+# Reading is paused while this many batches of events wait to be consumed, and
+# resumed once they are down to the low-water mark.
+_HIGH_WATER = 64
+_LOW_WATER = 16
+
+# States of the response parser.
+_HEAD = 0
+_CHUNK_SIZE = 1
+_CHUNK_DATA = 2
+_CHUNK_END = 3
+_LENGTH = 4
+_UNTIL_CLOSE = 5
+_DONE = 6
+
+_Head = Tuple[int, List[Tuple[bytes, bytes]]]
+
+
+class _SSEProtocol(asyncio.BufferedProtocol):
+    """
+    Reads an HTTP/1.1 response into a preallocated buffer, and feeds its body to
+    an `SSEParser` as soon as it is received.
+
+    Chunked framing is parsed in place, so the only copy of the data is the one
+    passed to the parser.
+    """
+
+    def __init__(self, parser: SSEParser) -> None:
+        self._parser = parser
+        self._buffer = bytearray(_BUFFER_SIZE)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+        self._state = _HEAD
+        self._remaining = 0
+        self._transport: Optional[asyncio.Transport] = None
+        self._paused = False
+        self._error: Optional[Exception] = None
+        self._waiter: "Optional[asyncio.Future[None]]" = None
+        self.head: "asyncio.Future[_Head]" = asyncio.get_running_loop().create_future()
+        self.batches: Deque[List[ServerSentEvent]] = deque()
+        self.last_activity = time.monotonic()
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._transport = transport  # type: ignore[assignment]
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        start, end = self._start, self._end
+        if start == end:
+            self._start = self._end = end = 0
+        elif start and len(self._buffer) - end < _MIN_READ_SIZE:
+            # E.g. an incomplete chunk size line.
+            size = end - start
+            self._buffer[:size] = self._buffer[start:end]
+            self._start, self._end = 0, size
+            end = size
+        return self._view[end:]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self._end += nbytes
+        self.last_activity = time.monotonic()
+        try:
+            self._process()
+        except httpx.RequestError as exc:
+            self._fail(exc)
+
+    def connection_lost(self, exc: Optional[Exception]) -> None:
+        if self._state == _UNTIL_CLOSE:
+            self._state = _DONE
+        if self._state != _DONE:
+            if exc is not None:
+                self._fail(httpx.ReadError(str(exc)))
+            else:
+                self._fail(
+                    httpx.RemoteProtocolError(
+                        "Server disconnected without completing the response"
+                    )
+                )
+        self._wake()
+
+    def _process(self) -> None:
+        buffer = self._buffer
+        while self._start < self._end:
+            start, end = self._start, self._end
+            state = self._state
+
+            if state == _CHUNK_DATA or state == _LENGTH:
+                size = min(self._remaining, end - start)
+                self._feed(start, start + size)
+                self._start += size
+                self._remaining -= size
+                if not self._remaining:
+                    self._state = _CHUNK_END if state == _CHUNK_DATA else _DONE
+            elif state == _UNTIL_CLOSE:
+                self._feed(start, end)
+                self._start = end
+            elif state == _CHUNK_SIZE:
+                eol = buffer.find(b"\r\n", start, end)
+                if eol < 0:
+                    if end - start > _MAX_CHUNK_SIZE_LINE:
+                        raise httpx.RemoteProtocolError("Invalid chunk size")
+                    return
+                self._start = eol + 2
+                self._remaining = _parse_chunk_size(bytes(buffer[start:eol]))
+                self._state = _CHUNK_DATA if self._remaining else _DONE
+            elif state == _CHUNK_END:
+                if end - start < 2:
+                    return
+                if buffer[start : start + 2] != b"\r\n":
+                    raise httpx.RemoteProtocolError("Invalid chunk terminator")
+                self._start += 2
+                self._state = _CHUNK_SIZE
+            elif state == _HEAD:
+                eoh = buffer.find(b"\r\n\r\n", start, end)
+                if eoh < 0:
+                    if end - start > _MAX_HEAD_SIZE:
+                        raise httpx.RemoteProtocolError("Response head is too large")
+                    return
+                self._start = eoh + 4
+                self._parse_head(bytes(buffer[start:eoh]))
+            else:
+                # E.g. trailers, which are ignored.
+                self._start = end
+
+        if self._state == _DONE:
+            self._close()
+            self._wake()
+
+    def _parse_head(self, head: bytes) -> None:
+        status_line, *header_lines = head.split(b"\r\n")
+        version, _, rest = status_line.partition(b" ")
+        code = rest.partition(b" ")[0]
+        if not version.startswith(b"HTTP/1.") or not code.isdigit():
+            raise httpx.RemoteProtocolError(f"Invalid status line {status_line!r}")
+        status_code = int(code)
+
+        raw_headers = []
+        for line in header_lines:
+            name, colon, value = line.partition(b":")
+            if not colon:
+                raise httpx.RemoteProtocolError(f"Invalid header line {line!r}")
+            raw_headers.append((name.strip(), value.strip()))
+
+        if status_code < 200:
+            # An interim response, e.g. `100 Continue`.
+            return
+
+        headers = httpx.Headers(raw_headers)
+        if headers.get("content-encoding", "identity").lower() != "identity":
+            raise httpx.DecodingError(
+                f"Unsupported Content-Encoding {headers['content-encoding']!r}"
+            )
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            self._state = _CHUNK_SIZE
+        elif "content-length" in headers:
+            content_length = headers["content-length"]
+            if not content_length.isdigit():
+                raise httpx.RemoteProtocolError(
+                    f"Invalid Content-Length {content_length!r}"
+                )
+            self._remaining = int(content_length)
+            self._state = _LENGTH if self._remaining else _DONE
+        else:
+            self._state = _UNTIL_CLOSE
+        if not self.head.done():  # E.g. cancelled on timeout.
+            self.head.set_result((status_code, raw_headers))
+
+    def _feed(self, start: int, stop: int) -> None:
+        events = self._parser.feed(self._view[start:stop].tobytes())
+        if not events:
+            return
+        self.batches.append(events)
+        if not self._paused and len(self.batches) >= _HIGH_WATER:
+            self._paused = True
+            self._transport.pause_reading()  # type: ignore[union-attr]
+        self._wake()
+
+    def _wake(self) -> None:
+        waiter = self._waiter
+        if waiter is not None:
+            self._waiter = None
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def _fail(self, exc: Exception) -> None:
+        if self._error is None:
+            self._error = exc
+        if not self.head.done():
+            self.head.set_exception(exc)
+        self._close()
+        self._wake()
+
+    def _close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+
+    async def next_batch(
+        self, timeout: Optional[float]
+    ) -> Optional[List[ServerSentEvent]]:
+        batches = self.batches
+        while True:
+            if batches:
+                events = batches.popleft()
+                if self._paused and len(batches) <= _LOW_WATER:
+                    self._paused = False
+                    self._transport.resume_reading()  # type: ignore[union-attr]
+                return events
+            if self._error is not None:
+                raise self._error
+            if self._state == _DONE:
+                return None
+
+            waiter = self._waiter = asyncio.get_running_loop().create_future()
+            if timeout is None:
+                await waiter
+                continue
+            idle = time.monotonic() - self.last_activity
+            if idle >= timeout:
+                self._fail(
+                    SSEIdleTimeout(
+                        f"No data received from the server for {idle:.1f} seconds"
+                    )
+                )
+                continue
+            await asyncio.wait((waiter,), timeout=timeout - idle)
+
+
+def _parse_chunk_size(line: bytes) -> int:
+    size = line.partition(b";")[0].strip()
+    try:
+        if size.isalnum():
+            return int(size, 16)
+    except ValueError:
+        pass
+    raise httpx.RemoteProtocolError(f"Invalid chunk size {line!r}")
+
+
+class DirectEventSource:
+    """
+    An event source that reads from a connection of its own, as returned by
+    `aconnect_sse_direct()`.
+    """
+
+    def __init__(
+        self,
+        response: httpx.Response,
+        parser: SSEParser,
+        protocol: _SSEProtocol,
+        read_timeout: Optional[float],
+    ) -> None:
+        self._response = response
+        self._parser = parser
+        self._protocol = protocol
+        self._read_timeout = read_timeout
+
+    @property
+    def response(self) -> httpx.Response:
+        return self._response
+
+    @property
+    def parser(self) -> SSEParser:
+        return self._parser
+
+    @property
+    def last_activity(self) -> float:
+        return self._protocol.last_activity
+
+    @property
+    def event_counts(self) -> Dict[str, int]:
+        return self._parser.event_counts
+
+    async def aiter_sse(self) -> AsyncGenerator[ServerSentEvent, None]:
+        _check_content_type(self._response)
+        next_batch = self._protocol.next_batch
+        timeout = self._read_timeout
+        while True:
+            events = await next_batch(timeout)
+            if events is None:
+                return
+            for sse in events:
+                yield sse
+
+    async def aiter_sse_batches(
+        self, max_size: Optional[int] = None
+    ) -> AsyncGenerator[List[ServerSentEvent], None]:
+        _check_max_size(max_size)
+        _check_content_type(self._response)
+        next_batch = self._protocol.next_batch
+        timeout = self._read_timeout
+        while True:
+            events = await next_batch(timeout)
+            if events is None:
+                return
+            for batch in _split_batch(events, max_size):
+                yield batch
+
+
+@asynccontextmanager
+async def aconnect_sse_direct(
+    client: httpx.AsyncClient,
+    method: str,
+    url: str,
+    *,
+    json_loads: Optional[JSONLoads] = None,
+    max_line_size: Optional[int] = None,
+    max_event_size: Optional[int] = None,
+    event_types: Optional[Iterable[str]] = None,
+    idle_timeout: Optional[float] = None,
+    **kwargs: Any,
+) -> AsyncIterator[DirectEventSource]:
+    headers = kwargs.pop("headers", {})
+    headers["Accept"] = "text/event-stream"
+    headers["Cache-Control"] = "no-store"
+    # The body is parsed as is.
+    headers["Accept-Encoding"] = "identity"
+    request = client.build_request(method, url, headers=headers, **kwargs)
+    timeout = request.extensions.get("timeout", {})
+    read_timeout = timeout.get("read") if idle_timeout is None else idle_timeout
+
+    parser = SSEParser(
+        json_loads=json_loads,
+        max_line_size=max_line_size,
+        max_event_size=max_event_size,
+        event_types=event_types,
+    )
+    transport, protocol = await _open_connection(
+        client, request, parser, timeout.get("connect")
+    )
+    try:
+        transport.write(await _serialize_request(request))
+        try:
+            status_code, raw_headers = await asyncio.wait_for(
+                protocol.head, read_timeout
+            )
+        except asyncio.TimeoutError:
+            raise httpx.ReadTimeout(
+                "Timed out waiting for the response", request=request
+            ) from None
+        response = httpx.Response(
+            status_code,
+            headers=raw_headers,
+            request=request,
+            extensions={"http_version": b"HTTP/1.1"},
+        )
+        yield DirectEventSource(response, parser, protocol, read_timeout)
+    finally:
+        transport.close()
+
+
+async def _open_connection(
+    client: httpx.AsyncClient,
+    request: httpx.Request,
+    parser: SSEParser,
+    connect_timeout: Optional[float],
+) -> Tuple[asyncio.Transport, _SSEProtocol]:
+    url = request.url
+    if url.scheme == "http":
+        ssl_context = None
+        port = url.port or 80
+    elif url.scheme == "https":
+        ssl_context = _get_ssl_context(client)
+        port = url.port or 443
+    else:
+        raise httpx.UnsupportedProtocol(
+            f"Unsupported URL scheme {url.scheme!r}", request=request
+        )
+
+    loop = asyncio.get_running_loop()
+    try:
+        transport, protocol = await asyncio.wait_for(
+            loop.create_connection(
+                lambda: _SSEProtocol(parser), url.host, port, ssl=ssl_context
+            ),
+            connect_timeout,
+        )
+    except asyncio.TimeoutError:
+        raise httpx.ConnectTimeout(
+            "Timed out connecting to the server", request=request
+        ) from None
+    except OSError as exc:
+        raise httpx.ConnectError(str(exc), request=request) from exc
+    return transport, protocol
+
+
+def _get_ssl_context(client: httpx.AsyncClient) -> Any:
+    # Use the TLS configuration of the client's default transport, if available.
+    pool = getattr(client._transport, "_pool", None)
+    ssl_context = getattr(pool, "_ssl_context", None)
+    if ssl_context is None:
+        ssl_context = httpx.create_ssl_context()
+    return ssl_context
+
+
+async def _serialize_request(request: httpx.Request) -> bytes:
+    content = await request.aread()
+    headers = request.headers
+    if "transfer-encoding" in headers:
+        # The body was read in full.
+        del headers["transfer-encoding"]
+        headers["Content-Length"] = str(len(content))
+
+    target = request.url.raw_path
+    lines = [request.method.encode("ascii") + b" " + target + b" HTTP/1.1"]
+    lines += [name + b": " + value for name, value in headers.raw]
+    return b"\r\n".join(lines) + b"\r\n\r\n" + content
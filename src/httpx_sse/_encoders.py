@@ -0,0 +1,68 @@
+from typing import Iterable, List, Optional
+
+from ._models import ServerSentEvent
+
+_EVENT = b"event: "
+_DATA = b"data: "
+_DATA_SEP = b"\ndata: "
+_ID = b"id: "
+_RETRY = b"retry: "
+
+# A comment line, which is ignored by clients but keeps the connection alive.
+HEARTBEAT = b":\n"
+
+
+class SSEEncoder:
+    """
+    Encodes `ServerSentEvent` objects into the bytes of an event stream.
+
+    The counterpart of `SSEDecoder`. Single-line data is written without being
+    split, and events decoded from bytes are re-encoded without decoding their
+    data.
+    """
+
+    def encode(self, sse: ServerSentEvent) -> bytes:
+        event = sse.event
+        event_id = sse.id
+        retry = sse.retry
+
+        # Avoid decoding data that was received as bytes.
+        data = sse._raw_data
+        if data is None:
+            data = sse.data.encode()
+
+        if b"\n" in data or b"\r" in data:
+            lines = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n").split(b"\n")
+            data = _DATA_SEP.join(lines)
+
+        if event == "message" and not event_id and retry is None:
+            # Fast path for the most frequent kind of event.
+            return _DATA + data + b"\n\n"
+
+        parts: List[bytes] = []
+        if event != "message":
+            parts += (_EVENT, _encode_field("event", event), b"\n")
+        if event_id:
+            parts += (_ID, _encode_field("id", event_id), b"\n")
+        if retry is not None:
+            parts += (_RETRY, b"%d\n" % retry)
+        parts += (_DATA, data, b"\n\n")
+        return b"".join(parts)
+
+    def encode_batch(self, events: Iterable[ServerSentEvent]) -> bytes:
+        return b"".join([self.encode(sse) for sse in events])
+
+    def comment(self, text: Optional[str] = None) -> bytes:
+        """
+        Encode a comment, e.g. to keep the connection alive.
+        """
+        if not text:
+            return HEARTBEAT
+        lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+        return b"".join([b": " + line.encode() + b"\n" for line in lines])
+
+
+def _encode_field(name: str, value: str) -> bytes:
+    if "\n" in value or "\r" in value:
+        raise ValueError(f"The {name} of an event must not contain newlines")
+    return value.encode()
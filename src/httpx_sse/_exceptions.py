@@ -3,3 +3,7 @@ import httpx
 
 class SSEError(httpx.TransportError):
     pass
+
+
+class SSEIdleTimeout(SSEError, httpx.ReadTimeout):
+    pass
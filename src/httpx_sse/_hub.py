@@ -0,0 +1,264 @@
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from types import TracebackType
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Deque,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Set,
+    Type,
+    cast,
+)
+
+import httpx
+
+from ._api import aconnect_sse
+from ._buffering import OVERFLOW_POLICIES, _EventBuffer
+from ._models import ServerSentEvent
+
+# The arguments of `client.build_request()` that make up the identity of a request,
+# along with the method and URL.
+_REQUEST_ARGS = ("params", "headers", "cookies", "content", "data", "files", "json")
+
+
+class _Upstream:
+    def __init__(self, key: Hashable, replay: int) -> None:
+        self.key = key
+        self.subscriptions: Set["SSESubscription"] = set()
+        self.replay: Deque[ServerSentEvent] = deque(maxlen=replay)
+        self.task: Optional["asyncio.Task[None]"] = None
+        self.close_handle: Optional[asyncio.TimerHandle] = None
+        self.error: Optional[Exception] = None
+        self.done = False
+
+
+class SSESubscription:
+    """
+    The events of a shared upstream connection, as received by one subscriber of
+    an `SSEHub`.
+    """
+
+    def __init__(self, upstream: _Upstream, buffer: _EventBuffer) -> None:
+        self._upstream = upstream
+        self._buffer = buffer
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._closed = False
+
+    @property
+    def dropped(self) -> int:
+        """
+        The number of events that were discarded because the queue was full.
+        """
+        return self._buffer.dropped
+
+    async def _put(self, events: List[ServerSentEvent]) -> None:
+        buffer = self._buffer
+        for sse in events:
+            while not buffer.push(sse):
+                if self._closed:
+                    return
+                self._not_full.clear()
+                await self._not_full.wait()
+        self._not_empty.set()
+
+    def __aiter__(self) -> "SSESubscription":
+        return self
+
+    async def __anext__(self) -> ServerSentEvent:
+        buffer = self._buffer
+
+        while not buffer:
+            if self._closed:
+                raise StopAsyncIteration
+            upstream = self._upstream
+            if upstream.done:
+                if upstream.error is not None:
+                    raise upstream.error
+                raise StopAsyncIteration
+            self._not_empty.clear()
+            await self._not_empty.wait()
+
+        sse = buffer.pop()
+        self._not_full.set()
+        return sse
+
+
+class SSEHub:
+    """
+    Shares SSE connections between subscribers in the same event loop.
+
+    Subscriptions to the same request, i.e. with the same method, URL, headers and
+    body, share a single upstream connection, whose events are parsed once and
+    fanned out to each subscriber's queue of at most `max_queue_size` events. When
+    a queue is full, the `overflow` policy applies, as with
+    `EventSource.aiter_sse_buffered()`: with "block", a slow subscriber holds back
+    the others.
+
+    The last `replay` events are kept for late subscribers. The upstream
+    connection is closed `grace_period` seconds after its last subscriber left,
+    unless another one subscribed meanwhile.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        *,
+        max_queue_size: int = 64,
+        overflow: str = "drop_oldest",
+        replay: int = 0,
+        grace_period: float = 5.0,
+    ) -> None:
+        if max_queue_size < 1:
+            raise ValueError(
+                f"max_queue_size must be a positive integer, got {max_queue_size!r}"
+            )
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"overflow must be one of {OVERFLOW_POLICIES!r}, got {overflow!r}"
+            )
+        if replay < 0:
+            raise ValueError(f"replay must be a non-negative integer, got {replay!r}")
+        if grace_period < 0:
+            raise ValueError(f"grace_period must be non-negative, got {grace_period!r}")
+
+        self._client = client
+        self._max_queue_size = max_queue_size
+        self._overflow = overflow
+        self._replay = replay
+        self._grace_period = grace_period
+        self._upstreams: Dict[Hashable, _Upstream] = {}
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    def __len__(self) -> int:
+        return len(self._upstreams)
+
+    def _key(self, method: str, url: str, kwargs: Dict[str, Any]) -> Hashable:
+        request = self._client.build_request(
+            method,
+            url,
+            **{name: kwargs[name] for name in _REQUEST_ARGS if name in kwargs},
+        )
+        try:
+            body = request.content
+        except httpx.RequestNotRead:
+            # Streaming request bodies can't be compared, so are never shared.
+            return object()
+        return (
+            request.method,
+            str(request.url),
+            tuple(request.headers.multi_items()),
+            body,
+        )
+
+    @asynccontextmanager
+    async def subscribe(
+        self, method: str, url: str, **kwargs: Any
+    ) -> AsyncIterator[SSESubscription]:
+        """
+        Subscribe to the events of an SSE endpoint, with the same arguments as
+        `aconnect_sse()`, connecting to it unless an identical request is already
+        connected.
+
+        Options that don't change the request, such as `reconnect`, are those of
+        the subscriber that connected.
+        """
+        key = self._key(method, url, kwargs)
+        upstream = self._upstreams.get(key)
+        if upstream is None:
+            upstream = _Upstream(key, self._replay)
+            task = asyncio.get_running_loop().create_task(
+                self._run(upstream, method, url, kwargs)
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            upstream.task = task
+            self._upstreams[key] = upstream
+        elif upstream.close_handle is not None:
+            upstream.close_handle.cancel()
+            upstream.close_handle = None
+
+        buffer = _EventBuffer(self._max_queue_size, self._overflow)
+        for sse in list(upstream.replay)[-self._max_queue_size :]:
+            buffer.push(sse)
+        subscription = SSESubscription(upstream, buffer)
+        upstream.subscriptions.add(subscription)
+
+        try:
+            yield subscription
+        finally:
+            self._unsubscribe(subscription)
+
+    def _unsubscribe(self, subscription: SSESubscription) -> None:
+        subscription._closed = True
+        # Unblock the upstream, if it waits for room in the queue.
+        subscription._not_full.set()
+
+        upstream = subscription._upstream
+        upstream.subscriptions.discard(subscription)
+        if not upstream.subscriptions and not upstream.done:
+            upstream.close_handle = asyncio.get_running_loop().call_later(
+                self._grace_period, self._expire, upstream
+            )
+
+    def _expire(self, upstream: _Upstream) -> None:
+        upstream.close_handle = None
+        del self._upstreams[upstream.key]
+        assert upstream.task is not None
+        upstream.task.cancel()
+
+    async def _run(
+        self, upstream: _Upstream, method: str, url: str, kwargs: Dict[str, Any]
+    ) -> None:
+        try:
+            async with aconnect_sse(self._client, method, url, **kwargs) as source:
+                batches = cast(
+                    AsyncGenerator[List[ServerSentEvent], None],
+                    source.aiter_sse_batches(),
+                )
+                try:
+                    async for events in batches:
+                        upstream.replay.extend(events)
+                        for subscription in list(upstream.subscriptions):
+                            await subscription._put(events)
+                finally:
+                    await batches.aclose()
+        except Exception as exc:
+            upstream.error = exc
+        finally:
+            upstream.done = True
+            if upstream.close_handle is not None:
+                upstream.close_handle.cancel()
+                upstream.close_handle = None
+            if self._upstreams.get(upstream.key) is upstream:
+                del self._upstreams[upstream.key]
+            for subscription in upstream.subscriptions:
+                subscription._not_empty.set()
+
+    async def aclose(self) -> None:
+        """
+        Close all upstream connections. Subscribers get the events they already
+        received, then stop.
+        """
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks)
+
+    async def __aenter__(self) -> "SSEHub":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]] = None,
+        exc_value: Optional[BaseException] = None,
+        traceback: Optional[TracebackType] = None,
+    ) -> None:
+        await self.aclose()
@@ -0,0 +1,238 @@
+import time
+from typing import Any, Dict, List, Mapping, Optional
+
+from ._models import ServerSentEvent
+from ._parser import SSEParser
+
+_COLON = ord(":")
+
+
+class SSEObserver:
+    """
+    Receives instrumentation callbacks from an `EventSource`.
+
+    Subclass it and override the callbacks you need: all of them do nothing by
+    default. Callbacks are called from the iterating code, so they should be fast.
+    """
+
+    def on_chunk(self, size: int, lines: int, comments: int) -> None:
+        """
+        Called when a chunk of `size` bytes was received, with the number of
+        complete `lines` it contained, of which `comments` were comments.
+        """
+
+    def on_event(self, sse: ServerSentEvent, latency: float) -> None:
+        """
+        Called when an event was decoded, with the time in seconds between the
+        reception of its first line and its dispatch.
+        """
+
+    def on_consumer_lag(self, seconds: float) -> None:
+        """
+        Called with the time spent by the consumer outside of the iterator, between
+        receiving a batch of events and asking for more.
+        """
+
+    def on_reconnect(self, latency: float) -> None:
+        """
+        Called when the connection was re-established, with the time in seconds it
+        took, including reconnection delays.
+        """
+
+
+class SSEStats(SSEObserver):
+    """
+    An observer that keeps counters and timings of a stream.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.bytes_received = 0
+        self.lines = 0
+        self.comments = 0
+        self.events = 0
+        self.reconnects = 0
+        self.total_event_latency = 0.0
+        self.max_event_latency = 0.0
+        self.consumer_time = 0.0
+
+    @property
+    def mean_event_latency(self) -> float:
+        return self.total_event_latency / self.events if self.events else 0.0
+
+    @property
+    def events_per_second(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.events / elapsed if elapsed > 0 else 0.0
+
+    def on_chunk(self, size: int, lines: int, comments: int) -> None:
+        self.bytes_received += size
+        self.lines += lines
+        self.comments += comments
+
+    def on_event(self, sse: ServerSentEvent, latency: float) -> None:
+        self.events += 1
+        self.total_event_latency += latency
+        if latency > self.max_event_latency:
+            self.max_event_latency = latency
+
+    def on_consumer_lag(self, seconds: float) -> None:
+        self.consumer_time += seconds
+
+    def on_reconnect(self, latency: float) -> None:
+        self.reconnects += 1
+
+    def __repr__(self) -> str:
+        return (
+            f"SSEStats(bytes_received={self.bytes_received}, lines={self.lines}, "
+            f"comments={self.comments}, events={self.events}, "
+            f"reconnects={self.reconnects})"
+        )
+
+
+class OpenTelemetryObserver(SSEObserver):
+    """
+    An observer that records OpenTelemetry metrics, and optionally a span per event.
+
+    `meter` and `tracer` are duck-typed, e.g. as returned by
+    `opentelemetry.metrics.get_meter()` and `opentelemetry.trace.get_tracer()`, so
+    that OpenTelemetry is not a dependency.
+    """
+
+    def __init__(
+        self,
+        meter: Any = None,
+        tracer: Any = None,
+        attributes: Optional[Mapping[str, Any]] = None,
+    ) -> None:
+        self._meter = meter
+        self._tracer = tracer
+        self._attributes = dict(attributes or {})
+        # Attributes of events, per event type.
+        self._event_attributes: Dict[str, Dict[str, Any]] = {}
+
+        if meter is not None:
+            self._bytes = meter.create_counter(
+                "sse.client.bytes", unit="By", description="Bytes received."
+            )
+            self._lines = meter.create_counter(
+                "sse.client.lines", unit="{line}", description="Lines received."
+            )
+            self._comments = meter.create_counter(
+                "sse.client.comments",
+                unit="{comment}",
+                description="Comment lines received.",
+            )
+            self._events = meter.create_counter(
+                "sse.client.events", unit="{event}", description="Events received."
+            )
+            self._reconnects = meter.create_counter(
+                "sse.client.reconnects",
+                unit="{reconnect}",
+                description="Reconnections.",
+            )
+            self._event_latency = meter.create_histogram(
+                "sse.client.event.latency",
+                unit="s",
+                description="Time from the first line of an event to its dispatch.",
+            )
+            self._consumer_lag = meter.create_histogram(
+                "sse.client.consumer.lag",
+                unit="s",
+                description="Time spent by the consumer between batches of events.",
+            )
+            self._reconnect_latency = meter.create_histogram(
+                "sse.client.reconnect.latency",
+                unit="s",
+                description="Time to re-establish the connection.",
+            )
+
+    def _attributes_for(self, sse: ServerSentEvent) -> Dict[str, Any]:
+        attributes = self._event_attributes.get(sse.event)
+        if attributes is None:
+            attributes = self._event_attributes[sse.event] = {
+                **self._attributes,
+                "sse.event": sse.event,
+            }
+        return attributes
+
+    def on_chunk(self, size: int, lines: int, comments: int) -> None:
+        if self._meter is not None:
+            self._bytes.add(size, self._attributes)
+            self._lines.add(lines, self._attributes)
+            if comments:
+                self._comments.add(comments, self._attributes)
+
+    def on_event(self, sse: ServerSentEvent, latency: float) -> None:
+        attributes = self._attributes_for(sse)
+
+        if self._meter is not None:
+            self._events.add(1, attributes)
+            self._event_latency.record(latency, attributes)
+
+        if self._tracer is not None:
+            end = time.time_ns()
+            span = self._tracer.start_span(
+                "sse.event",
+                start_time=end - int(latency * 1e9),
+                attributes={**attributes, "sse.id": sse.id},
+            )
+            span.end(end_time=end)
+
+    def on_consumer_lag(self, seconds: float) -> None:
+        if self._meter is not None:
+            self._consumer_lag.record(seconds, self._attributes)
+
+    def on_reconnect(self, latency: float) -> None:
+        if self._meter is not None:
+            self._reconnects.add(1, self._attributes)
+            self._reconnect_latency.record(latency, self._attributes)
+
+
+class _ObservedChunkDecoder:
+    """
+    Decodes chunks into events like `SSEParser.feed()`, while reporting to an
+    observer.
+    """
+
+    def __init__(self, observer: SSEObserver, parser: SSEParser) -> None:
+        self._observer = observer
+        self._parser = parser
+        # When the first line of the current event was received.
+        self._event_started: Optional[float] = None
+
+    def decode(self, chunk: bytes) -> List[ServerSentEvent]:
+        # NOTE: the line decoder is replaced when the parser is closed.
+        line_decoder = self._parser._line_decoder
+        decoder = self._parser._decoder
+        received = time.perf_counter()
+        started = self._event_started
+        events: List[ServerSentEvent] = []
+        starts: List[float] = []
+        comments = 0
+
+        lines = line_decoder.decode(chunk)
+        for line in lines:
+            if not line:
+                sse = decoder.decode(line)
+                if sse is not None:
+                    events.append(sse)
+                    starts.append(received if started is None else started)
+                started = None
+            elif line[0] == _COLON:
+                comments += 1
+            else:
+                if started is None:
+                    started = received
+                decoder.decode(line)
+
+        self._event_started = started
+
+        observer = self._observer
+        observer.on_chunk(len(chunk), len(lines), comments)
+        if events:
+            dispatched = time.perf_counter()
+            for sse, start in zip(events, starts):
+                observer.on_event(sse, dispatched - start)
+
+        return events
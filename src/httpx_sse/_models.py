@@ -1,14 +1,30 @@
 import json
-from typing import Any, Optional
+from typing import Any, Callable, NamedTuple, Optional, Union
+
+JSONLoads = Callable[[Union[str, bytes]], Any]
+
+_UNSET: Any = object()
 
 
 class ServerSentEvent:
+    __slots__ = (
+        "_event",
+        "_data",
+        "_raw_data",
+        "_id",
+        "_retry",
+        "_json_loads",
+        "_json",
+    )
+
     def __init__(
         self,
         event: Optional[str] = None,
         data: Optional[str] = None,
         id: Optional[str] = None,
         retry: Optional[int] = None,
+        *,
+        json_loads: Optional[JSONLoads] = None,
     ) -> None:
         if not event:
             event = "message"
@@ -20,9 +36,32 @@ class ServerSentEvent:
             id = ""
 
         self._event = event
-        self._data = data
+        self._data: Optional[str] = data
+        self._raw_data: Optional[bytes] = None
         self._id = id
         self._retry = retry
+        self._json_loads = json_loads
+        self._json = _UNSET
+
+    @classmethod
+    def _from_bytes(
+        cls,
+        event: str,
+        raw_data: bytes,
+        id: str,
+        retry: Optional[int],
+        json_loads: Optional[JSONLoads],
+    ) -> "ServerSentEvent":
+        # Data is decoded lazily, so that it may be passed as bytes to `json_loads`.
+        sse = cls.__new__(cls)
+        sse._event = event or "message"
+        sse._data = None
+        sse._raw_data = raw_data
+        sse._id = id
+        sse._retry = retry
+        sse._json_loads = json_loads
+        sse._json = _UNSET
+        return sse
 
     @property
     def event(self) -> str:
@@ -30,7 +69,12 @@ class ServerSentEvent:
 
     @property
     def data(self) -> str:
-        return self._data
+        data = self._data
+        if data is None:
+            assert self._raw_data is not None
+            data = self._data = self._raw_data.decode("utf-8", "replace")
+            self._raw_data = None
+        return data
 
     @property
     def id(self) -> str:
@@ -41,7 +85,25 @@ class ServerSentEvent:
         return self._retry
 
     def json(self) -> Any:
-        return json.loads(self.data)
+        value = self._json
+        if value is _UNSET:
+            loads: JSONLoads = self._json_loads or json.loads
+            raw_data = self._raw_data
+            value = self._json = loads(self.data if raw_data is None else raw_data)
+        return value
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ServerSentEvent):
+            return NotImplemented
+        return (
+            self.event == other.event
+            and self.data == other.data
+            and self.id == other.id
+            and self.retry == other.retry
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.event, self.data, self.id, self.retry))
 
     def __repr__(self) -> str:
         pieces = [f"event={self.event!r}"]
@@ -52,3 +114,14 @@ class ServerSentEvent:
         if self.retry is not None:
             pieces.append(f"retry={self.retry!r}")
         return f"ServerSentEvent({', '.join(pieces)})"
+
+
+class RawServerSentEvent(NamedTuple):
+    """
+    A lightweight, tuple-based alternative to `ServerSentEvent`.
+    """
+
+    event: str
+    data: str
+    id: str
+    retry: Optional[int]
@@ -0,0 +1,162 @@
+import asyncio
+from collections import deque
+from types import TracebackType
+from typing import Any, Deque, Dict, Hashable, List, Optional, Tuple, Type
+
+import httpx
+
+from ._api import aconnect_sse
+from ._models import ServerSentEvent
+
+
+class _Stream:
+    def __init__(self, key: Hashable) -> None:
+        self.key = key
+        self.buffer: Deque[ServerSentEvent] = deque()
+        self.space = asyncio.Event()
+        self.task: Optional["asyncio.Task[None]"] = None
+        self.error: Optional[Exception] = None
+        self.done = False
+        self.queued = False
+        self.removed = False
+
+
+class SSEMultiplexer:
+    """
+    Fans in events from many SSE streams into a single async iterator of
+    `(key, sse)` pairs.
+
+    Each stream is read by its own task into a buffer of at most `max_buffer_size`
+    events. Streams with buffered events are served in round-robin order, one event
+    at a time, so that a busy stream can't starve the others.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, *, max_buffer_size: int = 64) -> None:
+        if max_buffer_size < 1:
+            raise ValueError(
+                f"max_buffer_size must be a positive integer, got {max_buffer_size!r}"
+            )
+
+        self._client = client
+        self._max_buffer_size = max_buffer_size
+        self._streams: Dict[Hashable, _Stream] = {}
+        self._ready: Deque[_Stream] = deque()
+        self._wakeup = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._streams)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._streams
+
+    def keys(self) -> List[Hashable]:
+        return list(self._streams)
+
+    def add(self, key: Hashable, method: str, url: str, **kwargs: Any) -> None:
+        """
+        Connect to an SSE endpoint, with the same arguments as `aconnect_sse()`,
+        and start reading its events under the given `key`.
+        """
+        if key in self._streams:
+            raise ValueError(f"A stream with key {key!r} already exists")
+
+        stream = _Stream(key)
+        stream.task = asyncio.get_running_loop().create_task(
+            self._read(stream, method, url, kwargs)
+        )
+        self._streams[key] = stream
+
+    async def remove(self, key: Hashable) -> None:
+        """
+        Disconnect the stream with the given `key`, discarding its buffered events.
+        """
+        stream = self._streams.pop(key)
+        await self._cancel(stream)
+        self._wakeup.set()
+
+    async def aclose(self) -> None:
+        streams = list(self._streams.values())
+        self._streams.clear()
+        for stream in streams:
+            await self._cancel(stream)
+        self._wakeup.set()
+
+    async def __aenter__(self) -> "SSEMultiplexer":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]] = None,
+        exc_value: Optional[BaseException] = None,
+        traceback: Optional[TracebackType] = None,
+    ) -> None:
+        await self.aclose()
+
+    def __aiter__(self) -> "SSEMultiplexer":
+        return self
+
+    async def __anext__(self) -> Tuple[Hashable, ServerSentEvent]:
+        ready = self._ready
+
+        while True:
+            while not ready:
+                if not self._streams:
+                    raise StopAsyncIteration
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            stream = ready.popleft()
+
+            if stream.removed:
+                continue
+
+            if stream.buffer:
+                sse = stream.buffer.popleft()
+                stream.space.set()
+                if stream.buffer or stream.done:
+                    ready.append(stream)
+                else:
+                    stream.queued = False
+                return stream.key, sse
+
+            # The stream has ended, and all its events were consumed.
+            del self._streams[stream.key]
+            stream.removed = True
+            if stream.error is not None:
+                raise stream.error
+
+    async def _read(
+        self, stream: _Stream, method: str, url: str, kwargs: Dict[str, Any]
+    ) -> None:
+        buffer = stream.buffer
+        max_buffer_size = self._max_buffer_size
+
+        try:
+            async with aconnect_sse(self._client, method, url, **kwargs) as source:
+                events = source.aiter_sse()
+                try:
+                    async for sse in events:
+                        while len(buffer) >= max_buffer_size:
+                            stream.space.clear()
+                            await stream.space.wait()
+                        buffer.append(sse)
+                        self._mark_ready(stream)
+                finally:
+                    await events.aclose()
+        except Exception as exc:
+            stream.error = exc
+
+        stream.done = True
+        self._mark_ready(stream)
+
+    def _mark_ready(self, stream: _Stream) -> None:
+        if not stream.queued:
+            stream.queued = True
+            self._ready.append(stream)
+        self._wakeup.set()
+
+    async def _cancel(self, stream: _Stream) -> None:
+        stream.removed = True
+        assert stream.task is not None
+        stream.task.cancel()
+        await asyncio.wait([stream.task])
@@ -0,0 +1,83 @@
+from typing import Dict, FrozenSet, Iterable, List, Optional
+
+from ._decoders import SSEBytesDecoder, SSEBytesLineDecoder
+from ._models import JSONLoads, ServerSentEvent
+
+
+class SSEParser:
+    """
+    An incremental parser of event streams, which does no I/O.
+
+    Feed it bytes as they are received, from any source, and it returns the events
+    that were completed. Chunks may be split anywhere, including within lines or
+    multi-byte UTF-8 sequences.
+    """
+
+    def __init__(
+        self,
+        *,
+        json_loads: Optional[JSONLoads] = None,
+        max_line_size: Optional[int] = None,
+        max_event_size: Optional[int] = None,
+        event_types: Optional[Iterable[str]] = None,
+        last_event_id: str = "",
+    ) -> None:
+        self._max_line_size = max_line_size
+        self._line_decoder = SSEBytesLineDecoder(max_line_size)
+        self._decoder = SSEBytesDecoder(
+            json_loads=json_loads,
+            max_event_size=max_event_size,
+            event_types=event_types,
+        )
+        self._decoder._last_event_id = last_event_id
+        self._decoder._last_dispatched_id = last_event_id
+
+    @property
+    def last_event_id(self) -> str:
+        """
+        The ID of the last dispatched event, to be sent as `Last-Event-ID` when
+        reconnecting.
+        """
+        return self._decoder._last_dispatched_id
+
+    @property
+    def retry(self) -> Optional[int]:
+        """
+        The reconnection time in milliseconds last sent by the server, if any.
+        """
+        return self._decoder._reconnection_time
+
+    @property
+    def event_types(self) -> Optional[FrozenSet[str]]:
+        return self._decoder.event_types
+
+    @event_types.setter
+    def event_types(self, event_types: Optional[FrozenSet[str]]) -> None:
+        self._decoder.event_types = event_types
+
+    @property
+    def event_counts(self) -> Dict[str, int]:
+        return self._decoder.event_counts
+
+    def feed(self, data: bytes) -> List[ServerSentEvent]:
+        """
+        Parse a chunk of the stream, and return the events it completed.
+        """
+        decode = self._decoder.decode
+        events = []
+        for line in self._line_decoder.decode(data):
+            sse = decode(line)
+            if sse is not None:
+                events.append(sse)
+        return events
+
+    def close(self) -> None:
+        """
+        Signal the end of the stream.
+
+        As per the SSE spec, an incomplete event is discarded. The parser may then be
+        fed a new stream, e.g. after reconnecting: the last event ID and reconnection
+        time are kept.
+        """
+        self._line_decoder = SSEBytesLineDecoder(self._max_line_size)
+        self._decoder.reset()
@@ -0,0 +1,73 @@
+import queue
+import threading
+from typing import Any, Callable, Iterator, List
+
+from ._models import ServerSentEvent
+
+_END: Any = object()
+
+# How long to wait for the reader thread on exit, if it could not be interrupted.
+_JOIN_TIMEOUT = 1.0
+
+
+def _iter_pipelined(
+    batches: Callable[[], Iterator[List[ServerSentEvent]]],
+    interrupt: Callable[[], None],
+    max_size: int,
+) -> Iterator[ServerSentEvent]:
+    """
+    Yield events from batches produced by a reader thread, which reads ahead of the
+    consumer into a queue of at most `max_size` batches.
+
+    On exit, `interrupt` is called if the reader may be blocked on the network.
+    """
+    items: "queue.Queue[Any]" = queue.Queue(maxsize=max_size)
+    stopped = threading.Event()
+    reading = threading.Event()
+
+    def read() -> None:
+        iterator = batches()
+        try:
+            while True:
+                # NOTE: set before checking `stopped`, so that the consumer either
+                # sees that we are reading, or we see that it stopped.
+                reading.set()
+                if stopped.is_set():
+                    return
+                try:
+                    batch = next(iterator)
+                except StopIteration:
+                    items.put(_END)
+                    return
+                finally:
+                    reading.clear()
+                items.put(batch)
+        except Exception as exc:
+            items.put(exc)
+        finally:
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=read, name="httpx-sse-reader", daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = items.get()
+            if item is _END:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield from item
+    finally:
+        stopped.set()
+        # Make room for any pending put, so that the reader can see `stopped`.
+        while True:
+            try:
+                items.get_nowait()
+            except queue.Empty:
+                break
+        if reading.is_set():
+            interrupt()
+        thread.join(_JOIN_TIMEOUT)
@@ -0,0 +1,143 @@
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from ._exceptions import SSEError
+from ._parser import SSEParser
+
+
+class ReconnectPolicy:
+    """
+    Configures how a lost connection to an SSE endpoint is re-established.
+
+    The delay before each attempt starts from the reconnection time sent by the
+    server with the `retry` field, or `initial_delay` if none was received. It grows
+    by `multiplier` with each consecutive failure, up to `max_delay`, and is then
+    reduced by a random fraction of at most `jitter`, so that many clients don't
+    reconnect all at once.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_attempts: Optional[int] = None,
+        initial_delay: float = 1.0,
+        max_delay: float = 30.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.5,
+    ) -> None:
+        if max_attempts is not None and max_attempts < 1:
+            raise ValueError(
+                f"max_attempts must be a positive integer, got {max_attempts!r}"
+            )
+        if initial_delay < 0 or max_delay < 0:
+            raise ValueError("Reconnection delays must not be negative")
+        if multiplier < 1:
+            raise ValueError(f"multiplier must be at least 1, got {multiplier!r}")
+        if not 0 <= jitter <= 1:
+            raise ValueError(f"jitter must be between 0 and 1, got {jitter!r}")
+
+        self.max_attempts = max_attempts
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+
+    def get_delay(self, failures: int, retry: Optional[int] = None) -> float:
+        """
+        Return the delay in seconds before the next attempt, after `failures`
+        consecutive failures, given the reconnection time `retry` (in milliseconds)
+        last sent by the server, if any.
+        """
+        base = self.initial_delay if retry is None else retry / 1000
+        delay = min(self.max_delay, base * self.multiplier ** (failures - 1))
+        return delay - random.uniform(0, self.jitter * delay)
+
+    def __repr__(self) -> str:
+        return (
+            f"ReconnectPolicy(max_attempts={self.max_attempts!r}, "
+            f"initial_delay={self.initial_delay!r}, max_delay={self.max_delay!r}, "
+            f"multiplier={self.multiplier!r}, jitter={self.jitter!r})"
+        )
+
+
+class _Reconnector:
+    """
+    Re-issues the request of an `EventSource` after the connection was lost.
+    """
+
+    def __init__(
+        self,
+        policy: ReconnectPolicy,
+        connect: Optional[Callable[[str], httpx.Response]] = None,
+        aconnect: Optional[Callable[[str], Awaitable[httpx.Response]]] = None,
+    ) -> None:
+        self.policy = policy
+        self._connect = connect
+        self._aconnect = aconnect
+        # Consecutive failures, reset once events are received again.
+        self.failures = 0
+        self.count = 0
+        self.latency: Optional[float] = None
+
+    def _get_delay(self, exc: httpx.TransportError, parser: SSEParser) -> float:
+        if isinstance(exc, SSEError):
+            # The server responded, but not with an event stream: as per the SSE
+            # spec, this must fail the connection.
+            raise exc
+
+        self.failures += 1
+        max_attempts = self.policy.max_attempts
+        if max_attempts is not None and self.failures > max_attempts:
+            raise exc
+
+        return self.policy.get_delay(self.failures, parser.retry)
+
+    def _record(self, started: float) -> None:
+        self.count += 1
+        self.latency = time.monotonic() - started
+
+    def reconnect(
+        self,
+        exc: httpx.TransportError,
+        response: httpx.Response,
+        parser: SSEParser,
+    ) -> httpx.Response:
+        assert self._connect is not None
+        started = time.monotonic()
+        response.close()
+        parser.close()
+
+        while True:
+            time.sleep(self._get_delay(exc, parser))
+            try:
+                response = self._connect(parser.last_event_id)
+            except httpx.TransportError as connect_exc:
+                exc = connect_exc
+            else:
+                self._record(started)
+                return response
+
+    async def areconnect(
+        self,
+        exc: httpx.TransportError,
+        response: httpx.Response,
+        parser: SSEParser,
+    ) -> httpx.Response:
+        assert self._aconnect is not None
+        started = time.monotonic()
+        await response.aclose()
+        parser.close()
+
+        while True:
+            await asyncio.sleep(self._get_delay(exc, parser))
+            try:
+                response = await self._aconnect(parser.last_event_id)
+            except httpx.TransportError as connect_exc:
+                exc = connect_exc
+            else:
+                self._record(started)
+                return response
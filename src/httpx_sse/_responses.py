@@ -0,0 +1,284 @@
+import asyncio
+import queue
+import threading
+from typing import (
+    Any,
+    AsyncIterable,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from ._compression import _accepts_gzip, _GzipCompressor
+from ._encoders import HEARTBEAT, SSEEncoder
+from ._models import ServerSentEvent
+
+# Either an event, or a batch of events sent at once.
+_Item = Union[ServerSentEvent, Sequence[ServerSentEvent]]
+
+_Message = Dict[str, Any]
+_Receive = Callable[[], Awaitable[_Message]]
+_Send = Callable[[_Message], Awaitable[None]]
+
+_END: Any = object()
+
+_DEFAULT_HEADERS = {
+    "content-type": "text/event-stream",
+    "cache-control": "no-store",
+    # Disable response buffering by nginx.
+    "x-accel-buffering": "no",
+}
+
+_GZIP_HEADERS = [("content-encoding", "gzip"), ("vary", "accept-encoding")]
+
+
+def _encode_item(encoder: SSEEncoder, item: _Item) -> bytes:
+    if isinstance(item, ServerSentEvent):
+        return encoder.encode(item)
+    return encoder.encode_batch(item)
+
+
+def _get_asgi_header(scope: Mapping[str, Any], name: bytes) -> str:
+    for key, value in scope.get("headers", ()):
+        if key.lower() == name:
+            return value.decode("latin-1")
+    return ""
+
+
+def _iter_compressed(
+    bodies: Iterator[bytes], compressor: _GzipCompressor
+) -> Iterator[bytes]:
+    try:
+        for body in bodies:
+            yield compressor.compress(body)
+        yield compressor.finish()
+    finally:
+        close = getattr(bodies, "close", None)
+        if close is not None:
+            close()
+
+
+def _build_headers(headers: Optional[Mapping[str, str]]) -> List[Tuple[str, str]]:
+    merged = dict(_DEFAULT_HEADERS)
+    if headers is not None:
+        merged.update((key.lower(), value) for key, value in headers.items())
+    return list(merged.items())
+
+
+class ASGIEventStream:
+    """
+    An ASGI app that streams events from an async iterable as an SSE response.
+
+    Items may be events, or batches of events which are sent in a single write.
+    If `heartbeat` is set, a comment is sent whenever no data was sent for this
+    many seconds. Iteration stops when the client disconnects.
+
+    If `compress` is true, the response is compressed with gzip if the client
+    accepts it, and flushed after each write.
+    """
+
+    def __init__(
+        self,
+        events: AsyncIterable[_Item],
+        *,
+        heartbeat: Optional[float] = 15.0,
+        headers: Optional[Mapping[str, str]] = None,
+        status_code: int = 200,
+        compress: bool = False,
+    ) -> None:
+        self._events = events
+        self._heartbeat = heartbeat
+        self._headers = [
+            (key.encode("latin-1"), value.encode("latin-1"))
+            for key, value in _build_headers(headers)
+        ]
+        self._status_code = status_code
+        self._compress = compress
+        self._encoder = SSEEncoder()
+
+    async def __call__(
+        self, scope: Mapping[str, Any], receive: _Receive, send: _Send
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        lock = asyncio.Lock()
+        last_sent = loop.time()
+
+        headers = self._headers
+        compressor = None
+        if self._compress and _accepts_gzip(
+            _get_asgi_header(scope, b"accept-encoding")
+        ):
+            compressor = _GzipCompressor()
+            headers = headers + [
+                (key.encode("latin-1"), value.encode("latin-1"))
+                for key, value in _GZIP_HEADERS
+            ]
+
+        async def send_body(body: bytes) -> None:
+            nonlocal last_sent
+            async with lock:
+                if compressor is not None:
+                    body = compressor.compress(body)
+                await send(
+                    {"type": "http.response.body", "body": body, "more_body": True}
+                )
+                last_sent = loop.time()
+
+        async def stream() -> None:
+            encoder = self._encoder
+            events = self._events
+            try:
+                async for item in events:
+                    await send_body(_encode_item(encoder, item))
+            finally:
+                aclose = getattr(events, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+
+        async def heartbeat(interval: float) -> None:
+            while True:
+                delay = last_sent + interval - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    await send_body(HEARTBEAT)
+
+        async def wait_for_disconnect() -> None:
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self._status_code,
+                "headers": headers,
+            }
+        )
+
+        stream_task = loop.create_task(stream())
+        tasks = [stream_task, loop.create_task(wait_for_disconnect())]
+        if self._heartbeat is not None:
+            tasks.append(loop.create_task(heartbeat(self._heartbeat)))
+
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.wait(tasks)
+
+        for task in tasks:
+            if not task.cancelled():
+                # Propagate any error, e.g. from the events.
+                task.result()
+
+        if stream_task.cancelled():
+            return  # The client disconnected.
+
+        body = b"" if compressor is None else compressor.finish()
+        await send({"type": "http.response.body", "body": body, "more_body": False})
+
+
+class WSGIEventStream:
+    """
+    A WSGI app that streams events from an iterable as an SSE response.
+
+    Items may be events, or batches of events which are sent in a single write.
+    If `heartbeat` is set, events are read in a background thread, and a comment
+    is sent whenever no event was received for this many seconds.
+
+    If `compress` is true, the response is compressed with gzip if the client
+    accepts it, and flushed after each write.
+    """
+
+    def __init__(
+        self,
+        events: Iterable[_Item],
+        *,
+        heartbeat: Optional[float] = 15.0,
+        headers: Optional[Mapping[str, str]] = None,
+        status: str = "200 OK",
+        compress: bool = False,
+    ) -> None:
+        self._events = events
+        self._heartbeat = heartbeat
+        self._headers = _build_headers(headers)
+        self._status = status
+        self._compress = compress
+        self._encoder = SSEEncoder()
+
+    def __call__(
+        self, environ: Mapping[str, Any], start_response: Callable[..., Any]
+    ) -> Iterable[bytes]:
+        if self._heartbeat is None:
+            bodies = self._iter_bodies()
+        else:
+            bodies = self._iter_bodies_with_heartbeats(self._heartbeat)
+
+        if self._compress and _accepts_gzip(environ.get("HTTP_ACCEPT_ENCODING", "")):
+            start_response(self._status, self._headers + _GZIP_HEADERS)
+            return _iter_compressed(bodies, _GzipCompressor())
+
+        start_response(self._status, self._headers)
+        return bodies
+
+    def _iter_bodies(self) -> Iterator[bytes]:
+        encoder = self._encoder
+        for item in self._events:
+            yield _encode_item(encoder, item)
+
+    def _iter_bodies_with_heartbeats(self, interval: float) -> Iterator[bytes]:
+        bodies: "queue.Queue[Any]" = queue.Queue(maxsize=16)
+        stopped = threading.Event()
+
+        def put(body: Any) -> None:
+            while not stopped.is_set():
+                try:
+                    bodies.put(body, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def produce() -> None:
+            events = iter(self._events)
+            try:
+                for item in events:
+                    if stopped.is_set():
+                        break
+                    put(_encode_item(self._encoder, item))
+            except Exception as exc:
+                put(exc)
+            else:
+                put(_END)
+            finally:
+                close = getattr(events, "close", None)
+                if close is not None:
+                    close()
+
+        thread = threading.Thread(target=produce, daemon=True)
+        thread.start()
+
+        try:
+            while True:
+                try:
+                    body = bodies.get(timeout=interval)
+                except queue.Empty:
+                    yield HEARTBEAT
+                    continue
+
+                if body is _END:
+                    return
+                if isinstance(body, Exception):
+                    raise body
+                yield body
+        finally:
+            # Called when the server closes the response, e.g. on disconnection.
+            stopped.set()
@@ -0,0 +1,202 @@
+import asyncio
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from types import TracebackType
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Deque,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    cast,
+)
+
+from ._api import EventSource, _event_type
+from ._models import JSONLoads, ServerSentEvent
+
+# Events are sent to workers as plain tuples, which are cheap to pickle:
+# event type, raw data, ID and retry.
+_Record = Tuple[str, bytes, str, Optional[int]]
+
+_handler: Callable[[ServerSentEvent], Any]
+_json_loads: Optional[JSONLoads]
+
+
+def _init_worker(
+    handler: Callable[[ServerSentEvent], Any], json_loads: Optional[JSONLoads]
+) -> None:
+    global _handler, _json_loads
+    _handler = handler
+    _json_loads = json_loads
+
+
+def _handle_batch(records: List[_Record]) -> None:
+    handler = _handler
+    json_loads = _json_loads
+    from_bytes = ServerSentEvent._from_bytes
+    for event, data, id, retry in records:
+        handler(from_bytes(event, data, id, retry, json_loads))
+
+
+def _to_record(sse: ServerSentEvent) -> _Record:
+    raw_data = sse._raw_data
+    data = sse.data.encode("utf-8") if raw_data is None else raw_data
+    return (sse.event, data, sse.id, sse.retry)
+
+
+class SSEShardPool:
+    """
+    Handles events in `workers` processes, sharded by `key`, e.g. the event type.
+
+    Events with the same key are always handled by the same process, in order.
+    Each batch of events is sent to a worker in a single message, and at most
+    `max_pending` batches are in flight per worker: beyond that, submitting waits
+    for the worker to catch up.
+
+    `handler` is called in the worker processes, so it must be picklable, e.g. a
+    function defined at the top level of a module. So must `json_loads`.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[ServerSentEvent], Any],
+        *,
+        workers: Optional[int] = None,
+        key: Optional[Callable[[ServerSentEvent], Hashable]] = None,
+        json_loads: Optional[JSONLoads] = None,
+        max_pending: int = 8,
+        mp_context: Optional[Any] = None,
+    ) -> None:
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError(f"workers must be a positive integer, got {workers!r}")
+        if max_pending < 1:
+            raise ValueError(
+                f"max_pending must be a positive integer, got {max_pending!r}"
+            )
+
+        self._key = _event_type if key is None else key
+        self._max_pending = max_pending
+        # A single process per shard, so that batches are handled in order.
+        self._executors = [
+            ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=mp_context,
+                initializer=_init_worker,
+                initargs=(handler, json_loads),
+            )
+            for _ in range(workers)
+        ]
+        self._pending: List[Deque["Future[None]"]] = [deque() for _ in range(workers)]
+
+    @property
+    def workers(self) -> int:
+        return len(self._executors)
+
+    def _shard(self, events: Iterable[ServerSentEvent]) -> List[List[_Record]]:
+        key = self._key
+        workers = len(self._executors)
+        shards: List[List[_Record]] = [[] for _ in range(workers)]
+        for sse in events:
+            shards[hash(key(sse)) % workers].append(_to_record(sse))
+        return shards
+
+    def _submit(self, shard: int, records: List[_Record]) -> Deque["Future[None]"]:
+        pending = self._pending[shard]
+        # Raise any error of a worker as soon as possible.
+        while pending and pending[0].done():
+            pending.popleft().result()
+        pending.append(self._executors[shard].submit(_handle_batch, records))
+        return pending
+
+    def submit(self, events: Iterable[ServerSentEvent]) -> None:
+        """
+        Send events to their workers, waiting while too many batches are pending.
+
+        Errors raised by the handler, or `BrokenProcessPool` if a worker process
+        died, are re-raised here.
+        """
+        for shard, records in enumerate(self._shard(events)):
+            if records:
+                pending = self._submit(shard, records)
+                while len(pending) > self._max_pending:
+                    pending.popleft().result()
+
+    async def asubmit(self, events: Iterable[ServerSentEvent]) -> None:
+        """
+        An async equivalent to `submit()`.
+        """
+        for shard, records in enumerate(self._shard(events)):
+            if records:
+                pending = self._submit(shard, records)
+                while len(pending) > self._max_pending:
+                    await asyncio.wrap_future(pending.popleft())
+
+    def consume(self, event_source: EventSource) -> None:
+        """
+        Submit all events of an event source, then wait for them to be handled.
+        """
+        for events in event_source.iter_sse_batches():
+            self.submit(events)
+        self.join()
+
+    async def aconsume(self, event_source: EventSource) -> None:
+        """
+        An async equivalent to `consume()`.
+        """
+        batches = cast(
+            AsyncGenerator[List[ServerSentEvent], None],
+            event_source.aiter_sse_batches(),
+        )
+        try:
+            async for events in batches:
+                await self.asubmit(events)
+        finally:
+            await batches.aclose()
+        await self.ajoin()
+
+    def join(self) -> None:
+        """
+        Wait for all submitted events to be handled.
+        """
+        for pending in self._pending:
+            while pending:
+                pending.popleft().result()
+
+    async def ajoin(self) -> None:
+        for pending in self._pending:
+            while pending:
+                await asyncio.wrap_future(pending.popleft())
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the worker processes. If `wait` is false, pending events are discarded.
+        """
+        for executor in self._executors:
+            executor.shutdown(wait=wait, cancel_futures=not wait)
+        for pending in self._pending:
+            pending.clear()
+
+    def __enter__(self) -> "SSEShardPool":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]] = None,
+        exc_value: Optional[BaseException] = None,
+        traceback: Optional[TracebackType] = None,
+    ) -> None:
+        if exc_type is None:
+            try:
+                self.join()
+            except BaseException:
+                self.shutdown(wait=False)
+                raise
+        self.shutdown(wait=exc_type is None)
@@ -0,0 +1,161 @@
+import mmap
+import os
+import struct
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Union
+
+from ._models import ServerSentEvent
+
+# Each record is a header, followed by the event type, ID and data bytes:
+# kind, event length, ID length, data length, retry (-1 for none).
+_HEADER = struct.Struct("<BIIIq")
+
+# An event.
+_EVENT = 0
+# A checkpoint of the last event ID, e.g. of events that were filtered out.
+_CHECKPOINT = 1
+
+
+class SSESpool:
+    """
+    An append-only log of events on disk, which keeps track of the last event ID.
+
+    Records are length-prefixed, so the log can be replayed quickly through a
+    memory map. An incomplete record at the end, e.g. after a crash, is discarded
+    when the spool is opened.
+    """
+
+    def __init__(
+        self, path: Union[str, "os.PathLike[str]"], *, fsync: bool = False
+    ) -> None:
+        self.path = os.fspath(path)
+        self._fsync = fsync
+        self._file: Optional[BinaryIO] = None
+        self._last_event_id = ""
+        self._recover()
+
+    @property
+    def last_event_id(self) -> str:
+        return self._last_event_id
+
+    def _recover(self) -> None:
+        try:
+            file = open(self.path, "r+b")
+        except FileNotFoundError:
+            return
+
+        with file:
+            size = os.fstat(file.fileno()).st_size
+            if not size:
+                return
+
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                header_size = _HEADER.size
+                offset = 0
+                while offset + header_size <= size:
+                    _, event_size, id_size, data_size, _ = _HEADER.unpack_from(
+                        buffer, offset
+                    )
+                    start = offset + header_size + event_size
+                    end = start + id_size + data_size
+                    if end > size:
+                        break
+                    self._last_event_id = buffer[start : start + id_size].decode(
+                        "utf-8"
+                    )
+                    offset = end
+
+            if offset < size:
+                file.truncate(offset)
+
+    def append(
+        self, events: Iterable[ServerSentEvent], last_event_id: Optional[str] = None
+    ) -> None:
+        """
+        Append events to the log in a single write.
+
+        If given, `last_event_id` is checkpointed, e.g. if it differs from the ID of
+        the last event because later events were filtered out.
+        """
+        pack = _HEADER.pack
+        pieces: List[bytes] = []
+        last_id = self._last_event_id
+
+        for sse in events:
+            event = sse.event.encode("utf-8")
+            id = sse.id.encode("utf-8")
+            raw_data = sse._raw_data
+            data = sse.data.encode("utf-8") if raw_data is None else raw_data
+            retry = -1 if sse.retry is None else sse.retry
+            pieces += (pack(_EVENT, len(event), len(id), len(data), retry), event, id)
+            pieces.append(data)
+            last_id = sse.id
+
+        if last_event_id is not None and last_event_id != last_id:
+            id = last_event_id.encode("utf-8")
+            pieces += (pack(_CHECKPOINT, 0, len(id), 0, -1), id)
+            last_id = last_event_id
+
+        if not pieces:
+            return
+
+        file = self._file
+        if file is None:
+            file = self._file = open(self.path, "ab")
+        file.write(b"".join(pieces))
+        file.flush()
+        if self._fsync:
+            os.fsync(file.fileno())
+        self._last_event_id = last_id
+
+    def replay(self) -> Iterator[ServerSentEvent]:
+        """
+        Yield the events of the log, from the oldest.
+        """
+        try:
+            file = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+
+        with file:
+            size = os.fstat(file.fileno()).st_size
+            if not size:
+                return
+
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                unpack_from = _HEADER.unpack_from
+                from_bytes = ServerSentEvent._from_bytes
+                header_size = _HEADER.size
+                offset = 0
+                while offset + header_size <= size:
+                    kind, event_size, id_size, data_size, retry = unpack_from(
+                        buffer, offset
+                    )
+                    start = offset + header_size
+                    offset = start + event_size + id_size + data_size
+                    if offset > size:
+                        # Being written.
+                        return
+                    if kind != _EVENT:
+                        continue
+                    event = buffer[start : start + event_size].decode("utf-8")
+                    start += event_size
+                    id = buffer[start : start + id_size].decode("utf-8")
+                    start += id_size
+                    yield from_bytes(
+                        event,
+                        buffer[start:offset],
+                        id,
+                        None if retry < 0 else retry,
+                        None,
+                    )
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "SSESpool":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
@@ -0,0 +1,408 @@
+from typing import (
+    AsyncGenerator,
+    AsyncIterator,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
+
+from ._decoders import _BOM, _utf8_decoder
+from ._exceptions import SSEError
+
+# Kinds of parts.
+_DATA = 0
+_FIELD = 1
+_DISPATCH = 2
+
+_Part = Tuple[int, Union[bytes, Tuple[bytes, bytes], None]]
+
+_SPACE = ord(" ")
+_LF = ord("\n")
+_CR = ord("\r")
+
+# Parser states.
+_NAME = 0
+_DATA_VALUE = 1
+_FIELD_VALUE = 2
+_SKIP = 3
+
+_FIELDS = (b"event", b"id", b"retry")
+
+
+class _StreamingDecoder:
+    """
+    Incrementally parses raw bytes into parts of events, without buffering the
+    value of `data` fields.
+
+    Returns lists of parts, which are either:
+
+    * `(_DATA, piece)` - A piece of event data, as bytes, including newlines
+      between `data` lines.
+    * `(_FIELD, (name, value))` - A complete `event`, `id` or `retry` field.
+    * `(_DISPATCH, None)` - An empty line, i.e. the end of an event.
+
+    Other field names and comments are skipped. If `max_line_size` is given, an
+    `SSEError` is raised on lines other than `data` lines that are longer than
+    `max_line_size` bytes.
+    """
+
+    def __init__(self, max_line_size: Optional[int] = None) -> None:
+        self._state = _NAME
+        # The field name, or the value of a non-data field, of the current line.
+        self._buffer = bytearray()
+        self._field = b""
+        self._strip_space = False
+        self._has_data = False
+        self._trailing_cr = False
+        self._at_start = True
+        self._max_line_size = max_line_size
+
+    def decode(self, chunk: bytes) -> List[_Part]:
+        parts: List[_Part] = []
+        # Adjacent pieces of data are joined, to reduce per-part overhead.
+        data: List[bytes] = []
+        buffer = self._buffer
+        pos = 0
+        end = len(chunk)
+
+        if self._trailing_cr and chunk:
+            self._trailing_cr = False
+            if chunk[0] == _LF:
+                pos = 1
+
+        # End of the current line, or `end` if it continues in the next chunk.
+        eol = -1
+
+        while pos < end:
+            if eol < pos:
+                eol = chunk.find(b"\n", pos)
+                if eol < 0:
+                    eol = end
+                cr = chunk.find(b"\r", pos, eol)
+                if cr >= 0:
+                    eol = cr
+
+            if self._state == _NAME:
+                colon = chunk.find(b":", pos, eol)
+                index = eol if colon < 0 else colon
+                buffer += chunk[pos:index]
+                if index == end:
+                    self._check_size()
+                    break
+
+                name = bytes(buffer)
+                buffer.clear()
+                if self._at_start:
+                    self._at_start = False
+                    name = name.removeprefix(_BOM)
+
+                if colon < 0:
+                    pos = self._end_line(chunk, eol)
+                    if not name:
+                        _flush_data(parts, data)
+                        parts.append((_DISPATCH, None))
+                        self._has_data = False
+                    elif name == b"data":
+                        self._start_data(data)
+                    elif name in _FIELDS:
+                        _flush_data(parts, data)
+                        parts.append((_FIELD, (name, b"")))
+                    continue
+
+                pos = colon + 1
+                if name == b"data":
+                    self._start_data(data)
+                    self._state = _DATA_VALUE
+                elif name in _FIELDS:
+                    self._field = name
+                    self._state = _FIELD_VALUE
+                else:
+                    self._state = _SKIP  # Comment, or ignored field.
+
+                if self._state != _SKIP:
+                    if pos == end:
+                        self._strip_space = True
+                    elif chunk[pos] == _SPACE:
+                        pos += 1
+
+            elif self._strip_space:
+                # The colon was at the end of the previous chunk.
+                self._strip_space = False
+                if chunk[pos] == _SPACE:
+                    pos += 1
+
+            state = self._state
+
+            if state == _DATA_VALUE:
+                if eol > pos:
+                    data.append(chunk[pos:eol])
+            elif state == _FIELD_VALUE:
+                buffer += chunk[pos:eol]
+                self._check_size()
+
+            if eol == end:
+                break
+
+            if state == _FIELD_VALUE:
+                _flush_data(parts, data)
+                parts.append((_FIELD, (self._field, bytes(buffer))))
+                buffer.clear()
+
+            self._state = _NAME
+            pos = self._end_line(chunk, eol)
+
+        _flush_data(parts, data)
+        return parts
+
+    def _start_data(self, data: List[bytes]) -> None:
+        if self._has_data:
+            data.append(b"\n")
+        self._has_data = True
+
+    def _end_line(self, chunk: bytes, index: int) -> int:
+        if chunk[index] == _CR:
+            if index + 1 == len(chunk):
+                # May be the first half of a `\r\n` split across chunks.
+                self._trailing_cr = True
+            elif chunk[index + 1] == _LF:
+                return index + 2
+        return index + 1
+
+    def _check_size(self) -> None:
+        max_line_size = self._max_line_size
+        if max_line_size is not None and len(self._buffer) > max_line_size:
+            raise SSEError(f"Line exceeds the maximum size of {max_line_size} bytes")
+
+
+def _flush_data(parts: List[_Part], data: List[bytes]) -> None:
+    if data:
+        parts.append((_DATA, data[0] if len(data) == 1 else b"".join(data)))
+        data.clear()
+
+
+class StreamingServerSentEvent:
+    """
+    A server-sent event whose data is read incrementally from the stream.
+
+    The `event`, `id` and `retry` fields are updated as they are received, so they
+    are only final once the data has been fully read.
+    """
+
+    def __init__(
+        self,
+        first: _Part,
+        last_event_id: str,
+        *,
+        parts: Optional[Iterator[_Part]] = None,
+        aparts: Optional[AsyncIterator[_Part]] = None,
+        max_event_size: Optional[int] = None,
+    ) -> None:
+        self._parts = parts
+        self._aparts = aparts
+        self._event = ""
+        self._id = last_event_id
+        self._retry: Optional[int] = None
+        self._data_size = 0
+        self._max_event_size = max_event_size
+        self._complete = False
+        self._ended = False
+        # Fields that precede the data are available right away.
+        self._pending = self._handle(first)
+
+    @property
+    def event(self) -> str:
+        return self._event or "message"
+
+    @property
+    def id(self) -> str:
+        return self._id
+
+    @property
+    def retry(self) -> Optional[int]:
+        return self._retry
+
+    @property
+    def complete(self) -> bool:
+        """
+        Whether the whole event was received.
+        """
+        return self._complete
+
+    def iter_data(self) -> Iterator[str]:
+        """
+        Yield the event data as chunks of text, as it is received.
+        """
+        assert self._parts is not None, "Use 'aiter_data()' in async code"
+        decoder = _utf8_decoder()
+
+        piece = self._pending
+        self._pending = None
+
+        while True:
+            if piece:
+                text = decoder.decode(piece)
+                if text:
+                    yield text
+            if self._ended:
+                break
+            piece = self._handle(next(self._parts, None))
+
+        self._check_complete()
+        text = decoder.decode(b"", True)
+        if text:
+            yield text
+
+    async def aiter_data(self) -> AsyncIterator[str]:
+        """
+        An async equivalent to `iter_data()`.
+        """
+        assert self._aparts is not None, "Use 'iter_data()' in sync code"
+        decoder = _utf8_decoder()
+
+        piece = self._pending
+        self._pending = None
+
+        while True:
+            if piece:
+                text = decoder.decode(piece)
+                if text:
+                    yield text
+            if self._ended:
+                break
+            piece = self._handle(await _anext(self._aparts))
+
+        self._check_complete()
+        text = decoder.decode(b"", True)
+        if text:
+            yield text
+
+    def __repr__(self) -> str:
+        return (
+            f"StreamingServerSentEvent(event={self.event!r}, id={self._id!r}, "
+            f"retry={self._retry!r}, complete={self._complete!r})"
+        )
+
+    def _handle(self, part: Optional[_Part]) -> Optional[bytes]:
+        if part is None:
+            # The stream ended before the end of the event.
+            self._ended = True
+            return None
+
+        kind, value = part
+
+        if kind == _DATA:
+            assert isinstance(value, bytes)
+            max_event_size = self._max_event_size
+            if max_event_size is not None:
+                self._data_size += len(value)
+                if self._data_size > max_event_size:
+                    raise SSEError(
+                        f"Event data exceeds the maximum size of {max_event_size} "
+                        "bytes"
+                    )
+            return value
+
+        if kind == _DISPATCH:
+            self._ended = self._complete = True
+            return None
+
+        assert isinstance(value, tuple)
+        name, field = value
+        if name == b"event":
+            self._event = field.decode("utf-8", "replace")
+        elif name == b"id":
+            if b"\0" not in field:
+                self._id = field.decode("utf-8", "replace")
+        else:
+            try:
+                self._retry = int(field)
+            except ValueError:
+                pass
+        return None
+
+    def _check_complete(self) -> None:
+        if not self._complete:
+            raise SSEError("The stream ended before the end of the event")
+
+    def _drain(self) -> None:
+        assert self._parts is not None
+        self._pending = None
+        while not self._ended:
+            self._handle(next(self._parts, None))
+
+    async def _adrain(self) -> None:
+        assert self._aparts is not None
+        self._pending = None
+        while not self._ended:
+            self._handle(await _anext(self._aparts))
+
+
+async def _anext(parts: AsyncIterator[_Part]) -> Optional[_Part]:
+    try:
+        return await parts.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+def _iter_parts(chunks: Iterator[bytes], decoder: _StreamingDecoder) -> Iterator[_Part]:
+    for chunk in chunks:
+        yield from decoder.decode(chunk)
+
+
+async def _aiter_parts(
+    chunks: AsyncIterator[bytes], decoder: _StreamingDecoder
+) -> AsyncIterator[_Part]:
+    async for chunk in chunks:
+        for part in decoder.decode(chunk):
+            yield part
+
+
+def _iter_streaming_events(
+    chunks: Iterator[bytes],
+    max_line_size: Optional[int] = None,
+    max_event_size: Optional[int] = None,
+) -> Iterator[StreamingServerSentEvent]:
+    parts = _iter_parts(chunks, _StreamingDecoder(max_line_size))
+    last_event_id = ""
+
+    for part in parts:
+        if part[0] == _DISPATCH:
+            continue  # Empty line outside of an event.
+
+        sse = StreamingServerSentEvent(
+            part, last_event_id, parts=parts, max_event_size=max_event_size
+        )
+        yield sse
+        # Skip any data that was not read.
+        sse._drain()
+        last_event_id = sse.id
+
+
+async def _aiter_streaming_events(
+    chunks: AsyncIterator[bytes],
+    max_line_size: Optional[int] = None,
+    max_event_size: Optional[int] = None,
+) -> AsyncIterator[StreamingServerSentEvent]:
+    parts = cast(
+        AsyncGenerator[_Part, None],
+        _aiter_parts(chunks, _StreamingDecoder(max_line_size)),
+    )
+    last_event_id = ""
+
+    try:
+        async for part in parts:
+            if part[0] == _DISPATCH:
+                continue  # Empty line outside of an event.
+
+            sse = StreamingServerSentEvent(
+                part, last_event_id, aparts=parts, max_event_size=max_event_size
+            )
+            yield sse
+            # Skip any data that was not read.
+            await sse._adrain()
+            last_event_id = sse.id
+    finally:
+        await parts.aclose()
@@ -1,9 +1,16 @@
-from typing import AsyncIterator, Iterator
+import json
+from typing import Any, AsyncIterator, Iterator, List, Union
 
 import httpx
 import pytest
 
-from httpx_sse import SSEError, aconnect_sse, connect_sse
+from httpx_sse import (
+    ReconnectPolicy,
+    SSEError,
+    SSEIdleTimeout,
+    aconnect_sse,
+    connect_sse,
+)
 from httpx_sse._api import _aiter_sse_lines, _iter_sse_lines
 
 
@@ -101,3 +108,194 @@ async def test_aiter_sse_lines_with_flush() -> None:
     response = httpx.Response(200, stream=AsyncBody())
     lines = [line async for line in _aiter_sse_lines(response)]
     assert lines == ["line1", "no_newline"]  # flush gets the partial line
+
+
+def test_iter_sse_lines_ignores_charset() -> None:
+    # As per the SSE spec, streams are always UTF-8.
+    response = httpx.Response(
+        200,
+        headers={"content-type": "text/event-stream; charset=latin-1"},
+        content=b"\xef\xbb\xbfdata: caf\xc3\xa9\ndata: \xe2\x82\ndata: \xe2",
+    )
+    lines = list(_iter_sse_lines(response))
+    # Invalid and incomplete UTF-8 sequences are replaced.
+    assert lines == ["data: café", "data: \ufffd", "data: \ufffd"]
+
+
+def test_iter_sse_with_bom_in_single_byte_chunks() -> None:
+    class Body(httpx.SyncByteStream):
+        def __iter__(self) -> Iterator[bytes]:
+            for byte in "\ufeffdata: café\n\n".encode():
+                yield bytes([byte])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream; charset=latin-1"},
+            stream=Body(),
+        )
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        with connect_sse(client, "GET", "http://testserver") as event_source:
+            assert [sse.data for sse in event_source.iter_sse()] == ["café"]
+
+
+def test_connect_sse_json_loads() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            text='data: {"key": "value"}\n\n',
+        )
+
+    def loads(data: Union[str, bytes]) -> Any:
+        assert isinstance(data, bytes)
+        return ("loaded", json.loads(data))
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        with connect_sse(
+            client, "GET", "http://testserver", json_loads=loads
+        ) as event_source:
+            (sse,) = event_source.iter_sse()
+            assert sse.json() == ("loaded", {"key": "value"})
+
+
+def test_connect_sse_max_sizes() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        size = int(request.url.params["size"])
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            text=f"data: {'x' * size}\n\n",
+        )
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        url = "http://testserver?size=10"
+        with connect_sse(client, "GET", url, max_event_size=10) as event_source:
+            (sse,) = event_source.iter_sse()
+            assert sse.data == "x" * 10
+
+        url = "http://testserver?size=11"
+        with connect_sse(client, "GET", url, max_event_size=10) as event_source:
+            with pytest.raises(SSEError, match="Event data exceeds"):
+                list(event_source.iter_sse())
+
+        with connect_sse(client, "GET", url, max_line_size=16) as event_source:
+            with pytest.raises(SSEError, match="Line exceeds"):
+                list(event_source.iter_sse())
+
+
+@pytest.mark.asyncio
+async def test_aconnect_sse_max_line_size() -> None:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            text=f"data: {'x' * 100}\n\n",
+        )
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        async with aconnect_sse(
+            client, "GET", "http://testserver", max_line_size=16
+        ) as event_source:
+            with pytest.raises(SSEError, match="Line exceeds"):
+                [sse async for sse in event_source.aiter_sse()]
+
+
+def test_connect_sse_event_types() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            text="event: a\ndata: 1\n\nevent: b\ndata: 2\n\nevent: a\ndata: 3\n\n",
+        )
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        with connect_sse(
+            client, "GET", "http://testserver", event_types={"a"}
+        ) as event_source:
+            assert [sse.data for sse in event_source.iter_sse()] == ["1", "3"]
+            assert event_source.event_counts == {"a": 2, "b": 1}
+
+
+class StallingBody(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """
+    A response body that yields some chunks, then times out waiting for more.
+    """
+
+    def __init__(self, chunks: List[bytes]) -> None:
+        self._chunks = chunks
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._chunks
+        raise httpx.ReadTimeout("Timed out")
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in self._chunks:
+            yield chunk
+        raise httpx.ReadTimeout("Timed out")
+
+
+def test_connect_sse_idle_timeout() -> None:
+    timeouts = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        timeouts.append(request.extensions["timeout"])
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            stream=StallingBody([b"data: first\n\n", b": keep-alive\n"]),
+        )
+
+    transport = httpx.MockTransport(handler)
+    with httpx.Client(transport=transport, timeout=3.0) as client:
+        with connect_sse(
+            client, "GET", "http://testserver", idle_timeout=10.0
+        ) as event_source:
+            started = event_source.last_activity
+            events = event_source.iter_sse()
+            assert next(events).data == "first"
+            with pytest.raises(SSEIdleTimeout, match="No data received"):
+                next(events)
+            # Comments count as activity.
+            assert event_source.last_activity > started
+
+        assert timeouts == [{"connect": 3.0, "read": 10.0, "write": 3.0, "pool": 3.0}]
+
+        # An explicit timeout is used for other timeouts.
+        with connect_sse(
+            client, "GET", "http://testserver", idle_timeout=10.0, timeout=1.0
+        ) as event_source:
+            # Idle timeouts are also read timeouts.
+            with pytest.raises(httpx.ReadTimeout):
+                list(event_source.iter_sse())
+
+        assert timeouts[-1] == {"connect": 1.0, "read": 10.0, "write": 1.0, "pool": 1.0}
+
+
+@pytest.mark.asyncio
+async def test_aconnect_sse_idle_timeout_reconnects() -> None:
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        chunks = [b"id: %d\ndata: event\n\n" % len(requests)]
+        return httpx.Response(
+            200,
+            headers={"content-type": "text/event-stream"},
+            stream=StallingBody(chunks),
+        )
+
+    policy = ReconnectPolicy(max_attempts=1, initial_delay=0, jitter=0)
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        async with aconnect_sse(
+            client, "GET", "http://testserver", idle_timeout=5.0, reconnect=policy
+        ) as event_source:
+            events = event_source.aiter_sse()
+            assert (await events.__anext__()).id == "1"
+            assert (await events.__anext__()).id == "2"
+            assert event_source.reconnects == 1
+            await events.aclose()
+
+    assert requests[1].headers["Last-Event-ID"] == "1"
+    assert requests[1].extensions["timeout"]["read"] == 5.0
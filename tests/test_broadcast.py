@@ -0,0 +1,238 @@
+import asyncio
+import json
+import multiprocessing
+import threading
+from typing import Any, Iterator, List
+
+import httpx
+import pytest
+
+from httpx_sse import (
+    ServerSentEvent,
+    SSEBroadcaster,
+    SSEBroadcastReader,
+    _broadcast,
+    aconnect_sse,
+    connect_sse,
+)
+
+# Leaves 128 bytes for records.
+SMALL = 32 + 128
+
+
+def _events(count: int, size: int = 4) -> List[ServerSentEvent]:
+    return [ServerSentEvent(data=f"{i:0{size}d}") for i in range(count)]
+
+
+def _data(events: List[ServerSentEvent]) -> List[str]:
+    return [sse.data for sse in events]
+
+
+def test_publish_read() -> None:
+    with SSEBroadcaster() as broadcaster:
+        with SSEBroadcastReader(broadcaster.name, json_loads=json.loads) as reader:
+            assert reader.read() == []
+            assert not reader.closed
+
+            events = [
+                ServerSentEvent(event="update", data='{"π": 1}', id="é1", retry=500),
+                ServerSentEvent(data="line 1\nline 2"),
+            ]
+            broadcaster.publish(events)
+            received = reader.read()
+            assert received == events
+            assert received[0].json() == {"π": 1}
+            assert reader.read() == []
+
+            # Raw event data is published as is.
+            broadcaster.publish(
+                [ServerSentEvent._from_bytes("message", b"raw", "", None, None)]
+            )
+            assert _data(reader.read()) == ["raw"]
+            assert reader.skipped == 0
+
+        # Closing twice is fine.
+        reader.close()
+    broadcaster.close()
+
+
+def test_reader_starts_at_latest_event() -> None:
+    with SSEBroadcaster() as broadcaster:
+        broadcaster.publish(_events(3))
+        with SSEBroadcastReader(broadcaster.name) as reader:
+            broadcaster.publish([ServerSentEvent(data="new")])
+            assert _data(reader.read()) == ["new"]
+
+
+@pytest.mark.parametrize("size", [29, 4, 13])
+def test_wrap_around(size: int) -> None:
+    # Records of 64, 40 and 48 bytes: filling the ring exactly, leaving less room
+    # than a record header at the end, and leaving room for a wrap marker.
+    events = _events(20, size)
+    with SSEBroadcaster(size=SMALL) as broadcaster:
+        with SSEBroadcastReader(broadcaster.name) as reader:
+            received = []
+            for sse in events:
+                broadcaster.publish([sse])
+                received += reader.read()
+            assert received == events
+            assert reader.skipped == 0
+
+
+def test_lapped_reader() -> None:
+    events = _events(20)
+    with SSEBroadcaster(size=SMALL) as broadcaster:
+        with SSEBroadcastReader(broadcaster.name) as reader:
+            broadcaster.publish(events[:2])
+            assert _data(reader.read()) == ["0000", "0001"]
+
+            for sse in events[2:]:
+                broadcaster.publish([sse])
+            # Only the newest events are left, in order.
+            assert reader.read() == events[17:]
+            assert reader.skipped == 15
+
+
+def test_overwritten_while_reading(monkeypatch: pytest.MonkeyPatch) -> None:
+    with SSEBroadcaster(size=SMALL) as broadcaster:
+        with SSEBroadcastReader(broadcaster.name) as reader:
+            broadcaster.publish(_events(3))
+
+            # Pretend the writer moved the tail past the first record meanwhile.
+            unpack_from = _broadcast._POSITION.unpack_from
+            calls = []
+
+            class Position:
+                def unpack_from(self, buffer: Any, offset: int) -> Any:
+                    calls.append(offset)
+                    (value,) = unpack_from(buffer, offset)
+                    if len(calls) == 3:
+                        value += 40
+                    return (value,)
+
+            monkeypatch.setattr(_broadcast, "_POSITION", Position())
+            assert _data(reader.read()) == ["0001", "0002"]
+            monkeypatch.undo()
+
+
+def test_torn_record_header() -> None:
+    with SSEBroadcaster(size=SMALL) as broadcaster:
+        with SSEBroadcastReader(broadcaster.name) as reader:
+            broadcaster.publish(_events(2))
+            # The header of the second record is being overwritten.
+            buffer = broadcaster._buffer
+            start = 32 + 40
+            original = bytes(buffer[start : start + 40])
+            _broadcast._RECORD.pack_into(buffer, start, 1, 0, 0, 1000, -1)
+            assert _data(reader.read()) == ["0000"]
+
+            buffer[start : start + 40] = original
+            assert _data(reader.read()) == ["0001"]
+
+
+def test_invalid_sizes() -> None:
+    with pytest.raises(ValueError, match="size is too small"):
+        SSEBroadcaster(size=48)
+
+    with SSEBroadcaster(size=SMALL) as broadcaster:
+        with pytest.raises(ValueError, match="does not fit in a ring of 128 bytes"):
+            broadcaster.publish([ServerSentEvent(data="x" * 101)])
+
+
+def test_iter_sse() -> None:
+    broadcaster = SSEBroadcaster()
+    reader = SSEBroadcastReader(broadcaster.name)
+
+    def publish() -> None:
+        broadcaster.publish(_events(2))
+        broadcaster.close()
+
+    timer = threading.Timer(0.05, publish)
+    timer.start()
+    try:
+        assert _data(list(reader.iter_sse())) == ["0000", "0001"]
+        assert reader.closed
+    finally:
+        timer.join()
+        reader.close()
+
+
+@pytest.mark.asyncio
+async def test_aiter_sse() -> None:
+    broadcaster = SSEBroadcaster()
+    reader = SSEBroadcastReader(broadcaster.name)
+
+    def publish() -> None:
+        broadcaster.publish(_events(2))
+        broadcaster.close()
+
+    asyncio.get_running_loop().call_later(0.05, publish)
+    try:
+        assert _data([sse async for sse in reader.aiter_sse()]) == ["0000", "0001"]
+    finally:
+        reader.close()
+
+
+class Body(httpx.SyncByteStream, httpx.AsyncByteStream):
+    def __iter__(self) -> Iterator[bytes]:
+        yield b"data: 1\n\n"
+        yield b"data: 2\n\ndata: 3\n\n"
+
+    async def __aiter__(self) -> Any:
+        for chunk in self:
+            yield chunk
+
+
+def _transport() -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, headers={"content-type": "text/event-stream"}, stream=Body()
+        )
+
+    return httpx.MockTransport(handler)
+
+
+def test_run() -> None:
+    with SSEBroadcaster() as broadcaster:
+        with SSEBroadcastReader(broadcaster.name) as reader:
+            with httpx.Client(transport=_transport()) as client:
+                with connect_sse(client, "GET", "http://testserver") as event_source:
+                    broadcaster.run(event_source)
+            assert _data(reader.read()) == ["1", "2", "3"]
+
+
+@pytest.mark.asyncio
+async def test_arun() -> None:
+    with SSEBroadcaster() as broadcaster:
+        with SSEBroadcastReader(broadcaster.name) as reader:
+            async with httpx.AsyncClient(transport=_transport()) as client:
+                async with aconnect_sse(
+                    client, "GET", "http://testserver"
+                ) as event_source:
+                    await broadcaster.arun(event_source)
+            assert _data(reader.read()) == ["1", "2", "3"]
+
+
+def read_all(name: str, ready: Any, queue: Any) -> None:  # pragma: no cover
+    with SSEBroadcastReader(name) as reader:
+        ready.set()
+        queue.put([sse.data for sse in reader.iter_sse()])
+
+
+def test_other_process() -> None:
+    context = multiprocessing.get_context("spawn")
+    ready = context.Event()
+    queue = context.Queue()
+
+    with SSEBroadcaster() as broadcaster:
+        process = context.Process(
+            target=read_all, args=(broadcaster.name, ready, queue)
+        )
+        process.start()
+        assert ready.wait(30)
+        for start in range(0, 100, 10):
+            broadcaster.publish(_events(100)[start : start + 10])
+
+    assert queue.get(timeout=30) == [f"{i:04d}" for i in range(100)]
+    process.join()
+    assert process.exitcode == 0
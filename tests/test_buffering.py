@@ -0,0 +1,197 @@
+import asyncio
+from typing import Any, AsyncIterator, List, Union
+
+import httpx
+import pytest
+
+from httpx_sse import EventSource, ServerSentEvent
+from httpx_sse._buffering import _ConflatingBuffer, _EventBuffer
+
+
+def drain(buffer: _EventBuffer) -> List[str]:
+    events = []
+    while buffer:
+        events.append(buffer.pop().data)
+    return events
+
+
+def fill(buffer: _EventBuffer, events: List[ServerSentEvent]) -> List[bool]:
+    return [buffer.push(sse) for sse in events]
+
+
+class TestEventBuffer:
+    def test_block(self) -> None:
+        buffer = _EventBuffer(2)
+        assert fill(buffer, [ServerSentEvent(data=str(i)) for i in range(3)]) == [
+            True,
+            True,
+            False,
+        ]
+        assert drain(buffer) == ["0", "1"]
+        assert buffer.dropped == 0
+        assert buffer.high_water_mark == 2
+
+    def test_drop_oldest(self) -> None:
+        buffer = _EventBuffer(2, overflow="drop_oldest")
+        fill(buffer, [ServerSentEvent(data=str(i)) for i in range(4)])
+        assert drain(buffer) == ["2", "3"]
+        assert buffer.dropped == 2
+
+    def test_drop_newest(self) -> None:
+        buffer = _EventBuffer(2, overflow="drop_newest")
+        fill(buffer, [ServerSentEvent(data=str(i)) for i in range(4)])
+        assert drain(buffer) == ["0", "1"]
+        assert buffer.dropped == 2
+
+    def test_coalesce(self) -> None:
+        buffer = _EventBuffer(3, overflow="coalesce")
+        fill(
+            buffer,
+            [
+                ServerSentEvent(event="price", data="p1"),
+                ServerSentEvent(event="trade", data="t1"),
+                ServerSentEvent(event="price", data="p2"),
+                ServerSentEvent(event="price", data="p3"),
+                ServerSentEvent(event="status", data="s1"),
+            ],
+        )
+        # "p3" replaced "p2", then "s1" had no event of the same type to replace.
+        assert drain(buffer) == ["t1", "p3", "s1"]
+        assert buffer.dropped == 2
+        assert buffer.high_water_mark == 3
+
+    def test_invalid(self) -> None:
+        with pytest.raises(ValueError, match="max_size"):
+            _EventBuffer(0)
+        with pytest.raises(ValueError, match="overflow"):
+            _EventBuffer(1, overflow="unknown")
+
+
+class TestConflatingBuffer:
+    def test_keeps_newest_per_key(self) -> None:
+        buffer = _ConflatingBuffer(lambda sse: sse.event, max_size=2)
+        assert fill(
+            buffer,
+            [
+                ServerSentEvent(event="price", data="p1"),
+                ServerSentEvent(event="trade", data="t1"),
+                ServerSentEvent(event="price", data="p2"),
+                ServerSentEvent(event="status", data="s1"),
+            ],
+        ) == [True, True, True, False]
+        # "p2" replaced "p1" in place, and "s1" must wait for room.
+        assert drain(buffer) == ["p2", "t1"]
+        assert buffer.dropped == 1
+        assert buffer.high_water_mark == 2
+
+    def test_custom_key(self) -> None:
+        buffer = _ConflatingBuffer(lambda sse: sse.data[0], max_size=10)
+        fill(buffer, [ServerSentEvent(data=data) for data in ["a1", "b1", "a2"]])
+        assert drain(buffer) == ["a2", "b1"]
+
+
+def make_response(count: int, fail: bool = False) -> httpx.Response:
+    class AsyncBody(httpx.AsyncByteStream):
+        async def __aiter__(self) -> AsyncIterator[bytes]:
+            for i in range(count):
+                yield f"event: tick\ndata: {i}\n\n".encode()
+            if fail:
+                raise httpx.ReadError("Connection lost")
+
+    return httpx.Response(
+        200, headers={"content-type": "text/event-stream"}, stream=AsyncBody()
+    )
+
+
+@pytest.mark.asyncio
+async def test_aiter_sse_buffered_block() -> None:
+    event_source = EventSource(make_response(10))
+    events = []
+    async for sse in event_source.aiter_sse_buffered(max_size=3):
+        events.append(sse.data)
+        await asyncio.sleep(0)
+
+    assert events == [str(i) for i in range(10)]
+    assert event_source.dropped_events == 0
+    assert event_source.buffer_high_water_mark == 3
+
+
+@pytest.mark.asyncio
+async def test_aiter_sse_buffered_drop_oldest() -> None:
+    event_source = EventSource(make_response(10))
+    assert event_source.dropped_events == 0
+    assert event_source.buffer_high_water_mark == 0
+
+    events = []
+    async for sse in event_source.aiter_sse_buffered(
+        max_size=3, overflow="drop_oldest"
+    ):
+        # A slow consumer: the reader fills the buffer in the meantime.
+        await asyncio.sleep(0.01)
+        events.append(sse.data)
+
+    assert events[-3:] == ["7", "8", "9"]
+    assert event_source.dropped_events == 10 - len(events)
+    assert event_source.dropped_events > 0
+
+
+@pytest.mark.asyncio
+async def test_aiter_sse_buffered_error() -> None:
+    event_source = EventSource(make_response(2, fail=True))
+    events = []
+    with pytest.raises(httpx.ReadError):
+        async for sse in event_source.aiter_sse_buffered():
+            events.append(sse.data)
+
+    assert events == ["0", "1"]
+
+
+@pytest.mark.asyncio
+async def test_aiter_sse_buffered_early_exit() -> None:
+    event_source = EventSource(make_response(100))
+    events = event_source.aiter_sse_buffered(max_size=3)
+    async for sse in events:
+        assert sse.data == "0"
+        break
+    await events.aclose()
+
+    assert [sse async for sse in events] == []
+    await event_source.response.aclose()
+
+
+@pytest.mark.asyncio
+async def test_aiter_sse_conflated() -> None:
+    loads = []
+
+    def json_loads(data: Union[str, bytes]) -> Any:
+        loads.append(data)
+        return int(data)
+
+    event_source = EventSource(make_response(100), json_loads=json_loads)
+    values = []
+    async for sse in event_source.aiter_sse_conflated():
+        # A slow consumer: the reader conflates events in the meantime.
+        await asyncio.sleep(0.01)
+        values.append(sse.json())
+
+    assert values[-1] == 99
+    assert values == sorted(values)
+    assert event_source.dropped_events == 100 - len(values)
+    assert event_source.dropped_events > 0
+    assert event_source.buffer_high_water_mark == 1
+    # Superseded events were not decoded.
+    assert len(loads) == len(values)
+
+
+@pytest.mark.asyncio
+async def test_aiter_sse_conflated_block() -> None:
+    event_source = EventSource(make_response(10))
+    events = [
+        sse.data
+        async for sse in event_source.aiter_sse_conflated(
+            key=lambda sse: sse.data, max_size=2
+        )
+    ]
+
+    assert events == [str(i) for i in range(10)]
+    assert event_source.dropped_events == 0
@@ -0,0 +1,190 @@
+import asyncio
+import zlib
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+import httpx
+import pytest
+
+from httpx_sse import (
+    ASGIEventStream,
+    EventSource,
+    ServerSentEvent,
+    WSGIEventStream,
+    aconnect_sse,
+    connect_sse,
+)
+from httpx_sse._compression import (
+    _accepts_gzip,
+    _GzipCompressor,
+    _ZlibDecoder,
+)
+
+EVENTS = [
+    ServerSentEvent(event="tick", data=f'{{"symbol": "ABC", "price": {i}}}', id=str(i))
+    for i in range(50)
+]
+
+
+async def iter_async(events: List[ServerSentEvent]) -> AsyncIterator[ServerSentEvent]:
+    for sse in events:
+        yield sse
+
+
+def _encoded(sse: ServerSentEvent) -> bytes:
+    return f"event: {sse.event}\nid: {sse.id}\ndata: {sse.data}\n\n".encode()
+
+
+def test_flushed_events_are_decoded_immediately() -> None:
+    compressor = _GzipCompressor()
+    decoder = _ZlibDecoder("gzip")
+
+    for sse in EVENTS[:3]:
+        assert decoder.decode(compressor.compress(_encoded(sse))) == _encoded(sse)
+
+    assert decoder.decode(compressor.finish()) == b""
+
+
+@pytest.mark.parametrize("wbits", [zlib.MAX_WBITS, -zlib.MAX_WBITS])
+def test_deflate(wbits: int) -> None:
+    compressor = zlib.compressobj(wbits=wbits)
+    content = compressor.compress(b"data: hello\n\n") + compressor.flush()
+    decoder = _ZlibDecoder("deflate")
+    assert decoder.decode(content[:5]) + decoder.decode(content[5:]) == (
+        b"data: hello\n\n"
+    )
+
+
+def test_invalid_content() -> None:
+    decoder = _ZlibDecoder("gzip")
+    with pytest.raises(httpx.DecodingError):
+        decoder.decode(b"not gzip")
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip", True),
+        ("deflate, GZIP;q=0.5", True),
+        ("br, *", True),
+        ("gzip;q=0", False),
+        ("gzip;q=invalid", False),
+        ("*;q=0, gzip", True),
+        ("br", False),
+        ("", False),
+    ],
+)
+def test_accepts_gzip(accept_encoding: str, expected: bool) -> None:
+    assert _accepts_gzip(accept_encoding) is expected
+
+
+def test_wsgi_round_trip() -> None:
+    app = WSGIEventStream(EVENTS, heartbeat=None, compress=True)
+
+    with httpx.Client(transport=httpx.WSGITransport(app)) as client:
+        with connect_sse(
+            client, "GET", "http://testserver", compression=True
+        ) as event_source:
+            response = event_source.response
+            assert response.request.headers["accept-encoding"] == "gzip, deflate"
+            assert response.headers["content-encoding"] == "gzip"
+            assert response.headers["vary"] == "accept-encoding"
+            assert list(event_source.iter_sse()) == EVENTS
+
+            ratio = event_source.compression_ratio
+            assert ratio is not None and ratio > 2
+            assert event_source.decompression_time > 0
+
+
+def test_wsgi_round_trip_with_heartbeat() -> None:
+    app = WSGIEventStream(EVENTS, heartbeat=1.0, compress=True)
+
+    with httpx.Client(transport=httpx.WSGITransport(app)) as client:
+        with connect_sse(
+            client, "GET", "http://testserver", compression=True
+        ) as event_source:
+            assert list(event_source.iter_sse()) == EVENTS
+
+
+def test_compression_disabled() -> None:
+    app = WSGIEventStream(EVENTS, heartbeat=None, compress=True)
+
+    with httpx.Client(transport=httpx.WSGITransport(app)) as client:
+        with connect_sse(
+            client, "GET", "http://testserver", compression=False
+        ) as event_source:
+            response = event_source.response
+            assert response.request.headers["accept-encoding"] == "identity"
+            assert "content-encoding" not in response.headers
+            assert list(event_source.iter_sse()) == EVENTS
+            assert event_source.compression_ratio is None
+            assert event_source.decompression_time == 0
+
+
+@pytest.mark.asyncio
+async def test_asgi_round_trip() -> None:
+    app = ASGIEventStream(iter_async(EVENTS), compress=True)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app)) as client:  # type: ignore[arg-type]
+        async with aconnect_sse(
+            client, "GET", "http://testserver", compression=True
+        ) as event_source:
+            assert event_source.response.headers["content-encoding"] == "gzip"
+            assert [sse async for sse in event_source.aiter_sse()] == EVENTS
+            ratio = event_source.compression_ratio
+            assert ratio is not None and ratio > 2
+
+
+def _gzip_response(chunks: List[bytes]) -> httpx.Response:
+    class Body(httpx.SyncByteStream, httpx.AsyncByteStream):
+        def __iter__(self) -> Iterator[bytes]:
+            yield from chunks
+
+        async def __aiter__(self) -> AsyncIterator[bytes]:
+            for chunk in chunks:
+                yield chunk
+
+    return httpx.Response(
+        200,
+        headers={"content-type": "text/event-stream", "content-encoding": "gzip"},
+        stream=Body(),
+    )
+
+
+def _unfinished_gzip(content: bytes) -> List[bytes]:
+    # An empty chunk is decoded to nothing, and the end of the stream is missing,
+    # e.g. if the connection was closed.
+    compressor = _GzipCompressor()
+    return [b"", compressor.compress(content)]
+
+
+def test_streaming() -> None:
+    event_source = EventSource(_gzip_response(_unfinished_gzip(b"data: hello\n\n")))
+    assert ["".join(sse.iter_data()) for sse in event_source.iter_sse_streaming()] == [
+        "hello"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_streaming_async() -> None:
+    content = zlib.compress(b"data: hello\n\n", wbits=zlib.MAX_WBITS | 16)
+    event_source = EventSource(_gzip_response([content[:10], content[10:]]))
+    events = [sse async for sse in event_source.aiter_sse_streaming()]
+    assert len(events) == 1
+
+
+@pytest.mark.asyncio
+async def test_asgi_without_accept_encoding() -> None:
+    messages: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        await asyncio.sleep(60)
+        return {"type": "http.disconnect"}  # pragma: no cover
+
+    async def send(message: Dict[str, Any]) -> None:
+        messages.append(message)
+
+    app = ASGIEventStream(iter_async(EVENTS[:1]), heartbeat=None, compress=True)
+    await app({"type": "http", "headers": []}, receive, send)
+
+    assert b"content-encoding" not in dict(messages[0]["headers"])
+    assert messages[1]["body"] == _encoded(EVENTS[0])
@@ -1,4 +1,16 @@
-from httpx_sse._decoders import SSELineDecoder, _splitlines_sse
+from typing import List, Optional, Tuple
+
+import pytest
+
+from httpx_sse import RawServerSentEvent, SSEError
+from httpx_sse._decoders import (
+    RawSSEBytesDecoder,
+    SSEBytesDecoder,
+    SSEBytesLineDecoder,
+    SSEDecoder,
+    SSELineDecoder,
+    _splitlines_sse,
+)
 
 
 class TestSplitlinesSSE:
@@ -160,6 +172,11 @@ class TestSSELineDecoder:
         chunks = ["h", "e", "l", "l", "o", "\n", "w", "o", "r", "l", "d"]
         assert self._decode_chunks(chunks) == ["hello", "world"]
 
+    def test_long_line_in_single_char_chunks(self) -> None:
+        line = "x" * 10_000
+        chunks = list(line + "\r\n" + line + "\r")
+        assert self._decode_chunks(chunks) == [line, line]
+
     def test_cr_lf_as_separate_chunks(self) -> None:
         # Each character as separate chunk
         chunks = ["l", "i", "n", "e", "1", "\r", "\n", "l", "i", "n", "e", "2"]
@@ -192,3 +209,227 @@ class TestSSELineDecoder:
             "fourth",
             "fifth",
         ]
+
+    def test_leading_bom_is_removed(self) -> None:
+        chunks = ["\ufeffdata: 1\n", "\ufeffdata: 2\n"]
+        assert self._decode_chunks(chunks) == ["data: 1", "\ufeffdata: 2"]
+
+    def test_leading_bom_in_partial_line(self) -> None:
+        assert self._decode_chunks(["\ufeff", "data", ": 1\n"]) == ["data: 1"]
+        assert self._decode_chunks(["\ufeffdata"]) == ["data"]
+        assert self._decode_chunks(["\ufeff\n"]) == [""]
+
+
+def test_sse_line_decoder_does_not_rejoin_partial_lines() -> None:
+    # Pieces of an incomplete line are only joined once, when it completes, so
+    # that decoding is linear in the length of the line.
+    decoder = SSELineDecoder()
+    for char in "x" * 1000:
+        assert decoder.decode(char) == []
+    assert decoder.buffer == ["x"] * 1000
+    assert decoder.decode("\n") == ["x" * 1000]
+    assert decoder.buffer == []
+
+
+class TestSSEBytesLineDecoder(TestSSELineDecoder):
+    def _decode_chunks(self, chunks: list[str]) -> list[str]:
+        decoder = SSEBytesLineDecoder()
+        lines = []
+        for chunk in chunks:
+            lines.extend(decoder.decode(chunk.encode()))
+        lines.extend(decoder.flush())
+        return [line.decode() for line in lines]
+
+    def test_multibyte_character_across_chunks(self) -> None:
+        decoder = SSEBytesLineDecoder()
+        data = "café\n".encode()
+        assert decoder.decode(data[:4]) == []
+        assert decoder.decode(data[4:]) == ["café".encode()]
+
+    def test_leading_bom_across_chunks(self) -> None:
+        decoder = SSEBytesLineDecoder()
+        for byte in b"\xef\xbb\xbf":
+            assert decoder.decode(bytes([byte])) == []
+        assert decoder.decode(b"data: 1\n") == [b"data: 1"]
+
+    def test_trailing_cr_then_empty_chunk(self) -> None:
+        decoder = SSEBytesLineDecoder()
+        assert decoder.decode(b"line1\r") == [b"line1"]
+        assert decoder.decode(b"") == []
+        assert decoder.decode(b"\nline2\n") == [b"line2"]
+
+    def test_max_line_size(self) -> None:
+        decoder = SSEBytesLineDecoder(max_line_size=5)
+        assert decoder.decode(b"12345\n123") == [b"12345"]
+        assert decoder.decode(b"45\n") == [b"12345"]
+        assert decoder.decode(b"1234\r\n12") == [b"1234"]
+        with pytest.raises(SSEError, match="maximum size of 5 bytes"):
+            decoder.decode(b"3456")
+
+    def test_max_line_size_within_chunk(self) -> None:
+        decoder = SSEBytesLineDecoder(max_line_size=5)
+        with pytest.raises(SSEError):
+            decoder.decode(b"123\n123456\n123")
+
+        decoder = SSEBytesLineDecoder(max_line_size=5)
+        with pytest.raises(SSEError):
+            decoder.decode(b"123\n123456")
+
+
+_Event = Tuple[str, str, str, Optional[int]]
+
+
+class TestSSEDecoder:
+    def _decode_lines(self, lines: List[str]) -> List[_Event]:
+        decoder = SSEDecoder()
+        events = []
+        for line in lines:
+            sse = decoder.decode(line)
+            if sse is not None:
+                events.append((sse.event, sse.data, sse.id, sse.retry))
+        return events
+
+    def test_data(self) -> None:
+        lines = ["data: YH00", "data: +2", "data: 10", ""]
+        assert self._decode_lines(lines) == [("message", "YH00\n+2\n10", "", None)]
+
+    def test_fields(self) -> None:
+        lines = ["event:add", "data:73857293", "id: 1", "retry: 1000", ""]
+        assert self._decode_lines(lines) == [("add", "73857293", "1", 1000)]
+
+    def test_last_event_id_is_kept(self) -> None:
+        lines = ["id: 1", "data: first", "", "data: second", ""]
+        assert self._decode_lines(lines) == [
+            ("message", "first", "1", None),
+            ("message", "second", "1", None),
+        ]
+
+    def test_comments_and_empty_events_are_ignored(self) -> None:
+        lines = [": comment", "", ""]
+        assert self._decode_lines(lines) == []
+
+    def test_invalid_fields_are_ignored(self) -> None:
+        lines = ["id: 1\0", "retry: 1667a", "something: ignore", "data", ""]
+        assert self._decode_lines(lines) == [("message", "", "", None)]
+
+    def test_unicode(self) -> None:
+        lines = ["event: caf\u00e9", "data: \u2028\u00e9", ""]
+        assert self._decode_lines(lines) == [("caf\u00e9", "\u2028\u00e9", "", None)]
+
+
+class TestSSEBytesDecoder(TestSSEDecoder):
+    def _decode_lines(self, lines: List[str]) -> List[_Event]:
+        decoder = SSEBytesDecoder()
+        events = []
+        for line in lines:
+            sse = decoder.decode(line.encode())
+            if sse is not None:
+                events.append((sse.event, sse.data, sse.id, sse.retry))
+        return events
+
+    def test_invalid_utf8_is_replaced(self) -> None:
+        decoder = SSEBytesDecoder()
+        assert decoder.decode(b"data: \xff") is None
+        sse = decoder.decode(b"")
+        assert sse is not None
+        assert sse.data == "\ufffd"
+
+    def test_reset_discards_incomplete_event(self) -> None:
+        decoder = SSEBytesDecoder()
+        for line in [b"id: 1", b"retry: 500", b"data: first", b""]:
+            decoder.decode(line)
+        for line in [b"id: 2", b"event: lost", b"data: lost", b"retry: 100"]:
+            decoder.decode(line)
+
+        decoder.reset()
+
+        assert decoder._last_event_id == "1"
+        assert decoder._reconnection_time == 100
+        assert decoder.decode(b"data: second") is None
+        sse = decoder.decode(b"")
+        assert sse is not None
+        assert (sse.event, sse.data, sse.id, sse.retry) == (
+            "message",
+            "second",
+            "1",
+            None,
+        )
+
+    def test_max_event_size(self) -> None:
+        decoder = SSEBytesDecoder(max_event_size=7)
+        for line in [b"data: 123", b"data: 123", b"", b"data: 1234567", b""]:
+            decoder.decode(line)
+
+        decoder.decode(b"data: 123")
+        with pytest.raises(SSEError, match="maximum size of 7 bytes"):
+            decoder.decode(b"data:1234")
+
+    def test_event_types(self) -> None:
+        decoder = SSEBytesDecoder(event_types=["add", "message"])
+        lines = [
+            b"event: add",
+            b"data: 1",
+            b"",
+            b"data: rejected",
+            b"event: remove",
+            b"data: rejected",
+            b"id: 1",
+            b"",
+            b"data: 2",
+            b"",
+            b"event",
+            b"data: 3",
+            b"",
+        ]
+        events = [decoder.decode(line) for line in lines]
+
+        assert [(sse.event, sse.data, sse.id) for sse in events if sse] == [
+            ("add", "1", ""),
+            ("message", "2", "1"),
+            ("message", "3", "1"),
+        ]
+        assert decoder.event_counts == {"add": 1, "remove": 1, "message": 2}
+        assert decoder._data == []
+
+    def test_event_types_default_type_is_filtered_on_dispatch(self) -> None:
+        decoder = SSEBytesDecoder(event_types=["add"])
+        assert decoder.event_types == frozenset(["add"])
+        assert decoder.decode(b"data: 1") is None
+        assert decoder.decode(b"") is None
+        assert decoder.event_counts == {"message": 1}
+
+    def test_event_types_rejected_event_stays_rejected(self) -> None:
+        decoder = SSEBytesDecoder(event_types=["add"])
+        for line in [b"event: remove", b"data: 1", b"event: add", b"data: 2"]:
+            decoder.decode(line)
+        assert decoder.decode(b"") is None
+        assert decoder.event_counts == {"add": 1}
+
+    def test_event_types_can_be_changed(self) -> None:
+        decoder = SSEBytesDecoder()
+        assert decoder.event_types is None
+        decoder.event_types = frozenset(["add"])
+        decoder.decode(b"event: remove")
+        decoder.event_types = None
+        decoder.decode(b"data: 1")
+        assert decoder.decode(b"") is None
+
+    def test_max_event_size_is_reset(self) -> None:
+        decoder = SSEBytesDecoder(max_event_size=3)
+        decoder.decode(b"data: 123")
+        decoder.reset()
+        decoder.decode(b"data: 123")
+        with pytest.raises(SSEError):
+            decoder.decode(b"data")
+
+
+class TestRawSSEBytesDecoder(TestSSEDecoder):
+    def _decode_lines(self, lines: List[str]) -> List[_Event]:
+        decoder = RawSSEBytesDecoder()
+        events = []
+        for line in lines:
+            sse = decoder.decode(line.encode())
+            if sse is not None:
+                assert isinstance(sse, RawServerSentEvent)
+                events.append((sse.event, sse.data, sse.id, sse.retry))
+        return events
@@ -0,0 +1,351 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, Optional, Type
+
+import httpx
+import pytest
+
+from httpx_sse import ServerSentEvent, SSEError, SSEIdleTimeout, aconnect_sse_direct
+from httpx_sse._direct import _SSEProtocol
+from httpx_sse._parser import SSEParser
+
+HEAD = (
+    b"HTTP/1.1 200 OK\r\n"
+    b"Content-Type: text/event-stream\r\n"
+    b"Transfer-Encoding: chunked\r\n\r\n"
+)
+
+
+def _chunk(data: bytes) -> bytes:
+    return b"%x\r\n%s\r\n" % (len(data), data)
+
+
+class FakeTransport(asyncio.Transport):
+    def __init__(self) -> None:
+        super().__init__()
+        self.paused = False
+        self.closed = False
+
+    def pause_reading(self) -> None:
+        self.paused = True
+
+    def resume_reading(self) -> None:
+        self.paused = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def _protocol() -> _SSEProtocol:
+    protocol = _SSEProtocol(SSEParser())
+    protocol.connection_made(FakeTransport())
+    return protocol
+
+
+def _receive(protocol: _SSEProtocol, data: bytes) -> None:
+    transport: Any = protocol._transport
+    # Like asyncio, stop reading once the transport is closed.
+    while data and not transport.closed:
+        buffer = protocol.get_buffer(-1)
+        size = min(len(buffer), len(data))
+        buffer[:size] = data[:size]
+        protocol.buffer_updated(size)
+        data = data[size:]
+
+
+async def _events(protocol: _SSEProtocol) -> List[str]:
+    events: List[str] = []
+    while True:
+        batch = await protocol.next_batch(None)
+        if batch is None:
+            return events
+        events += [sse.data for sse in batch]
+
+
+@pytest.mark.asyncio
+async def test_protocol_chunked() -> None:
+    protocol = _protocol()
+    stream = (
+        b"HTTP/1.1 100 Continue\r\n\r\n"
+        + HEAD
+        + _chunk(b"data: 1\n\ndata:")
+        + _chunk(b" 2\n\n")
+        + b"0\r\nx-trailer: 1\r\n\r\n"
+    )
+    for i in range(len(stream)):
+        _receive(protocol, stream[i : i + 1])
+
+    status_code, headers = await protocol.head
+    assert status_code == 200
+    assert (b"Content-Type", b"text/event-stream") in headers
+    assert await _events(protocol) == ["1", "2"]
+    assert protocol._transport.closed  # type: ignore[union-attr]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "head, body",
+    [
+        (b"Content-Length: 10\r\n", b"data: 1\n\nignored"),
+        (b"Content-Length: 0\r\n", b""),
+        (b"", b"data: 1\n\n"),
+    ],
+)
+async def test_protocol_unchunked(head: bytes, body: bytes) -> None:
+    protocol = _protocol()
+    _receive(protocol, b"HTTP/1.1 200 OK\r\n" + head + b"\r\n" + body)
+    if not head:
+        # The body ends when the connection is closed.
+        protocol.connection_lost(None)
+    assert await _events(protocol) == (["1"] if body else [])
+
+
+@pytest.mark.asyncio
+async def test_protocol_compacts_buffer() -> None:
+    protocol = _protocol()
+    data = b"data: " + b"x" * 62000 + b"\n\n"
+    # Leaves less room than a read in the buffer, with an incomplete chunk size.
+    _receive(protocol, HEAD + _chunk(data) + b"d")
+    _receive(protocol, b"\r\ndata: hello\n\n\r\n0\r\n\r\n")
+    assert await _events(protocol) == [data[6:-2].decode(), "hello"]
+
+
+@pytest.mark.asyncio
+async def test_protocol_flow_control() -> None:
+    protocol = _protocol()
+    transport: Any = protocol._transport
+    _receive(protocol, HEAD)
+    for i in range(64):
+        _receive(protocol, _chunk(b"data: %d\n\n" % i))
+    assert transport.paused
+
+    for i in range(47):
+        await protocol.next_batch(None)
+        assert transport.paused
+    await protocol.next_batch(None)
+    assert not transport.paused
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "data, exc_type, match",
+    [
+        (b"HTTP/1.1 OK\r\n\r\n", httpx.RemoteProtocolError, "Invalid status line"),
+        (b"HTTP/2 200 OK\r\n\r\n", httpx.RemoteProtocolError, "Invalid status line"),
+        (
+            b"HTTP/1.1 200 OK\r\nno colon\r\n\r\n",
+            httpx.RemoteProtocolError,
+            "Invalid header line",
+        ),
+        (
+            b"HTTP/1.1 200 OK\r\nContent-Length: -1\r\n\r\n",
+            httpx.RemoteProtocolError,
+            "Invalid Content-Length",
+        ),
+        (
+            b"HTTP/1.1 200 OK\r\nContent-Encoding: gzip\r\n\r\n",
+            httpx.DecodingError,
+            "Unsupported Content-Encoding",
+        ),
+        (
+            b"HTTP/1.1 200 OK\r\nX-Large: " + b"x" * 70000,
+            httpx.RemoteProtocolError,
+            "Response head is too large",
+        ),
+        (HEAD + b"zz\r\n", httpx.RemoteProtocolError, "Invalid chunk size"),
+        (HEAD + b"-5\r\n", httpx.RemoteProtocolError, "Invalid chunk size"),
+        (HEAD + b"1" * 2000, httpx.RemoteProtocolError, "Invalid chunk size"),
+        (HEAD + b"1\r\nxyz", httpx.RemoteProtocolError, "Invalid chunk terminator"),
+    ],
+)
+async def test_protocol_errors(
+    data: bytes, exc_type: Type[Exception], match: str
+) -> None:
+    protocol = _protocol()
+    _receive(protocol, data)
+    with pytest.raises(exc_type, match=match):
+        await protocol.head
+        await protocol.next_batch(None)
+    assert protocol._transport.closed  # type: ignore[union-attr]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "exc, exc_type",
+    [
+        (None, httpx.RemoteProtocolError),
+        (ConnectionResetError("Connection reset"), httpx.ReadError),
+    ],
+)
+async def test_protocol_connection_lost(
+    exc: Optional[Exception], exc_type: Type[Exception]
+) -> None:
+    protocol = _protocol()
+    _receive(protocol, HEAD + _chunk(b"data: 1\n\n"))
+    assert await protocol.next_batch(None) is not None
+
+    asyncio.get_running_loop().call_soon(protocol.connection_lost, exc)
+    with pytest.raises(exc_type):
+        await protocol.next_batch(None)
+
+
+@pytest.mark.asyncio
+async def test_protocol_idle_timeout() -> None:
+    protocol = _protocol()
+    _receive(protocol, HEAD)
+    loop = asyncio.get_running_loop()
+    # Comments count as activity.
+    loop.call_later(0.1, _receive, protocol, _chunk(b": ping\n"))
+    loop.call_later(0.25, _receive, protocol, _chunk(b"data: 1\n\n"))
+
+    batch = await protocol.next_batch(0.2)
+    assert batch == [ServerSentEvent(data="1")]
+
+    with pytest.raises(SSEIdleTimeout, match="No data received"):
+        await protocol.next_batch(0.05)
+
+
+@asynccontextmanager
+async def serve(
+    response: bytes, requests: List[bytes], read_request: bool = True
+) -> AsyncIterator[int]:
+    async def handle(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        if read_request:
+            requests.append(await reader.readuntil(b"\r\n\r\n"))
+        if response:
+            writer.write(response)
+            await writer.drain()
+            writer.close()
+        else:
+            # Stall.
+            await asyncio.sleep(10)
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    try:
+        yield server.sockets[0].getsockname()[1]
+    finally:
+        server.close()
+
+
+@pytest.mark.asyncio
+async def test_aconnect_sse_direct() -> None:
+    requests: List[bytes] = []
+    stream = HEAD + _chunk(b"event: add\ndata: 1\n\ndata: 2\n\ndata: 3\n\n")
+    stream += b"0\r\n\r\n"
+
+    async with serve(stream, requests) as port:
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{port}", headers={"Authorization": "token"}
+        ) as client:
+            async with aconnect_sse_direct(
+                client, "GET", "/events", params={"a": "1"}
+            ) as event_source:
+                assert event_source.response.status_code == 200
+                assert event_source.response.http_version == "HTTP/1.1"
+                assert event_source.parser.last_event_id == ""
+                batches = [
+                    batch async for batch in event_source.aiter_sse_batches(max_size=2)
+                ]
+                assert [len(batch) for batch in batches] == [2, 1]
+                assert event_source.event_counts == {"add": 1, "message": 2}
+                assert event_source.last_activity > 0
+
+            async with aconnect_sse_direct(client, "GET", "/events") as event_source:
+                assert [sse.data async for sse in event_source.aiter_sse()] == [
+                    "1",
+                    "2",
+                    "3",
+                ]
+
+    request_line, *header_lines = requests[0].decode().split("\r\n")
+    assert request_line == "GET /events?a=1 HTTP/1.1"
+    assert f"Host: 127.0.0.1:{port}" in header_lines
+    assert "Authorization: token" in header_lines
+    assert "Accept: text/event-stream" in header_lines
+    assert "Cache-Control: no-store" in header_lines
+    assert "Accept-Encoding: identity" in header_lines
+
+
+@pytest.mark.asyncio
+async def test_aconnect_sse_direct_streaming_request_body() -> None:
+    requests: List[bytes] = []
+
+    async def content() -> AsyncIterator[bytes]:
+        yield b"hello"
+
+    async with serve(HEAD + b"0\r\n\r\n", requests) as port:
+        async with httpx.AsyncClient() as client:
+            async with aconnect_sse_direct(
+                client, "POST", f"http://127.0.0.1:{port}", content=content()
+            ) as event_source:
+                assert [sse async for sse in event_source.aiter_sse()] == []
+
+    assert "Content-Length: 5" in requests[0].decode().split("\r\n")
+
+
+@pytest.mark.asyncio
+async def test_aconnect_sse_direct_invalid_content_type() -> None:
+    response = b"HTTP/1.1 404 Not Found\r\nContent-Type: text/plain\r\n\r\n"
+    async with serve(response, []) as port:
+        async with httpx.AsyncClient() as client:
+            async with aconnect_sse_direct(
+                client, "GET", f"http://127.0.0.1:{port}"
+            ) as event_source:
+                assert event_source.response.status_code == 404
+                with pytest.raises(SSEError):
+                    [sse async for sse in event_source.aiter_sse()]
+                with pytest.raises(SSEError):
+                    [batch async for batch in event_source.aiter_sse_batches()]
+
+
+@pytest.mark.asyncio
+async def test_aconnect_sse_direct_read_timeout() -> None:
+    async with serve(b"", []) as port:
+        async with httpx.AsyncClient(timeout=httpx.Timeout(5, read=0.1)) as client:
+            with pytest.raises(httpx.ReadTimeout):
+                async with aconnect_sse_direct(
+                    client, "GET", f"http://127.0.0.1:{port}"
+                ):
+                    pass  # pragma: no cover
+
+
+@pytest.mark.asyncio
+async def test_aconnect_sse_direct_connect_errors() -> None:
+    async with serve(b"", []) as port:
+        pass
+
+    async with httpx.AsyncClient() as client:
+        with pytest.raises(httpx.ConnectError):
+            async with aconnect_sse_direct(client, "GET", f"http://127.0.0.1:{port}"):
+                pass  # pragma: no cover
+
+        with pytest.raises(httpx.ConnectTimeout):
+            async with aconnect_sse_direct(
+                client,
+                "GET",
+                f"http://127.0.0.1:{port}",
+                timeout=httpx.Timeout(5, connect=0),
+            ):
+                pass  # pragma: no cover
+
+        with pytest.raises(httpx.UnsupportedProtocol):
+            async with aconnect_sse_direct(client, "GET", "ftp://127.0.0.1"):
+                pass  # pragma: no cover
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "transport",
+    [None, httpx.MockTransport(lambda request: httpx.Response(200))],
+)
+async def test_aconnect_sse_direct_tls(transport: Any) -> None:
+    # The server does not speak TLS.
+    async with serve(HEAD, [], read_request=False) as port:
+        async with httpx.AsyncClient(transport=transport) as client:
+            with pytest.raises(httpx.ConnectError):
+                async with aconnect_sse_direct(
+                    client, "GET", f"https://127.0.0.1:{port}"
+                ):
+                    pass  # pragma: no cover
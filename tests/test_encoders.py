@@ -0,0 +1,81 @@
+from typing import List
+
+import pytest
+
+from httpx_sse import ServerSentEvent, SSEEncoder
+from httpx_sse._decoders import SSEBytesDecoder, SSEBytesLineDecoder
+
+
+def _decode(data: bytes) -> List[ServerSentEvent]:
+    line_decoder = SSEBytesLineDecoder()
+    decoder = SSEBytesDecoder()
+    events = []
+    for line in line_decoder.decode(data):
+        sse = decoder.decode(line)
+        if sse is not None:
+            events.append(sse)
+    return events
+
+
+@pytest.mark.parametrize(
+    "sse, expected",
+    [
+        pytest.param(ServerSentEvent(data="hello"), b"data: hello\n\n", id="data"),
+        pytest.param(ServerSentEvent(), b"data: \n\n", id="empty"),
+        pytest.param(
+            ServerSentEvent(data="a\nb\r\nc\rd"),
+            b"data: a\ndata: b\ndata: c\ndata: d\n\n",
+            id="multiline",
+        ),
+        pytest.param(
+            ServerSentEvent(event="add", data="1", id="42", retry=1000),
+            b"event: add\nid: 42\nretry: 1000\ndata: 1\n\n",
+            id="fields",
+        ),
+        pytest.param(
+            ServerSentEvent(data="café"), b"data: caf\xc3\xa9\n\n", id="unicode"
+        ),
+    ],
+)
+def test_encode(sse: ServerSentEvent, expected: bytes) -> None:
+    assert SSEEncoder().encode(sse) == expected
+
+
+def test_encode_batch_round_trip() -> None:
+    events = [
+        ServerSentEvent(data="first"),
+        ServerSentEvent(event="add", data='{"a": 1}\n{"b": 2}', id="1"),
+        ServerSentEvent(data="", retry=500),
+        ServerSentEvent(data=" leading space", id="2"),
+    ]
+    decoded = _decode(SSEEncoder().encode_batch(events))
+    # The last event ID is kept across events.
+    events[2] = ServerSentEvent(data="", id="1", retry=500)
+    assert decoded == events
+
+
+def test_encode_raw_data() -> None:
+    (sse,) = _decode(b"data: \xc3\xa9\ndata: x\n\n")
+    assert sse._raw_data is not None
+    assert SSEEncoder().encode(sse) == b"data: \xc3\xa9\ndata: x\n\n"
+    # The data was not decoded.
+    assert sse._raw_data is not None
+
+
+@pytest.mark.parametrize(
+    "sse",
+    [ServerSentEvent(event="a\nb"), ServerSentEvent(id="1\r2")],
+)
+def test_encode_rejects_newlines_in_fields(sse: ServerSentEvent) -> None:
+    with pytest.raises(ValueError, match="must not contain newlines"):
+        SSEEncoder().encode(sse)
+
+
+def test_comment() -> None:
+    encoder = SSEEncoder()
+    assert encoder.comment() == b":\n"
+    assert encoder.comment("keep-alive") == b": keep-alive\n"
+    assert encoder.comment("a\r\nb") == b": a\n: b\n"
+    assert _decode(encoder.comment("a") + encoder.encode(ServerSentEvent())) == [
+        ServerSentEvent()
+    ]
@@ -3,7 +3,7 @@ from typing import AsyncIterator, Iterator
 import httpx
 import pytest
 
-from httpx_sse import EventSource
+from httpx_sse import EventSource, ServerSentEvent
 
 # NOTE: the 'whatwg_example*' test cases are inspired by:
 # https://html.spec.whatwg.org/multipage/server-sent-events.html#event-stream-interpretation  # noqa: E501
@@ -280,3 +280,149 @@ async def test_aiter_sse() -> None:
     assert events[0].data == "YH00\n+2\n10"
     assert events[0].id == ""
     assert events[0].retry is None
+
+
+def test_iter_sse_incomplete_event_discarded() -> None:
+    class Body(httpx.SyncByteStream):
+        def __iter__(self) -> Iterator[bytes]:
+            yield b"data: complete\n\n"
+            yield b"id: 1\n"
+            yield b"data: incomplete"
+
+    response = httpx.Response(
+        200,
+        headers={"content-type": "text/event-stream"},
+        stream=Body(),
+    )
+
+    events = list(EventSource(response).iter_sse())
+    assert len(events) == 1
+    assert events[0].data == "complete"
+
+
+def test_iter_sse_batches() -> None:
+    class Body(httpx.SyncByteStream):
+        def __iter__(self) -> Iterator[bytes]:
+            yield b"data: 1\n\ndata: 2\n\ndata: 3"
+            yield b"\n\n: keep-alive\n\n"
+            yield b"data: 4\n\n"
+
+    response = httpx.Response(
+        200,
+        headers={"content-type": "text/event-stream"},
+        stream=Body(),
+    )
+
+    batches = list(EventSource(response).iter_sse_batches())
+    assert [[sse.data for sse in batch] for batch in batches] == [
+        ["1", "2"],
+        ["3"],
+        ["4"],
+    ]
+
+
+def test_iter_sse_batches_max_size() -> None:
+    class Body(httpx.SyncByteStream):
+        def __iter__(self) -> Iterator[bytes]:
+            yield b"data: 1\n\ndata: 2\n\ndata: 3\n\ndata: 4\n\ndata: 5\n\n"
+            yield b"data: 6\n\n"
+
+    response = httpx.Response(
+        200,
+        headers={"content-type": "text/event-stream"},
+        stream=Body(),
+    )
+
+    batches = list(EventSource(response).iter_sse_batches(max_size=2))
+    assert [[sse.data for sse in batch] for batch in batches] == [
+        ["1", "2"],
+        ["3", "4"],
+        ["5"],
+        ["6"],
+    ]
+
+
+@pytest.mark.parametrize("max_size", [0, -1])
+def test_iter_sse_batches_invalid_max_size(max_size: int) -> None:
+    response = httpx.Response(200, headers={"content-type": "text/event-stream"})
+
+    with pytest.raises(ValueError, match="max_size"):
+        next(EventSource(response).iter_sse_batches(max_size=max_size))
+
+
+@pytest.mark.asyncio
+async def test_aiter_sse_batches() -> None:
+    class AsyncBody(httpx.AsyncByteStream):
+        async def __aiter__(self) -> AsyncIterator[bytes]:
+            yield b"data: 1\n\ndata: 2\n\ndata: 3\n\n"
+            yield b"data: 4\n\n"
+
+    response = httpx.Response(
+        200,
+        headers={"content-type": "text/event-stream"},
+        stream=AsyncBody(),
+    )
+
+    batches = [
+        batch async for batch in EventSource(response).aiter_sse_batches(max_size=2)
+    ]
+    assert [[sse.data for sse in batch] for batch in batches] == [
+        ["1", "2"],
+        ["3"],
+        ["4"],
+    ]
+
+
+DISPATCH_STREAM = (
+    b"event: add\ndata: 1\n\n"
+    b"event: remove\ndata: 1\n\n"
+    b"event: update\ndata: 2\n\n"
+    b"data: ignored\n\n"
+)
+
+
+def test_dispatch() -> None:
+    response = httpx.Response(
+        200, headers={"content-type": "text/event-stream"}, content=DISPATCH_STREAM
+    )
+    event_source = EventSource(response, event_types=["add"])
+    calls = []
+
+    event_source.dispatch(
+        {
+            "add": lambda sse: calls.append(("add", sse.data)),
+            "update": lambda sse: calls.append(("update", sse.data)),
+        }
+    )
+
+    assert calls == [("add", "1"), ("update", "2")]
+    assert event_source.event_counts == {
+        "add": 1,
+        "remove": 1,
+        "update": 1,
+        "message": 1,
+    }
+    # The previous filter is restored.
+    assert event_source._parser.event_types == frozenset(["add"])
+
+
+@pytest.mark.asyncio
+async def test_adispatch() -> None:
+    async def body() -> AsyncIterator[bytes]:
+        yield DISPATCH_STREAM
+
+    response = httpx.Response(
+        200, headers={"content-type": "text/event-stream"}, content=body()
+    )
+    event_source = EventSource(response)
+    calls = []
+
+    async def on_add(sse: ServerSentEvent) -> None:
+        calls.append(("add", sse.data))
+
+    await event_source.adispatch(
+        {"add": on_add, "update": lambda sse: calls.append(("update", sse.data))}
+    )
+
+    assert calls == [("add", "1"), ("update", "2")]
+    assert event_source._parser.event_types is None
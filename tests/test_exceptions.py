@@ -1,7 +1,12 @@
 import httpx
 
-from httpx_sse import SSEError
+from httpx_sse import SSEError, SSEIdleTimeout
 
 
 def test_sse_error() -> None:
     assert issubclass(SSEError, httpx.TransportError)
+
+
+def test_sse_idle_timeout() -> None:
+    assert issubclass(SSEIdleTimeout, SSEError)
+    assert issubclass(SSEIdleTimeout, httpx.ReadTimeout)
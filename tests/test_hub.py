@@ -0,0 +1,227 @@
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
+
+import httpx
+import pytest
+
+from httpx_sse import SSEHub, SSESubscription
+
+Chunk = Optional[Union[bytes, Exception]]
+
+
+class QueueBody(httpx.AsyncByteStream):
+    def __init__(self, queue: "asyncio.Queue[Chunk]") -> None:
+        self._queue = queue
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while True:
+            chunk = await self._queue.get()
+            if chunk is None:
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+
+class Server:
+    def __init__(self) -> None:
+        self.requests: List[httpx.Request] = []
+        self.queues: List["asyncio.Queue[Chunk]"] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        queue: "asyncio.Queue[Chunk]" = asyncio.Queue()
+        self.queues.append(queue)
+        return httpx.Response(
+            200, headers={"content-type": "text/event-stream"}, stream=QueueBody(queue)
+        )
+
+    async def send(self, *data: Any, connection: int = -1) -> None:
+        await wait_for(lambda: len(self.queues) > 0)
+        for item in data:
+            self.queues[connection].put_nowait(f"data: {item}\n\n".encode())
+
+    async def end(self, chunk: Chunk = None, connection: int = -1) -> None:
+        await wait_for(lambda: len(self.queues) > 0)
+        self.queues[connection].put_nowait(chunk)
+
+
+async def wait_for(condition: Callable[[], bool]) -> None:
+    while not condition():
+        await asyncio.sleep(0)
+
+
+async def receive(subscription: SSESubscription, count: int) -> List[str]:
+    return [(await subscription.__anext__()).data for _ in range(count)]
+
+
+@pytest.fixture
+def server() -> Server:
+    return Server()
+
+
+@pytest.fixture
+def client(server: Server) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(server.handler))
+
+
+@pytest.mark.asyncio
+async def test_shared_connection(server: Server, client: httpx.AsyncClient) -> None:
+    url = "http://testserver/jobs/1"
+    async with SSEHub(client) as hub:
+        async with hub.subscribe("GET", url, params={"a": "1"}) as first:
+            async with hub.subscribe("GET", url + "?a=1") as second:
+                assert len(hub) == 1
+                await server.send(1, 2)
+                assert await receive(first, 2) == ["1", "2"]
+                assert await receive(second, 2) == ["1", "2"]
+
+                # Different headers make a different request.
+                async with hub.subscribe(
+                    "GET", url, params={"a": "1"}, headers={"Authorization": "token"}
+                ) as third:
+                    assert len(hub) == 2
+                    await server.send(3, connection=0)
+                    await server.send(4, connection=1)
+                    assert await receive(first, 1) == ["3"]
+                    assert await receive(third, 1) == ["4"]
+
+    assert len(server.requests) == 2
+    assert server.requests[0].headers["Accept"] == "text/event-stream"
+    assert server.requests[1].headers["Authorization"] == "token"
+
+
+@pytest.mark.asyncio
+async def test_replay(server: Server, client: httpx.AsyncClient) -> None:
+    url = "http://testserver"
+    async with SSEHub(client, replay=3, max_queue_size=2) as hub:
+        async with hub.subscribe("GET", url) as first:
+            await server.send(1, 2, 3)
+            assert await receive(first, 3) == ["1", "2", "3"]
+
+            # Late subscribers get the last events, up to the size of their queue.
+            async with hub.subscribe("GET", url) as second:
+                await server.send(4)
+                assert await receive(second, 3) == ["2", "3", "4"]
+
+
+@pytest.mark.asyncio
+async def test_overflow(server: Server, client: httpx.AsyncClient) -> None:
+    url = "http://testserver"
+    async with SSEHub(client, max_queue_size=2) as hub:
+        async with hub.subscribe("GET", url) as slow:
+            async with hub.subscribe("GET", url) as fast:
+                await server.send(1, 2, 3, 4)
+                assert await receive(fast, 4) == ["1", "2", "3", "4"]
+                assert await receive(slow, 2) == ["3", "4"]
+                assert slow.dropped == 2
+                assert fast.dropped == 0
+
+
+@pytest.mark.asyncio
+async def test_overflow_block(server: Server, client: httpx.AsyncClient) -> None:
+    url = "http://testserver"
+    async with SSEHub(client, max_queue_size=1, overflow="block") as hub:
+        async with hub.subscribe("GET", url) as fast:
+            async with hub.subscribe("GET", url):
+                await server.send(1, 2, 3)
+                assert await receive(fast, 1) == ["1"]
+                # The other subscriber holds back the upstream.
+                await asyncio.sleep(0.05)
+
+            # Until it leaves.
+            assert await receive(fast, 2) == ["2", "3"]
+
+
+@pytest.mark.asyncio
+async def test_grace_period(server: Server, client: httpx.AsyncClient) -> None:
+    url = "http://testserver"
+    async with SSEHub(client, grace_period=0.05) as hub:
+        async with hub.subscribe("GET", url):
+            pass
+        async with hub.subscribe("GET", url) as subscription:
+            await server.send(1)
+            assert await receive(subscription, 1) == ["1"]
+        assert len(server.requests) == 1
+        assert len(hub) == 1
+
+        await asyncio.sleep(0.1)
+        assert len(hub) == 0
+
+        async with hub.subscribe("GET", url):
+            assert len(hub) == 1
+    assert len(server.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_upstream_ends(server: Server, client: httpx.AsyncClient) -> None:
+    url = "http://testserver"
+    async with SSEHub(client) as hub:
+        async with hub.subscribe("GET", url) as subscription:
+            await server.send(1)
+            await server.end()
+            assert [sse.data async for sse in subscription] == ["1"]
+            assert len(hub) == 0
+
+            # New subscribers connect again.
+            async with hub.subscribe("GET", url):
+                assert len(hub) == 1
+                await server.end(httpx.ReadError("Connection lost"))
+
+        # Leaving after the upstream ended doesn't wait for a grace period.
+        await wait_for(lambda: len(hub) == 0)
+
+
+@pytest.mark.asyncio
+async def test_upstream_error(server: Server, client: httpx.AsyncClient) -> None:
+    async with SSEHub(client) as hub:
+        async with hub.subscribe("GET", "http://testserver") as subscription:
+            await server.send(1)
+            await server.end(httpx.ReadError("Connection lost"))
+            assert await receive(subscription, 1) == ["1"]
+            with pytest.raises(httpx.ReadError, match="Connection lost"):
+                await subscription.__anext__()
+
+
+@pytest.mark.asyncio
+async def test_aclose(server: Server, client: httpx.AsyncClient) -> None:
+    hub = SSEHub(client)
+    async with hub.subscribe("GET", "http://testserver") as subscription:
+        await server.send(1)
+        assert await receive(subscription, 1) == ["1"]
+
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.01, lambda: loop.create_task(hub.aclose()))
+        assert [sse async for sse in subscription] == []
+        assert len(hub) == 0
+
+    # Subscriptions stop once left.
+    assert [sse async for sse in subscription] == []
+    await hub.aclose()
+
+
+@pytest.mark.asyncio
+async def test_streaming_body_not_shared(
+    server: Server, client: httpx.AsyncClient
+) -> None:
+    async def content() -> AsyncIterator[bytes]:
+        yield b"{}"  # pragma: no cover
+
+    async with SSEHub(client) as hub:
+        async with hub.subscribe("POST", "http://testserver", content=content()):
+            async with hub.subscribe("POST", "http://testserver", content=content()):
+                assert len(hub) == 2
+
+
+@pytest.mark.parametrize(
+    "kwargs, match",
+    [
+        ({"max_queue_size": 0}, "max_queue_size must be a positive integer"),
+        ({"overflow": "unknown"}, "overflow must be one of"),
+        ({"replay": -1}, "replay must be a non-negative integer"),
+        ({"grace_period": -1}, "grace_period must be non-negative"),
+    ],
+)
+def test_invalid_options(kwargs: Dict[str, Any], match: str) -> None:
+    with pytest.raises(ValueError, match=match):
+        SSEHub(httpx.AsyncClient(), **kwargs)
@@ -0,0 +1,226 @@
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+import pytest
+
+from httpx_sse import (
+    EventSource,
+    OpenTelemetryObserver,
+    ReconnectPolicy,
+    ServerSentEvent,
+    SSEObserver,
+    SSEStats,
+    aconnect_sse,
+    connect_sse,
+)
+
+CHUNKS = [
+    b": welcome\n",
+    b"event: greeting\ndata: hel",
+    b"lo\n\n\nid: 1\ndata: 2\n\n",
+]
+
+
+class SlowBody(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """
+    A response body that waits between chunks, and may fail at the end.
+    """
+
+    def __init__(self, chunks: List[bytes], delay: float, drop: bool = False) -> None:
+        self._chunks = chunks
+        self._delay = delay
+        self._drop = drop
+
+    def __iter__(self) -> Iterator[bytes]:
+        for chunk in self._chunks:
+            time.sleep(self._delay)
+            yield chunk
+        if self._drop:
+            raise httpx.ReadError("Connection lost")
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in self._chunks:
+            time.sleep(self._delay)
+            yield chunk
+        if self._drop:
+            raise httpx.ReadError("Connection lost")
+
+
+def _response(body: SlowBody) -> httpx.Response:
+    return httpx.Response(
+        200, headers={"content-type": "text/event-stream"}, stream=body
+    )
+
+
+def _handler(requests: List[httpx.Request]) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if len(requests) == 1:
+            return _response(SlowBody([b"data: first\n\n"], delay=0, drop=True))
+        return _response(SlowBody([b"data: second\n\n"], delay=0))
+
+    return httpx.MockTransport(handler)
+
+
+def test_observer_defaults_are_no_ops() -> None:
+    observer = SSEObserver()
+    observer.on_chunk(1, 1, 0)
+    observer.on_event(ServerSentEvent(), 0.0)
+    observer.on_consumer_lag(0.0)
+    observer.on_reconnect(0.0)
+
+
+def test_stats() -> None:
+    stats = SSEStats()
+    event_source = EventSource(_response(SlowBody(CHUNKS, delay=0.01)), observer=stats)
+    assert event_source.observer is stats
+
+    events = []
+    for sse in event_source.iter_sse():
+        events.append(sse)
+        time.sleep(0.01)
+
+    assert [sse.data for sse in events] == ["hello", "2"]
+    assert stats.bytes_received == sum(len(chunk) for chunk in CHUNKS)
+    assert stats.lines == 8
+    assert stats.comments == 1
+    assert stats.events == 2
+    assert stats.reconnects == 0
+    # The first event spans two chunks.
+    assert stats.max_event_latency >= 0.01
+    assert 0 < stats.mean_event_latency <= stats.max_event_latency
+    assert stats.consumer_time >= 0.02
+    assert stats.events_per_second > 0
+    assert repr(stats) == (
+        "SSEStats(bytes_received=55, lines=8, comments=1, events=2, reconnects=0)"
+    )
+
+
+def test_stats_empty() -> None:
+    stats = SSEStats()
+    assert stats.mean_event_latency == 0.0
+    stats.started = time.monotonic() + 60
+    assert stats.events_per_second == 0.0
+
+
+def test_stats_reconnect() -> None:
+    requests: List[httpx.Request] = []
+    stats = SSEStats()
+    policy = ReconnectPolicy(initial_delay=0, jitter=0)
+
+    with httpx.Client(transport=_handler(requests)) as client:
+        with connect_sse(
+            client, "GET", "http://testserver", reconnect=policy, observer=stats
+        ) as event_source:
+            assert [sse.data for sse in event_source.iter_sse()] == [
+                "first",
+                "second",
+            ]
+
+    assert stats.reconnects == 1
+    assert stats.events == 2
+
+
+@pytest.mark.asyncio
+async def test_stats_async() -> None:
+    requests: List[httpx.Request] = []
+    stats = SSEStats()
+    policy = ReconnectPolicy(initial_delay=0, jitter=0)
+
+    async with httpx.AsyncClient(transport=_handler(requests)) as client:
+        async with aconnect_sse(
+            client, "GET", "http://testserver", reconnect=policy, observer=stats
+        ) as event_source:
+            assert [sse.data async for sse in event_source.aiter_sse()] == [
+                "first",
+                "second",
+            ]
+
+    assert stats.reconnects == 1
+    assert stats.events == 2
+    assert stats.bytes_received == 27
+
+
+class FakeInstrument:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.values: List[Tuple[float, Dict[str, Any]]] = []
+
+    def add(self, value: float, attributes: Dict[str, Any]) -> None:
+        self.values.append((value, attributes))
+
+    record = add
+
+
+class FakeMeter:
+    def __init__(self) -> None:
+        self.instruments: Dict[str, FakeInstrument] = {}
+
+    def _create(self, name: str, unit: str, description: str) -> FakeInstrument:
+        instrument = self.instruments[name] = FakeInstrument(name)
+        return instrument
+
+    create_counter = create_histogram = _create
+
+
+class FakeSpan:
+    def __init__(self, name: str, start_time: int, attributes: Dict[str, Any]) -> None:
+        self.name = name
+        self.start_time = start_time
+        self.end_time: Optional[int] = None
+        self.attributes = attributes
+
+    def end(self, end_time: int) -> None:
+        self.end_time = end_time
+
+
+class FakeTracer:
+    def __init__(self) -> None:
+        self.spans: List[FakeSpan] = []
+
+    def start_span(self, name: str, **kwargs: Any) -> FakeSpan:
+        span = FakeSpan(name, **kwargs)
+        self.spans.append(span)
+        return span
+
+
+def test_opentelemetry_observer() -> None:
+    meter = FakeMeter()
+    tracer = FakeTracer()
+    observer = OpenTelemetryObserver(meter, tracer, attributes={"url": "x"})
+    event_source = EventSource(_response(SlowBody(CHUNKS, delay=0)), observer=observer)
+    list(event_source.iter_sse())
+
+    def values(name: str) -> List[Tuple[float, Dict[str, Any]]]:
+        return meter.instruments[name].values
+
+    assert sum(value for value, _ in values("sse.client.bytes")) == 55
+    assert sum(value for value, _ in values("sse.client.lines")) == 8
+    assert values("sse.client.comments") == [(1, {"url": "x"})]
+    assert [attributes for _, attributes in values("sse.client.events")] == [
+        {"url": "x", "sse.event": "greeting"},
+        {"url": "x", "sse.event": "message"},
+    ]
+    assert len(values("sse.client.event.latency")) == 2
+    assert len(values("sse.client.consumer.lag")) == 1
+
+    observer.on_reconnect(0.5)
+    assert values("sse.client.reconnects") == [(1, {"url": "x"})]
+    assert values("sse.client.reconnect.latency") == [(0.5, {"url": "x"})]
+
+    assert [span.attributes for span in tracer.spans] == [
+        {"url": "x", "sse.event": "greeting", "sse.id": ""},
+        {"url": "x", "sse.event": "message", "sse.id": "1"},
+    ]
+    for span in tracer.spans:
+        assert span.name == "sse.event"
+        assert span.end_time is not None
+        assert span.start_time <= span.end_time
+
+
+def test_opentelemetry_observer_without_meter() -> None:
+    observer = OpenTelemetryObserver()
+    event_source = EventSource(_response(SlowBody(CHUNKS, delay=0)), observer=observer)
+    assert len(list(event_source.iter_sse())) == 2
+    observer.on_reconnect(0.5)
@@ -1,8 +1,9 @@
 import json
+from typing import Any, Union
 
 import pytest
 
-from httpx_sse import ServerSentEvent
+from httpx_sse import RawServerSentEvent, ServerSentEvent
 
 
 def test_sse_default() -> None:
@@ -27,9 +28,66 @@ def test_sse_json() -> None:
     assert sse.json() == ["item1", "item2"]
 
 
+def test_sse_json_cached() -> None:
+    calls = []
+
+    def loads(data: Union[str, bytes]) -> Any:
+        calls.append(data)
+        return json.loads(data)
+
+    sse = ServerSentEvent(data='{"key": "value"}', json_loads=loads)
+    assert sse.json() == {"key": "value"}
+    assert sse.json() is sse.json()
+    assert calls == ['{"key": "value"}']
+
+
+def test_sse_json_from_bytes() -> None:
+    calls = []
+
+    def loads(data: Union[str, bytes]) -> Any:
+        calls.append(data)
+        return json.loads(data)
+
+    sse = ServerSentEvent._from_bytes("", b'{"key": "value"}', "", None, loads)
+    assert sse.event == "message"
+    assert sse.json() == {"key": "value"}
+    assert calls == [b'{"key": "value"}']
+
+    # Once decoded, data is passed as text.
+    sse = ServerSentEvent._from_bytes("", b"[1]", "", None, loads)
+    assert sse.data == "[1]"
+    assert sse.json() == [1]
+    assert calls[-1] == "[1]"
+
+
 def test_sse_repr() -> None:
     sse = ServerSentEvent()
     assert repr(sse) == "ServerSentEvent(event='message')"
 
     sse = ServerSentEvent(data="data", retry=3, id="id", event="event")
     assert repr(sse) == "ServerSentEvent(event='event', data='data', id='id', retry=3)"
+
+
+def test_sse_eq_hash() -> None:
+    sse = ServerSentEvent(event="add", data="1", id="1", retry=100)
+    same = ServerSentEvent._from_bytes("add", b"1", "1", 100, None)
+
+    assert sse == same
+    assert hash(sse) == hash(same)
+    assert len({sse, same}) == 1
+    assert sse != ServerSentEvent(event="add", data="2", id="1", retry=100)
+    assert sse != ("add", "1", "1", 100)
+
+
+def test_sse_slots() -> None:
+    sse = ServerSentEvent()
+
+    assert not hasattr(sse, "__dict__")
+    with pytest.raises(AttributeError):
+        sse.data = "changed"  # type: ignore[misc]
+
+
+def test_raw_sse() -> None:
+    sse = RawServerSentEvent("message", "data", "", None)
+    assert sse.data == "data"
+    assert sse == ("message", "data", "", None)
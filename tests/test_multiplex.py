@@ -0,0 +1,152 @@
+import asyncio
+from typing import AsyncIterator, Hashable, List, Tuple
+
+import httpx
+import pytest
+
+from httpx_sse import SSEMultiplexer
+
+
+class AsyncBody(httpx.AsyncByteStream):
+    def __init__(self, count: int, fail: bool = False) -> None:
+        self._count = count
+        self._fail = fail
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for i in range(self._count):
+            yield f"data: {i}\n\n".encode()
+        if self._fail:
+            raise httpx.ReadError("Connection lost")
+
+
+class EndlessBody(httpx.AsyncByteStream):
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        while True:
+            yield b"data: tick\n\n"
+            await asyncio.sleep(0)
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    stream: httpx.AsyncByteStream
+    if request.url.path == "/endless":
+        stream = EndlessBody()
+    else:
+        count = int(request.url.params["count"])
+        stream = AsyncBody(count, fail=request.url.path == "/fail")
+    return httpx.Response(
+        200, headers={"content-type": "text/event-stream"}, stream=stream
+    )
+
+
+@pytest.fixture
+def client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def collect(mux: SSEMultiplexer) -> List[Tuple[Hashable, str]]:
+    return [(key, sse.data) async for key, sse in mux]
+
+
+@pytest.mark.asyncio
+async def test_multiplexer(client: httpx.AsyncClient) -> None:
+    async with SSEMultiplexer(client) as mux:
+        mux.add("a", "GET", "http://testserver/sse?count=3")
+        mux.add("b", "GET", "http://testserver/sse?count=2")
+        assert len(mux) == 2
+        assert "a" in mux
+        assert mux.keys() == ["a", "b"]
+
+        events = await collect(mux)
+
+    assert sorted(events) == [
+        ("a", "0"),
+        ("a", "1"),
+        ("a", "2"),
+        ("b", "0"),
+        ("b", "1"),
+    ]
+    assert [data for key, data in events if key == "a"] == ["0", "1", "2"]
+    assert len(mux) == 0
+
+
+@pytest.mark.asyncio
+async def test_multiplexer_fairness(client: httpx.AsyncClient) -> None:
+    async with SSEMultiplexer(client, max_buffer_size=2) as mux:
+        mux.add("hot", "GET", "http://testserver/endless")
+        mux.add("cold", "GET", "http://testserver/sse?count=3")
+
+        keys = []
+        async for key, _ in mux:
+            keys.append(key)
+            if len(keys) == 8:
+                break
+
+    assert keys.count("cold") == 3
+    # The hot stream doesn't get more than its share while the cold one has events.
+    assert keys[:6].count("hot") == 3
+
+
+@pytest.mark.asyncio
+async def test_multiplexer_error(client: httpx.AsyncClient) -> None:
+    async with SSEMultiplexer(client) as mux:
+        mux.add("fail", "GET", "http://testserver/fail?count=2")
+
+        events = []
+        with pytest.raises(httpx.ReadError):
+            async for key, sse in mux:
+                events.append((key, sse.data))
+
+        assert events == [("fail", "0"), ("fail", "1")]
+        assert "fail" not in mux
+
+
+@pytest.mark.asyncio
+async def test_multiplexer_add_remove(client: httpx.AsyncClient) -> None:
+    async with SSEMultiplexer(client) as mux:
+        mux.add("endless", "GET", "http://testserver/endless")
+
+        with pytest.raises(ValueError, match="already exists"):
+            mux.add("endless", "GET", "http://testserver/endless")
+
+        key, sse = await mux.__anext__()
+        assert (key, sse.data) == ("endless", "tick")
+
+        mux.add("finite", "GET", "http://testserver/sse?count=1")
+        await asyncio.sleep(0.01)
+        await mux.remove("endless")
+        assert mux.keys() == ["finite"]
+
+        assert await collect(mux) == [("finite", "0")]
+
+
+@pytest.mark.asyncio
+async def test_multiplexer_remove_wakes_up_consumer(client: httpx.AsyncClient) -> None:
+    async def slow_body() -> AsyncIterator[bytes]:
+        await asyncio.Event().wait()
+        yield b""  # pragma: no cover
+
+    class SlowBody(httpx.AsyncByteStream):
+        def __aiter__(self) -> AsyncIterator[bytes]:
+            return slow_body()
+
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(
+            200, headers={"content-type": "text/event-stream"}, stream=SlowBody()
+        )
+    )
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        mux = SSEMultiplexer(client)
+        mux.add("slow", "GET", "http://testserver")
+
+        consumer = asyncio.create_task(collect(mux))
+        await asyncio.sleep(0.01)
+        assert not consumer.done()
+
+        await mux.aclose()
+        assert await consumer == []
+
+
+def test_multiplexer_invalid_buffer_size(client: httpx.AsyncClient) -> None:
+    with pytest.raises(ValueError, match="max_buffer_size"):
+        SSEMultiplexer(client, max_buffer_size=0)
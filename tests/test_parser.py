@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from httpx_sse import ServerSentEvent, SSEError, SSEParser
+
+STREAM = (
+    b"\xef\xbb\xbfretry: 3000\r\n"
+    b": comment\r\n"
+    b'event: add\r\nid: 1\r\ndata: {"price": "\xe2\x82\xac1"}\r\n\r\n'
+    b"data: hello\r\n\r\n"
+)
+
+
+def test_feed() -> None:
+    parser = SSEParser()
+    assert parser.last_event_id == ""
+    assert parser.retry is None
+
+    events = parser.feed(STREAM)
+
+    assert events == [
+        ServerSentEvent(event="add", data='{"price": "€1"}', id="1", retry=3000),
+        ServerSentEvent(data="hello", id="1"),
+    ]
+    assert parser.last_event_id == "1"
+    assert parser.retry == 3000
+    assert parser.event_counts == {"add": 1, "message": 1}
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7])
+def test_feed_in_pieces(size: int) -> None:
+    parser = SSEParser()
+    events = []
+    for start in range(0, len(STREAM), size):
+        events += parser.feed(STREAM[start : start + size])
+
+    assert events == SSEParser().feed(STREAM)
+
+
+def test_close() -> None:
+    parser = SSEParser()
+    assert parser.feed(b"id: 1\ndata: first\n\nid: 2\ndata: incomplete") == [
+        ServerSentEvent(data="first", id="1")
+    ]
+
+    # The incomplete event is discarded, but the last event ID is kept.
+    parser.close()
+    assert parser.last_event_id == "1"
+    assert parser.feed(b"data: next\n\n") == [ServerSentEvent(data="next", id="1")]
+
+
+def test_options() -> None:
+    parser = SSEParser(
+        json_loads=lambda data: json.loads(data)["value"],
+        event_types=["add"],
+        last_event_id="42",
+    )
+    assert parser.last_event_id == "42"
+    assert parser.event_types == frozenset(["add"])
+
+    events = parser.feed(
+        b'event: add\ndata: {"value": 1}\n\nevent: remove\ndata: x\n\n'
+    )
+    assert [(sse.id, sse.json()) for sse in events] == [("42", 1)]
+
+    parser.event_types = None
+    assert [sse.event for sse in parser.feed(b"event: remove\ndata: x\n\n")] == [
+        "remove"
+    ]
+
+
+def test_max_sizes() -> None:
+    with pytest.raises(SSEError, match="Line exceeds"):
+        SSEParser(max_line_size=4).feed(b"data: hello\n")
+
+    with pytest.raises(SSEError, match="Event data exceeds"):
+        SSEParser(max_event_size=4).feed(b"data: hello\n")
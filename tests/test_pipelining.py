@@ -0,0 +1,141 @@
+import socket
+import threading
+import time
+from typing import Any, Iterator, List
+
+import httpx
+import pytest
+
+from httpx_sse import EventSource, connect_sse
+
+
+def _reader_threads() -> List[threading.Thread]:
+    return [t for t in threading.enumerate() if t.name == "httpx-sse-reader"]
+
+
+class RecordingBody(httpx.SyncByteStream):
+    """
+    A response body that records the threads it is read from.
+    """
+
+    def __init__(self, count: int = 0, fail: bool = False) -> None:
+        # Send events forever if `count` is 0.
+        self._count = count
+        self._fail = fail
+        self.threads: List[str] = []
+        self.closed = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        n = 0
+        try:
+            while not self._count or n < self._count:
+                n += 1
+                self.threads.append(threading.current_thread().name)
+                yield f"data: {n}\n\n".encode()
+            if self._fail:
+                raise httpx.ReadError("Connection lost")
+        finally:
+            self.closed = True
+
+
+def _event_source(body: RecordingBody) -> EventSource:
+    response = httpx.Response(
+        200, headers={"content-type": "text/event-stream"}, stream=body
+    )
+    return EventSource(response)
+
+
+def test_iter_sse_pipelined() -> None:
+    body = RecordingBody(count=100)
+    events = list(_event_source(body).iter_sse_pipelined(max_size=4))
+
+    assert [sse.data for sse in events] == [str(n) for n in range(1, 101)]
+    assert set(body.threads) == {"httpx-sse-reader"}
+    assert not _reader_threads()
+
+
+def test_iter_sse_pipelined_error() -> None:
+    body = RecordingBody(count=2, fail=True)
+    events = []
+
+    with pytest.raises(httpx.ReadError, match="Connection lost"):
+        for sse in _event_source(body).iter_sse_pipelined():
+            events.append(sse.data)
+
+    assert events == ["1", "2"]
+    assert not _reader_threads()
+
+
+@pytest.mark.parametrize("max_size", [1, 16])
+def test_iter_sse_pipelined_early_exit(max_size: int) -> None:
+    body = RecordingBody()
+    events = _event_source(body).iter_sse_pipelined(max_size=max_size)
+
+    assert next(events).data == "1"
+    # Let the reader fill the queue.
+    time.sleep(0.05)
+    events.close()  # type: ignore[attr-defined]
+
+    assert body.closed
+    assert not _reader_threads()
+
+
+def test_iter_sse_pipelined_invalid_max_size() -> None:
+    with pytest.raises(ValueError, match="max_size must be a positive integer"):
+        _event_source(RecordingBody()).iter_sse_pipelined(max_size=0)
+
+
+def test_iter_sse_pipelined_interrupts_blocked_read() -> None:
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    port = server.getsockname()[1]
+    stop = threading.Event()
+
+    def serve() -> None:
+        conn, _ = server.accept()
+        with conn:
+            conn.recv(65536)
+            conn.sendall(
+                b"HTTP/1.1 200 OK\r\n"
+                b"content-type: text/event-stream\r\n"
+                b"transfer-encoding: chunked\r\n\r\n"
+                b"d\r\ndata: hello\n\n\r\n"
+            )
+            # Then stall.
+            stop.wait(10)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+
+    try:
+        with httpx.Client(timeout=None) as client:
+            with connect_sse(client, "GET", f"http://127.0.0.1:{port}") as source:
+                started = time.monotonic()
+                for sse in source.iter_sse_pipelined():
+                    assert sse.data == "hello"
+                    # Wait for the reader to block on the network.
+                    time.sleep(0.1)
+                    break
+
+        assert time.monotonic() - started < 1
+        assert not _reader_threads()
+    finally:
+        stop.set()
+        server.close()
+
+
+@pytest.mark.parametrize(
+    "extensions",
+    [
+        pytest.param({"http_version": b"HTTP/2"}, id="http2"),
+        pytest.param({}, id="no-network-stream"),
+        pytest.param(
+            {"network_stream": type("Stream", (), {"get_extra_info": lambda *_: None})},
+            id="no-socket",
+        ),
+    ],
+)
+def test_interrupt_without_socket(extensions: Any) -> None:
+    response = httpx.Response(200, extensions=extensions)
+    EventSource(response)._interrupt()
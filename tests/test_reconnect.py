@@ -0,0 +1,223 @@
+from typing import AsyncIterator, Iterator, List
+
+import httpx
+import pytest
+
+from httpx_sse import ReconnectPolicy, SSEError, aconnect_sse, connect_sse
+
+NO_DELAY = ReconnectPolicy(initial_delay=0, jitter=0)
+
+
+class DroppingBody(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """
+    A response body that yields some chunks, then fails like a dropped connection.
+    """
+
+    def __init__(self, chunks: List[bytes], drop: bool = True) -> None:
+        self._chunks = chunks
+        self._drop = drop
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._chunks
+        if self._drop:
+            raise httpx.ReadError("Connection lost")
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in self._chunks:
+            yield chunk
+        if self._drop:
+            raise httpx.ReadError("Connection lost")
+
+
+def make_handler(requests: List[httpx.Request]) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        n = len(requests)
+
+        if n == 1:
+            body = DroppingBody([b"id: 1\ndata: first\n\n", b"id: 2\ndata: lost"])
+        elif n == 2:
+            raise httpx.ConnectError("Connection refused")
+        elif n == 3:
+            body = DroppingBody([])
+        else:
+            body = DroppingBody([b"id: 3\ndata: second\n\n"], drop=False)
+
+        return httpx.Response(
+            200, headers={"content-type": "text/event-stream"}, stream=body
+        )
+
+    return httpx.MockTransport(handler)
+
+
+def test_reconnect_policy_delay() -> None:
+    policy = ReconnectPolicy(initial_delay=0.5, max_delay=3, jitter=0)
+    assert policy.get_delay(1) == 0.5
+    assert policy.get_delay(2) == 1
+    assert policy.get_delay(3) == 2
+    assert policy.get_delay(4) == 3
+
+    # The server-sent reconnection time takes precedence.
+    assert policy.get_delay(1, retry=100) == 0.1
+    assert policy.get_delay(2, retry=100) == 0.2
+
+
+def test_reconnect_policy_jitter() -> None:
+    policy = ReconnectPolicy(initial_delay=1, jitter=0.25)
+    for _ in range(100):
+        assert 0.75 <= policy.get_delay(1) <= 1
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"max_attempts": 0},
+        {"initial_delay": -1},
+        {"max_delay": -1},
+        {"multiplier": 0.5},
+        {"jitter": 1.5},
+    ],
+)
+def test_reconnect_policy_invalid(kwargs: dict) -> None:
+    with pytest.raises(ValueError):
+        ReconnectPolicy(**kwargs)
+
+
+def test_reconnect_policy_repr() -> None:
+    assert repr(ReconnectPolicy()) == (
+        "ReconnectPolicy(max_attempts=None, initial_delay=1.0, max_delay=30.0, "
+        "multiplier=2.0, jitter=0.5)"
+    )
+
+
+def test_connect_sse_reconnect() -> None:
+    requests: List[httpx.Request] = []
+
+    with httpx.Client(transport=make_handler(requests)) as client:
+        with connect_sse(
+            client,
+            "GET",
+            "http://testserver",
+            reconnect=NO_DELAY,
+            follow_redirects=True,
+        ) as event_source:
+            assert event_source.reconnects == 0
+            assert event_source.reconnect_latency is None
+
+            events = list(event_source.iter_sse())
+
+            assert [(sse.id, sse.data) for sse in events] == [
+                ("1", "first"),
+                ("3", "second"),
+            ]
+            assert event_source.reconnects == 2
+            assert event_source.reconnect_latency is not None
+
+    assert len(requests) == 4
+    assert "last-event-id" not in requests[0].headers
+    for request in requests[1:]:
+        # The incomplete event with ID 2 was not dispatched.
+        assert request.headers["last-event-id"] == "1"
+        assert request.headers["accept"] == "text/event-stream"
+
+
+def test_connect_sse_reconnect_max_attempts() -> None:
+    requests: List[httpx.Request] = []
+
+    with httpx.Client(transport=make_handler(requests)) as client:
+        policy = ReconnectPolicy(max_attempts=1, initial_delay=0)
+        with connect_sse(
+            client, "GET", "http://testserver", reconnect=policy
+        ) as event_source:
+            with pytest.raises(httpx.ConnectError):
+                for _ in event_source.iter_sse():
+                    pass
+
+    assert len(requests) == 2
+
+
+def test_connect_sse_reconnect_honors_server_retry(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    delays: List[float] = []
+    monkeypatch.setattr("time.sleep", delays.append)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = DroppingBody([b"retry: 200\n\n"], drop=not delays)
+        return httpx.Response(
+            200, headers={"content-type": "text/event-stream"}, stream=body
+        )
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        policy = ReconnectPolicy(jitter=0)
+        with connect_sse(
+            client, "GET", "http://testserver", reconnect=policy
+        ) as event_source:
+            events = list(event_source.iter_sse())
+
+    assert [sse.retry for sse in events] == [200, 200]
+    assert delays == [0.2]
+
+
+def test_connect_sse_reconnect_not_event_stream() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if "last-event-id" in request.headers:
+            return httpx.Response(503, text="Service Unavailable")
+        body = DroppingBody([b"id: 1\n\n"])
+        return httpx.Response(
+            200, headers={"content-type": "text/event-stream"}, stream=body
+        )
+
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        with connect_sse(
+            client, "GET", "http://testserver", reconnect=NO_DELAY
+        ) as event_source:
+            with pytest.raises(SSEError, match="text/event-stream"):
+                for _ in event_source.iter_sse():
+                    pass
+            assert event_source.reconnects == 1
+
+
+def test_connect_sse_no_reconnect() -> None:
+    requests: List[httpx.Request] = []
+
+    with httpx.Client(transport=make_handler(requests)) as client:
+        with connect_sse(client, "GET", "http://testserver") as event_source:
+            with pytest.raises(httpx.ReadError):
+                for _ in event_source.iter_sse():
+                    pass
+
+    assert len(requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_aconnect_sse_reconnect() -> None:
+    requests: List[httpx.Request] = []
+
+    async with httpx.AsyncClient(transport=make_handler(requests)) as client:
+        async with aconnect_sse(
+            client, "GET", "http://testserver", reconnect=NO_DELAY
+        ) as event_source:
+            events = [sse async for sse in event_source.aiter_sse()]
+
+            assert [(sse.id, sse.data) for sse in events] == [
+                ("1", "first"),
+                ("3", "second"),
+            ]
+            assert event_source.reconnects == 2
+
+    assert len(requests) == 4
+    assert requests[-1].headers["last-event-id"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_aconnect_sse_no_reconnect() -> None:
+    requests: List[httpx.Request] = []
+
+    async with httpx.AsyncClient(transport=make_handler(requests)) as client:
+        async with aconnect_sse(client, "GET", "http://testserver") as event_source:
+            with pytest.raises(httpx.ReadError):
+                async for _ in event_source.aiter_sse():
+                    pass
+
+    assert len(requests) == 1
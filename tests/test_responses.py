@@ -0,0 +1,177 @@
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+import httpx
+import pytest
+
+from httpx_sse import (
+    ASGIEventStream,
+    ServerSentEvent,
+    WSGIEventStream,
+    aconnect_sse,
+    connect_sse,
+)
+
+EVENTS = [
+    ServerSentEvent(data="hello"),
+    ServerSentEvent(event="add", data="1", id="1"),
+    ServerSentEvent(event="add", data="2\n3", id="2"),
+]
+
+
+async def _call_asgi(
+    app: ASGIEventStream, disconnect_after: float = 60
+) -> List[Dict[str, Any]]:
+    messages = []
+
+    async def receive() -> Dict[str, Any]:
+        await asyncio.sleep(disconnect_after)
+        return {"type": "http.disconnect"}
+
+    async def send(message: Dict[str, Any]) -> None:
+        messages.append(message)
+
+    await app({"type": "http"}, receive, send)
+    return messages
+
+
+@pytest.mark.asyncio
+async def test_asgi_event_stream() -> None:
+    async def events() -> AsyncIterator[Any]:
+        yield EVENTS[0]
+        yield EVENTS[1:]
+
+    app = ASGIEventStream(events(), headers={"X-Custom": "yes"})
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app)) as client:  # type: ignore[arg-type]
+        async with aconnect_sse(client, "GET", "http://testserver") as event_source:
+            assert event_source.response.headers["x-custom"] == "yes"
+            assert event_source.response.headers["cache-control"] == "no-store"
+            assert [sse async for sse in event_source.aiter_sse()] == EVENTS
+
+
+@pytest.mark.asyncio
+async def test_asgi_event_stream_messages() -> None:
+    async def events() -> AsyncIterator[ServerSentEvent]:
+        yield EVENTS[0]
+        await asyncio.sleep(0.05)
+        yield EVENTS[1]
+
+    messages = await _call_asgi(ASGIEventStream(events(), heartbeat=0.02))
+
+    assert messages[0]["type"] == "http.response.start"
+    assert messages[0]["status"] == 200
+    bodies = [message["body"] for message in messages[1:]]
+    assert bodies[0] == b"data: hello\n\n"
+    assert bodies[-2] == b"event: add\nid: 1\ndata: 1\n\n"
+    assert bodies[-1] == b""
+    assert b":\n" in bodies
+    assert not messages[-1]["more_body"]
+
+
+@pytest.mark.asyncio
+async def test_asgi_event_stream_without_heartbeat() -> None:
+    async def events() -> AsyncIterator[ServerSentEvent]:
+        await asyncio.sleep(0.05)
+        yield EVENTS[0]
+
+    messages = await _call_asgi(
+        ASGIEventStream(events(), heartbeat=None, status_code=201)
+    )
+
+    assert messages[0]["status"] == 201
+    assert [message["body"] for message in messages[1:]] == [b"data: hello\n\n", b""]
+
+
+@pytest.mark.asyncio
+async def test_asgi_event_stream_disconnect() -> None:
+    closed = False
+
+    async def events() -> AsyncIterator[ServerSentEvent]:
+        nonlocal closed
+        try:
+            while True:
+                yield EVENTS[0]
+                await asyncio.sleep(0.01)
+        finally:
+            closed = True
+
+    messages = await _call_asgi(ASGIEventStream(events()), disconnect_after=0.05)
+
+    assert closed
+    assert messages[-1]["more_body"]
+
+
+@pytest.mark.asyncio
+async def test_asgi_event_stream_error() -> None:
+    async def events() -> AsyncIterator[ServerSentEvent]:
+        yield EVENTS[0]
+        raise RuntimeError("Boom")
+
+    with pytest.raises(RuntimeError, match="Boom"):
+        await _call_asgi(ASGIEventStream(events()))
+
+
+def test_wsgi_event_stream() -> None:
+    def events() -> Iterator[Any]:
+        yield EVENTS[0]
+        yield EVENTS[1:]
+
+    for heartbeat in (None, 1.0):
+        app = WSGIEventStream(events(), heartbeat=heartbeat)
+        with httpx.Client(transport=httpx.WSGITransport(app)) as client:
+            with connect_sse(client, "GET", "http://testserver") as event_source:
+                assert event_source.response.status_code == 200
+                assert list(event_source.iter_sse()) == EVENTS
+
+
+def test_wsgi_event_stream_heartbeat() -> None:
+    def events() -> Iterator[ServerSentEvent]:
+        yield EVENTS[0]
+        time.sleep(0.05)
+        yield EVENTS[1]
+
+    statuses = []
+    app = WSGIEventStream(events(), heartbeat=0.02, status="201 Created")
+    body = list(app({}, lambda status, headers: statuses.append(status)))
+
+    assert statuses == ["201 Created"]
+    assert body[0] == b"data: hello\n\n"
+    assert body[-1] == b"event: add\nid: 1\ndata: 1\n\n"
+    assert b":\n" in body
+
+
+def test_wsgi_event_stream_error() -> None:
+    def events() -> Iterator[ServerSentEvent]:
+        yield EVENTS[0]
+        raise RuntimeError("Boom")
+
+    body = iter(WSGIEventStream(events())({}, lambda *args: None))
+    assert next(body) == b"data: hello\n\n"
+    with pytest.raises(RuntimeError, match="Boom"):
+        next(body)
+
+
+def test_wsgi_event_stream_close() -> None:
+    closed = False
+
+    def events() -> Iterator[ServerSentEvent]:
+        nonlocal closed
+        try:
+            while True:
+                yield EVENTS[0]
+        finally:
+            closed = True
+
+    body = WSGIEventStream(events())({}, lambda *args: None)
+    assert isinstance(body, Iterator)
+    assert next(body) == b"data: hello\n\n"
+    # Let the background thread fill the queue.
+    time.sleep(0.2)
+    body.close()  # type: ignore[attr-defined]
+
+    deadline = time.monotonic() + 5
+    while not closed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert closed
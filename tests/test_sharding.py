@@ -0,0 +1,161 @@
+import functools
+import json
+import os
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Set
+
+import httpx
+import pytest
+
+from httpx_sse import ServerSentEvent, SSEShardPool, aconnect_sse, connect_sse
+from httpx_sse._sharding import _handle_batch, _init_worker, _to_record
+
+EVENTS = [
+    ServerSentEvent(event=f"symbol{i % 5}", data=json.dumps({"n": i}), id=str(i))
+    for i in range(200)
+]
+
+
+def record(path: Path, sse: ServerSentEvent) -> None:
+    with path.open("a") as file:
+        file.write(f"{os.getpid()} {sse.event} {sse.json()['n']} {sse.id}\n")
+
+
+def fail(sse: ServerSentEvent) -> None:
+    if sse.id == "3":
+        raise ValueError("Invalid event")
+
+
+def crash(sse: ServerSentEvent) -> None:
+    os._exit(1)  # pragma: no cover
+
+
+def _read_records(path: Path) -> Dict[str, List[int]]:
+    numbers: Dict[str, List[int]] = {}
+    pids: Dict[str, Set[str]] = {}
+    for line in path.read_text().splitlines():
+        pid, event, n, _ = line.split()
+        numbers.setdefault(event, []).append(int(n))
+        pids.setdefault(event, set()).add(pid)
+    # Each key is handled by a single process.
+    assert all(len(key_pids) == 1 for key_pids in pids.values())
+    return numbers
+
+
+def _expected() -> Dict[str, List[int]]:
+    numbers: Dict[str, List[int]] = {}
+    for i, sse in enumerate(EVENTS):
+        numbers.setdefault(sse.event, []).append(i)
+    return numbers
+
+
+class Body(httpx.SyncByteStream, httpx.AsyncByteStream):
+    # One chunk per event.
+    def __iter__(self) -> Iterator[bytes]:
+        for sse in EVENTS:
+            yield f"event: {sse.event}\nid: {sse.id}\ndata: {sse.data}\n\n".encode()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for chunk in self:
+            yield chunk
+
+
+def _transport() -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200, headers={"content-type": "text/event-stream"}, stream=Body()
+        )
+
+    return httpx.MockTransport(handler)
+
+
+def test_handle_batch(tmp_path: Path) -> None:
+    # What the workers run.
+    path = tmp_path / "events.txt"
+    _init_worker(functools.partial(record, path), json.loads)
+    _handle_batch([_to_record(sse) for sse in EVENTS[:2]])
+    assert _read_records(path) == {"symbol0": [0], "symbol1": [1]}
+
+    _init_worker(fail, None)
+    with pytest.raises(ValueError, match="Invalid event"):
+        _handle_batch([_to_record(sse) for sse in EVENTS[3:4]])
+
+
+def test_submit(tmp_path: Path) -> None:
+    path = tmp_path / "events.txt"
+
+    with SSEShardPool(
+        functools.partial(record, path), workers=3, max_pending=1
+    ) as pool:
+        assert pool.workers == 3
+        for start in range(0, len(EVENTS), 7):
+            pool.submit(EVENTS[start : start + 7])
+
+    assert _read_records(path) == _expected()
+
+
+def test_consume(tmp_path: Path) -> None:
+    path = tmp_path / "events.txt"
+
+    with httpx.Client(transport=_transport()) as client:
+        with connect_sse(client, "GET", "http://testserver") as event_source:
+            with SSEShardPool(
+                functools.partial(record, path),
+                workers=2,
+                key=lambda sse: sse.id[-1],
+            ) as pool:
+                pool.consume(event_source)
+                # All events were handled.
+                assert len(path.read_text().splitlines()) == len(EVENTS)
+
+
+@pytest.mark.asyncio
+async def test_aconsume(tmp_path: Path) -> None:
+    path = tmp_path / "events.txt"
+
+    async with httpx.AsyncClient(transport=_transport()) as client:
+        async with aconnect_sse(client, "GET", "http://testserver") as event_source:
+            with SSEShardPool(
+                functools.partial(record, path), workers=2, max_pending=1
+            ) as pool:
+                await pool.aconsume(event_source)
+
+    assert _read_records(path) == _expected()
+
+
+def test_handler_error() -> None:
+    with pytest.raises(ValueError, match="Invalid event"):
+        with SSEShardPool(fail, workers=1) as pool:
+            for sse in EVENTS:
+                pool.submit([sse])
+
+    # Errors are also raised when leaving the context.
+    with pytest.raises(ValueError, match="Invalid event"):
+        with SSEShardPool(fail, workers=1) as pool:
+            pool.submit(EVENTS[:5])
+
+
+def test_worker_crash() -> None:
+    with pytest.raises(BrokenProcessPool):
+        with SSEShardPool(crash, workers=1) as pool:
+            pool.submit(EVENTS[:1])
+            pool.join()
+
+
+@pytest.mark.parametrize(
+    "kwargs, match",
+    [
+        ({"workers": 0}, "workers must be a positive integer"),
+        ({"max_pending": 0}, "max_pending must be a positive integer"),
+    ],
+)
+def test_invalid_options(kwargs: Dict[str, Any], match: str) -> None:
+    with pytest.raises(ValueError, match=match):
+        SSEShardPool(fail, **kwargs)
+
+
+def test_default_workers() -> None:
+    pool = SSEShardPool(fail)
+    assert pool.workers == (os.cpu_count() or 1)
+    pool.shutdown()
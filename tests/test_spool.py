@@ -0,0 +1,140 @@
+from pathlib import Path
+from typing import List
+
+import httpx
+import pytest
+
+from httpx_sse import ServerSentEvent, SSESpool, aconnect_sse, connect_sse
+from httpx_sse._spool import _HEADER
+
+EVENTS = [
+    ServerSentEvent(data="hello"),
+    ServerSentEvent(event="add", data="1\n2", id="1", retry=1000),
+    ServerSentEvent(event="café", data="crème", id="é"),
+]
+
+
+def test_append_and_replay(tmp_path: Path) -> None:
+    path = tmp_path / "events.spool"
+
+    with SSESpool(path) as spool:
+        assert list(spool.replay()) == []
+        spool.append([])
+        assert not path.exists()
+
+        spool.append(EVENTS[:1])
+        spool.append(EVENTS[1:])
+        assert spool.last_event_id == "é"
+        assert list(spool.replay()) == EVENTS
+
+    # Reopening recovers the last event ID.
+    spool = SSESpool(str(path), fsync=True)
+    assert spool.last_event_id == "é"
+    spool.append([ServerSentEvent(data="more", id="2")])
+    spool.close()
+    assert [sse.data for sse in SSESpool(path).replay()][-1] == "more"
+
+
+def test_empty_file(tmp_path: Path) -> None:
+    path = tmp_path / "events.spool"
+    path.touch()
+    spool = SSESpool(path)
+    assert spool.last_event_id == ""
+    assert list(spool.replay()) == []
+
+
+def test_checkpoint(tmp_path: Path) -> None:
+    path = tmp_path / "events.spool"
+
+    with SSESpool(path) as spool:
+        spool.append(EVENTS[1:2], last_event_id="3")
+        assert spool.last_event_id == "3"
+        # Nothing new to checkpoint.
+        spool.append([], last_event_id="3")
+
+    assert SSESpool(path).last_event_id == "3"
+    assert list(SSESpool(path).replay()) == EVENTS[1:2]
+
+
+def test_incomplete_record(tmp_path: Path) -> None:
+    path = tmp_path / "events.spool"
+    with SSESpool(path) as spool:
+        spool.append(EVENTS)
+    size = path.stat().st_size
+
+    # A record being written is not replayed.
+    with path.open("ab") as file:
+        file.write(_HEADER.pack(0, 1, 1, 100, -1) + b"ex")
+    assert list(spool.replay()) == EVENTS
+
+    # A partial header too.
+    with path.open("ab") as file:
+        file.write(b"\x00\x01")
+
+    # Incomplete records are discarded on open, e.g. after a crash.
+    spool = SSESpool(path)
+    assert path.stat().st_size == size
+    assert spool.last_event_id == "é"
+    assert list(spool.replay()) == EVENTS
+
+
+def _transport(requests: List[httpx.Request]) -> httpx.MockTransport:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if "last-event-id" in request.headers:
+            content = b"data: resumed\n\n"
+        else:
+            content = b"id: 1\ndata: first\n\nevent: skipped\nid: 2\ndata: x\n\n"
+        return httpx.Response(
+            200, headers={"content-type": "text/event-stream"}, content=content
+        )
+
+    return httpx.MockTransport(handler)
+
+
+def test_connect_sse_spool(tmp_path: Path) -> None:
+    path = tmp_path / "events.spool"
+    requests: List[httpx.Request] = []
+
+    with httpx.Client(transport=_transport(requests)) as client:
+        with SSESpool(path) as spool:
+            with connect_sse(
+                client, "GET", "http://testserver", spool=spool, event_types=["message"]
+            ) as event_source:
+                assert event_source.spool is spool
+                assert [sse.data for sse in event_source.iter_sse()] == ["first"]
+            # The ID of the filtered event is checkpointed.
+            assert spool.last_event_id == "2"
+
+        # After a restart...
+        with SSESpool(path) as spool:
+            with connect_sse(
+                client, "GET", "http://testserver", spool=spool
+            ) as event_source:
+                events = list(event_source.iter_sse())
+                assert events == [ServerSentEvent(data="resumed", id="2")]
+
+    assert "last-event-id" not in requests[0].headers
+    assert requests[1].headers["last-event-id"] == "2"
+    assert list(SSESpool(path).replay()) == [
+        ServerSentEvent(data="first", id="1"),
+        ServerSentEvent(data="resumed", id="2"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_aconnect_sse_spool(tmp_path: Path) -> None:
+    path = tmp_path / "events.spool"
+    requests: List[httpx.Request] = []
+
+    async with httpx.AsyncClient(transport=_transport(requests)) as client:
+        for _ in range(2):
+            with SSESpool(path) as spool:
+                async with aconnect_sse(
+                    client, "GET", "http://testserver", spool=spool
+                ) as event_source:
+                    async for _ in event_source.aiter_sse():
+                        pass
+
+    assert requests[1].headers["last-event-id"] == "2"
+    assert [sse.data for sse in SSESpool(path).replay()] == ["first", "x", "resumed"]
@@ -0,0 +1,229 @@
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+
+import httpx
+import pytest
+
+from httpx_sse import EventSource, SSEError, StreamingServerSentEvent
+from httpx_sse._decoders import SSEBytesDecoder, SSEBytesLineDecoder
+from httpx_sse._streaming import (
+    _aiter_streaming_events,
+    _iter_streaming_events,
+)
+
+_Event = Tuple[str, str, str, Optional[int]]
+
+STREAM = (
+    b": comment\n"
+    b"\n"
+    b"event: add\r\n"
+    b"data: 1\r\n"
+    b"data:2\r"
+    b"data\r"
+    b"id: 1\n"
+    b"retry: 500\n"
+    b"unknown: field\n"
+    b"\n"
+    b"data:  caf\xc3\xa9 \xe2\x82\xac\n"
+    b"event\n"
+    b"id: 2\0\n"
+    b"retry: nan\n"
+    b"\n"
+    b"data: last\n"
+    b"\n"
+)
+
+
+def _chunked(data: bytes, size: int) -> List[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def _read(events: Iterator[StreamingServerSentEvent]) -> List[_Event]:
+    return [("".join(sse.iter_data()), sse.event, sse.id, sse.retry) for sse in events]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, len(STREAM)])
+def test_matches_buffered_decoder(chunk_size: int) -> None:
+    line_decoder = SSEBytesLineDecoder()
+    decoder = SSEBytesDecoder()
+    expected = []
+    for line in line_decoder.decode(STREAM):
+        sse = decoder.decode(line)
+        if sse is not None:
+            expected.append((sse.data, sse.event, sse.id, sse.retry))
+
+    events = _iter_streaming_events(iter(_chunked(STREAM, chunk_size)))
+
+    assert _read(events) == expected
+    assert expected == [
+        ("1\n2\n", "add", "1", 500),
+        (" café €", "message", "1", None),
+        ("last", "message", "1", None),
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 100])
+def test_leading_bom_is_removed(chunk_size: int) -> None:
+    stream = b"\xef\xbb\xbfdata: 1\n\n\xef\xbb\xbfdata: 2\n\n"
+    events = _iter_streaming_events(iter(_chunked(stream, chunk_size)))
+    # Only at the start of the stream.
+    assert _read(events) == [("1", "message", "", None)]
+
+
+def test_data_pieces() -> None:
+    chunks = [b"event: big\ndata: ", b"abc", b"def\n", b"data: ", b"ghi\n", b"\n"]
+    events = _iter_streaming_events(iter(chunks))
+
+    sse = next(events)
+    assert sse.event == "big"
+    assert list(sse.iter_data()) == ["abc", "def", "\n", "ghi"]
+    assert sse.complete
+    assert list(sse.iter_data()) == []
+    assert next(events, None) is None
+
+
+def test_multibyte_characters_across_chunks() -> None:
+    data = b"data: caf\xc3\xa9 \xe2\x82\xac\n\ndata: \xe2\x82\n\n"
+    events = _read(_iter_streaming_events(iter(_chunked(data, 1))))
+    # Truncated characters are replaced.
+    assert [data for data, *_ in events] == ["caf\u00e9 \u20ac", "\ufffd"]
+
+
+def test_unread_data_is_skipped() -> None:
+    chunks = [b"id: 1\ndata: skipped\ndata: too\n\n", b"data: read\n\n"]
+    events = _iter_streaming_events(iter(chunks))
+
+    first = next(events)
+    second = next(events)
+    assert first.complete
+    assert first.id == "1"
+    assert list(second.iter_data()) == ["read"]
+    assert second.id == "1"
+
+
+def test_partially_read_data_is_skipped() -> None:
+    chunks = [b"data: a", b"b", b"c\n\n", b"data: d\n\n"]
+    events = _iter_streaming_events(iter(chunks))
+
+    data = next(events).iter_data()
+    assert next(data) == "a"
+    assert list(next(events).iter_data()) == ["d"]
+
+
+def test_incomplete_event() -> None:
+    events = _iter_streaming_events(iter([b"data: a\n", b"data: b"]))
+
+    sse = next(events)
+    data = sse.iter_data()
+    assert next(data) == "a"
+    assert next(data) == "\nb"
+    with pytest.raises(SSEError, match="stream ended"):
+        next(data)
+    assert not sse.complete
+    assert next(events, None) is None
+
+
+def test_unread_incomplete_event() -> None:
+    events = _iter_streaming_events(iter([b"data: a\n"]))
+    assert not next(events).complete
+    assert next(events, None) is None
+
+
+def test_max_line_size() -> None:
+    data = b"data: " + b"x" * 100 + b"\nevent: ok\n\n"
+    events = _iter_streaming_events(iter([data]), max_line_size=10)
+    # Data lines are not buffered.
+    assert _read(events) == [("x" * 100, "ok", "", None)]
+
+    events = _iter_streaming_events(iter([b"event: ", b"x" * 11]), max_line_size=10)
+    with pytest.raises(SSEError, match="Line exceeds"):
+        next(events)
+
+    events = _iter_streaming_events(iter([b"x" * 11]), max_line_size=10)
+    with pytest.raises(SSEError, match="Line exceeds"):
+        next(events)
+
+
+def test_max_event_size() -> None:
+    events = _iter_streaming_events(
+        iter([b"data: 1234\ndata: 56\n\ndata: 1234", b"5678\n\n"]), max_event_size=7
+    )
+
+    assert list(next(events).iter_data()) == ["1234\n56"]
+    sse = next(events)
+    data = sse.iter_data()
+    assert next(data) == "1234"
+    with pytest.raises(SSEError, match="Event data exceeds"):
+        next(data)
+
+
+def test_repr() -> None:
+    (sse,) = list(_iter_streaming_events(iter([b"event: e\nid: 1\nretry: 2\n\n"])))
+    assert repr(sse) == (
+        "StreamingServerSentEvent(event='e', id='1', retry=2, complete=True)"
+    )
+
+
+def test_iter_sse_streaming() -> None:
+    class Body(httpx.SyncByteStream):
+        def __iter__(self) -> Iterator[bytes]:
+            yield from _chunked(STREAM, 5)
+
+    response = httpx.Response(
+        200, headers={"content-type": "text/event-stream"}, stream=Body()
+    )
+
+    events = _read(EventSource(response).iter_sse_streaming())
+    assert [data for data, *_ in events] == ["1\n2\n", " café €", "last"]
+
+
+@pytest.mark.asyncio
+async def test_aiter_sse_streaming() -> None:
+    class Body(httpx.AsyncByteStream):
+        async def __aiter__(self) -> AsyncIterator[bytes]:
+            for chunk in _chunked(STREAM, 5):
+                yield chunk
+
+    response = httpx.Response(
+        200, headers={"content-type": "text/event-stream"}, stream=Body()
+    )
+
+    events = []
+    async for sse in EventSource(response).aiter_sse_streaming():
+        data = "".join([text async for text in sse.aiter_data()])
+        events.append((data, sse.event, sse.id, sse.retry))
+
+    assert events == [
+        ("1\n2\n", "add", "1", 500),
+        (" café €", "message", "1", None),
+        ("last", "message", "1", None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_aiter_streaming_events_skips_and_checks_completeness() -> None:
+    async def chunks() -> AsyncIterator[bytes]:
+        yield b"data: skipped\n\n"
+        yield b"data: incomplete"
+
+    events = _aiter_streaming_events(chunks())
+
+    await events.__anext__()
+    sse = await events.__anext__()
+    with pytest.raises(SSEError):
+        [text async for text in sse.aiter_data()]
+
+
+@pytest.mark.asyncio
+async def test_aiter_data_final_replacement() -> None:
+    async def chunks() -> AsyncIterator[bytes]:
+        yield b"data: \xe2\x82\n\n"
+
+    async for sse in _aiter_streaming_events(chunks()):
+        assert [text async for text in sse.aiter_data()] == ["\ufffd"]
+
+
+@pytest.mark.parametrize("content_type", ["text/plain", ""])
+def test_iter_sse_streaming_checks_content_type(content_type: str) -> None:
+    response = httpx.Response(200, headers={"content-type": content_type})
+    with pytest.raises(SSEError):
+        next(EventSource(response).iter_sse_streaming())